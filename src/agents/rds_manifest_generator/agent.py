@@ -3,6 +3,7 @@
 from collections.abc import Sequence
 
 from deepagents import create_deep_agent
+from deepagents.backends.protocol import BackendFactory
 from langchain.agents.middleware.types import AgentMiddleware
 from langchain_anthropic import ChatAnthropic
 
@@ -14,6 +15,7 @@ from .tools.manifest_tools import (
 from .tools.requirement_tools import (
     check_requirement_collected,
     get_collected_requirements,
+    validate_requirement,
 )
 from .tools.schema_tools import (
     get_all_rds_fields,
@@ -33,7 +35,7 @@ Collect ALL required field values from the user and store them in `/requirements
 1. Use `list_required_fields()` to see what fields are required
 2. Use `get_rds_field_info(field_name)` to understand each field's validation rules
 3. Ask the user for values in a friendly, conversational way
-4. Validate each value against the field rules
+4. Validate each value with `validate_requirement(field_name, value)` before storing it
 5. **Store requirements in /requirements.json using write_file or edit_file**
 6. Continue until all required fields are collected
 7. When complete, summarize what was collected
@@ -233,7 +235,12 @@ You:
 Always be friendly, efficient, and focused on the goal!"""
 
 
-def create_rds_agent(middleware: Sequence[AgentMiddleware] = (), context_schema=None):
+def create_rds_agent(
+    middleware: Sequence[AgentMiddleware] = (),
+    context_schema=None,
+    backend: BackendFactory | None = None,
+    subagent_middleware: Sequence[AgentMiddleware] = (),
+):
     """Create the AWS RDS manifest generator agent with subagent architecture.
 
     Uses create_deep_agent with a specialized requirements-collector subagent.
@@ -247,6 +254,10 @@ def create_rds_agent(middleware: Sequence[AgentMiddleware] = (), context_schema=
     Args:
         middleware: Optional sequence of additional middleware to apply to the agent.
         context_schema: Optional state schema to use. If not provided, uses default.
+        backend: Optional filesystem backend factory for the agent and subagent.
+            If not provided, files are stored in the thread state.
+        subagent_middleware: Optional middleware for the requirements-collector
+            subagent, e.g. to declare state channels its file tools read.
 
     Returns:
         A compiled LangGraph agent ready for use
@@ -279,13 +290,16 @@ def create_rds_agent(middleware: Sequence[AgentMiddleware] = (), context_schema=
                     # Requirement query tools (subagent reads from /requirements.json)
                     get_collected_requirements,
                     check_requirement_collected,
+                    validate_requirement,
                     # Schema tools for validation (subagent)
                     get_rds_field_info,
                     list_required_fields,
                     # Note: write_file, edit_file, read_file are provided automatically by DeepAgents
                 ],
+                "middleware": list(subagent_middleware),
             }
         ],
         context_schema=context_schema,
+        backend=backend,
     ).with_config({"recursion_limit": 1000})
 
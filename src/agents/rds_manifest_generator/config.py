@@ -1,6 +1,9 @@
 """Configuration for RDS manifest generator agent."""
 
+import os
+
 from src.common.repos import get_repository_config
+from src.common.repos.config import REPO_BUNDLE_PATH, REPO_BUNDLE_REFRESH
 
 # Repository configuration - using shared project-planton repository
 REPO_CONFIG = get_repository_config("project-planton")
@@ -8,3 +11,12 @@ REPO_CONFIG = get_repository_config("project-planton")
 # DeepAgent virtual filesystem paths
 FILESYSTEM_PROTO_DIR = "/schema/protos"
 
+
+# How often (in seconds) proto files are re-fetched in the background and a new
+# schema version is swapped in. Set to 0 to disable background refresh. Pods
+# started from a repository bundle do not refresh unless
+# GRAPH_FLEET_REPO_BUNDLE_REFRESH=true, so they never run Git by default.
+_DEFAULT_PROTO_REFRESH_INTERVAL = "0" if REPO_BUNDLE_PATH and not REPO_BUNDLE_REFRESH else "300"
+PROTO_REFRESH_INTERVAL_SECONDS = float(
+    os.getenv("GRAPH_FLEET_PROTO_REFRESH_INTERVAL_SECONDS", _DEFAULT_PROTO_REFRESH_INTERVAL)
+)
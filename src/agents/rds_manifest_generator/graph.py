@@ -3,30 +3,61 @@
 This module performs startup initialization when imported by the LangGraph server.
 Proto schema files are fetched and cached at module import time, ensuring they're
 ready before any user requests are processed.
+
+After startup, a background refresher re-fetches the proto files periodically
+and swaps in a new schema version. Each conversation thread pins the schema
+version it started with, so a swap never changes the schema mid-conversation.
 """
 
 import logging
 import time
+from collections.abc import Awaitable, Callable, Mapping
+from pathlib import PurePosixPath
+from typing import Any, NotRequired
 
 from deepagents.middleware.filesystem import FilesystemState
+from langchain.agents.middleware import AgentState, ToolCallRequest
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
 
+from src.common.metrics import get_metrics_registry
 from src.common.repos import (
     RepositoryFetchError,
     RepositoryFilesMiddleware,
-    fetch_repository,
+    RepositoryFilesState,
+    RepositorySnapshot,
+    fetch_repository_snapshot,
 )
 
 from .agent import create_rds_agent
-from .config import FILESYSTEM_PROTO_DIR, REPO_CONFIG
-from .schema.loader import ProtoSchemaLoader, set_schema_loader
+from .config import FILESYSTEM_PROTO_DIR, PROTO_REFRESH_INTERVAL_SECONDS, REPO_CONFIG
+from .schema.descriptor_loader import load_descriptor_schema_loader
+from .schema.loader import (
+    SchemaVersion,
+    current_schema_version,
+    get_schema_version,
+    pin_schema_version,
+    publish_schema,
+)
+from .schema.refresher import ProtoSchemaRefresher
+from .validation.manifest_validator import warm_manifest_validator
 
 # Logging is configured globally in src/__init__.py
 logger = logging.getLogger(__name__)
 
 # Global storage for proto file contents from startup initialization
-# Maps filename to file content
+# Maps filename to file content. Later refreshes publish new schema versions
+# (see schema/loader.py) instead of changing this dictionary.
 _cached_proto_contents: dict[str, str] = {}
 
+# Schema loader of the installed AwsRdsInstance stubs, the descriptors
+# protovalidate validates against. When set, the schema is read from it and the
+# fetched proto files are only mounted for the agent to read.
+_stub_schema_loader = load_descriptor_schema_loader()
+
+# Background refresher of the proto schema, started after startup initialization
+_schema_refresher: ProtoSchemaRefresher | None = None
+
 
 class RdsAgentState(FilesystemState):
     """State for RDS agent.
@@ -38,12 +69,24 @@ class RdsAgentState(FilesystemState):
     pass
 
 
+class ProtoSchemaState(RepositoryFilesState):
+    """State channels for the mounted proto files and the pinned schema version."""
+
+    proto_schema_version: NotRequired[str]  # type: ignore[valid-type]
+
+
 class FirstRequestProtoLoader(RepositoryFilesMiddleware):
-    """Copy proto files to virtual filesystem and initialize schema loader on first request.
+    """Mount proto files in virtual filesystem and pin the schema version on first request.
     
-    Extends the shared RepositoryFilesMiddleware to also initialize the proto schema loader
-    after files are copied to the virtual filesystem.
+    Extends the shared RepositoryFilesMiddleware to serve the proto files of the
+    current schema version to new threads and to record that version in the
+    thread state. The files are shared across threads; each thread only records
+    the mounted file set and reads files on demand. Every tool call then runs
+    with the thread's pinned version, so background schema refreshes only
+    affect threads started afterwards.
     """
+
+    state_schema = ProtoSchemaState
     
     def __init__(self):
         """Initialize the middleware with proto file contents."""
@@ -52,100 +95,161 @@ class FirstRequestProtoLoader(RepositoryFilesMiddleware):
             vfs_directory=FILESYSTEM_PROTO_DIR,
             description="proto schema files",
         )
-        self._schema_initialized = False
+
+    def _get_file_set(self, state: AgentState) -> tuple[str, Mapping[str, str]]:
+        """Return the proto files of the thread's schema version, identified by the version."""
+        schema = self._resolve_schema(state)
+        return schema.version, schema.proto_contents
+
+    def _resolve_schema(self, state: Any) -> SchemaVersion:
+        """Return the schema version a thread is pinned to, or the current one.
+
+        Args:
+            state: The current agent state
+
+        Returns:
+            The pinned schema version if it is still retained, else the current one
+
+        Raises:
+            RuntimeError: If no schema version was published yet
+
+        """
+        pinned = state.get("proto_schema_version") if isinstance(state, dict) else None
+        if pinned:
+            schema = get_schema_version(pinned)
+            if schema is not None:
+                return schema
+            logger.warning(
+                f"Pinned proto schema version {pinned} is no longer available, "
+                f"using the current version"
+            )
+        current = current_schema_version()
+        if current is None:
+            raise RuntimeError("Proto schema has not been initialized")
+        return current
     
     def before_agent(self, state, runtime):
-        """Copy proto files and initialize schema loader on first request.
+        """Mount proto files and pin the schema version on first request.
         
         Args:
             state: The current agent state
             runtime: The LangGraph runtime
             
         Returns:
-            State update with proto files, or None if already initialized
+            State update with proto files and schema version, or None if the
+            thread is already initialized
 
         """
-        # Call parent to copy files to virtual filesystem
+        # Call parent to mount files in virtual filesystem
         result = super().before_agent(state, runtime)
         
         # Log what parent middleware returned
         if result is not None:
             logger.info("🔧 PROTO LOADER: Parent middleware returned state update")
             logger.info(f"   State update keys: {list(result.keys())}")
-            if "files" in result:
-                logger.info(f"   Files in update: {len(result['files'])} files")
-                logger.info(f"   File paths: {list(result['files'].keys())}")
+            if "repository_mounts" in result:
+                logger.info(f"   Mounts in update: {result['repository_mounts']}")
             else:
-                logger.warning("   ⚠️  NO 'files' KEY in state update!")
+                logger.warning("   ⚠️  NO 'repository_mounts' KEY in state update!")
         else:
             logger.info("🔧 PROTO LOADER: Parent middleware returned None (already initialized)")
-        
-        # If files were just copied, initialize the schema loader
-        if result is not None and not self._schema_initialized:
-            # Create a file reader that reads from the cached contents
-            def read_from_cache(file_path: str) -> str:
-                """Read proto files from in-memory cache.
-                
-                Args:
-                    file_path: Name of the proto file (not full path)
-                
-                Returns:
-                    File contents as string
-                    
-                Raises:
-                    ValueError: If file not found in cache
-
-                """
-                # Extract just the filename from the path
-                filename = file_path.split('/')[-1]
-                
-                if filename in _cached_proto_contents:
-                    return _cached_proto_contents[filename]
-                
-                raise ValueError(f"Proto file not found in cache: {filename}")
-            
-            # Initialize the global schema loader
-            loader = ProtoSchemaLoader(read_file_func=read_from_cache)
-            set_schema_loader(loader)
-            
-            # Verify schema can be loaded
-            try:
-                fields = loader.load_spec_schema()
-                if not fields:
-                    logger.warning("Proto schema loaded but no fields found. Schema may be invalid.")
-                else:
-                    logger.info(f"Schema loader initialized with {len(fields)} fields")
-            except Exception as e:
-                logger.error(f"Failed to verify schema after loading: {e}")
-            
-            self._schema_initialized = True
+
+        # Pin the thread to the schema version it starts with
+        schema = self._resolve_schema(state)
+        if state.get("proto_schema_version") != schema.version:
+            result = dict(result or {})
+            result["proto_schema_version"] = schema.version
+            logger.info(f"🔧 PROTO LOADER: Thread pinned to schema version {schema.version}")
         
         # Log final return value
         if result is not None:
-            logger.info("✅ PROTO LOADER COMPLETE: Returning state update with files and schema initialized")
+            logger.info("✅ PROTO LOADER COMPLETE: Returning state update with files and schema version")
         else:
             logger.info("✅ PROTO LOADER COMPLETE: Returning None (no-op)")
         
         return result
 
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Run the tool call with the thread's schema version pinned."""
+        with pin_schema_version(self._resolve_schema(request.state)):
+            return handler(request)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Async version of wrap_tool_call."""
+        with pin_schema_version(self._resolve_schema(request.state)):
+            return await handler(request)
+
+
+def _fetch_proto_snapshot(use_bundle: bool = True) -> RepositorySnapshot:
+    """Fetch the snapshot of the proto repository.
+
+    Args:
+        use_bundle: Whether a baked repository bundle may be served
+
+    Returns:
+        The repository snapshot
+
+    """
+    return fetch_repository_snapshot(REPO_CONFIG, use_bundle=use_bundle)
+
+
+def _proto_contents(snapshot: RepositorySnapshot) -> dict[str, str]:
+    """Return the proto files of a snapshot keyed by filename."""
+    return {
+        PurePosixPath(repo_file_path).name: snapshot.read_text(repo_file_path)
+        for repo_file_path in snapshot.files
+    }
+
+
+def _refetch_proto_contents() -> tuple[str, Mapping[str, str]]:
+    """Re-fetch the proto files from Git for the background refresher."""
+    snapshot = _fetch_proto_snapshot(use_bundle=False)
+    return snapshot.commit, _proto_contents(snapshot)
+
+
+def _log_repository_metrics() -> None:
+    """Log where startup time went: fetch outcome, Git phases, lock wait and file sizes."""
+    metrics = get_metrics_registry().snapshot("repos.")
+    for counter in metrics["counters"]:
+        logger.info(f"  Metric {counter['name']} {counter['labels']}: {counter['value']:.0f}")
+    for summary in metrics["summaries"]:
+        logger.info(
+            f"  Metric {summary['name']} {summary['labels']}: "
+            f"total={summary['total']:.3f} count={summary['count']}"
+        )
+
 
 def _initialize_proto_schema_at_startup() -> None:
     """Clone/pull proto repository and cache file contents at application startup.
     
     This function runs at module import time and handles both the git clone/pull
     operation and reading the proto file contents into memory. It does NOT copy
-    files to the virtual filesystem or initialize the schema loader - that happens
+    files to the virtual filesystem - they are mounted
     on the first user request via middleware.
     
     This function:
     1. Clones or pulls the proto repository to local cache (using shared fetcher)
-    2. Reads all proto file contents and caches them in memory
-    3. Logs detailed timing and path information
+       and captures the proto files as a content-addressed snapshot
+    2. Caches the proto file contents from the snapshot in memory
+    3. Publishes the first schema version, read from the installed stubs if
+       present and parsed from the proto files otherwise
+    4. Logs detailed timing and path information
+    
+    If the repository cannot be fetched, the last good snapshot is used instead,
+    so the server still starts when GitHub is unreachable.
     
-    The actual copying to virtual filesystem happens in FirstRequestProtoLoader middleware.
+    The actual mounting in virtual filesystem happens in FirstRequestProtoLoader middleware.
     
     Raises:
-        RepositoryFetchError: If git clone/pull fails or file reading fails.
+        RepositoryFetchError: If fetching fails and no previous snapshot exists.
 
     """
     global _cached_proto_contents
@@ -159,21 +263,34 @@ def _initialize_proto_schema_at_startup() -> None:
     logger.info("=" * 60)
 
     try:
-        # Fetch proto files from Git repository using shared fetcher
-        proto_paths = fetch_repository(REPO_CONFIG)
+        # Fetch proto files from Git repository (or last good snapshot) using shared fetcher
+        snapshot = _fetch_proto_snapshot()
         
-        # Read and cache file contents in memory
-        logger.info("STARTUP: Reading proto files into memory...")
-        for proto_path in proto_paths:
-            content = proto_path.read_text(encoding='utf-8')
-            _cached_proto_contents[proto_path.name] = content
-            logger.info(f"  Cached: {proto_path.name} ({len(content)} bytes)")
+        # Cache file contents in memory
+        logger.info(f"STARTUP: Reading proto files from snapshot {snapshot.commit[:12]}...")
+        for filename, content in _proto_contents(snapshot).items():
+            _cached_proto_contents[filename] = content
+            logger.info(f"  Cached: {filename} ({len(content)} bytes)")
+
+        # Publish the first schema version; the stubs' schema wins over the
+        # fetched files, which are then only mounted for the agent
+        schema = publish_schema(
+            _cached_proto_contents, source=snapshot.commit, loader=_stub_schema_loader
+        )
+        if _stub_schema_loader is not None:
+            logger.info("Schema read from the installed AwsRdsInstance stubs")
+        fields = schema.loader.load_spec_schema()
+        if not fields:
+            logger.warning("Proto schema loaded but no fields found. Schema may be invalid.")
+        else:
+            logger.info(f"Schema version {schema.version} published with {len(fields)} fields")
         
         elapsed = time.time() - start_time
         logger.info("=" * 60)
         logger.info(f"STARTUP: Clone/pull and caching completed in {elapsed:.2f} seconds")
         logger.info(f"Proto files cached in memory: {list(_cached_proto_contents.keys())}")
-        logger.info("Files will be copied to virtual filesystem on first request")
+        logger.info("Files will be mounted in virtual filesystem on first request")
+        _log_repository_metrics()
         logger.info("=" * 60)
         
     except RepositoryFetchError as e:
@@ -188,13 +305,44 @@ def _initialize_proto_schema_at_startup() -> None:
         raise RepositoryFetchError(f"Unexpected error: {e}") from e
 
 
+def _warm_validator_at_startup() -> None:
+    """Compile the manifest validation rules at startup instead of on the first request.
+
+    Failures are logged and do not prevent startup; validation then compiles
+    the rules on first use as before.
+    """
+    try:
+        warm_manifest_validator()
+    except Exception as e:
+        logger.warning(f"STARTUP: Could not warm the manifest validator: {e}")
+
+
 # Initialize proto schema at module import time (application startup)
 # This clones/pulls the proto repository to local cache and reads file contents
-# into memory, but does NOT copy files to virtual filesystem - that happens on first request
+# into memory, but does NOT mount files in virtual filesystem - that happens on first request
 _initialize_proto_schema_at_startup()
 
+# Compile the CEL validation rules now, so first-request latency excludes them
+_warm_validator_at_startup()
+
+# Keep the schema current without restarts: re-fetch in the background and swap
+# in new schema versions for threads started afterwards
+if PROTO_REFRESH_INTERVAL_SECONDS > 0:
+    _schema_refresher = ProtoSchemaRefresher(
+        fetch=_refetch_proto_contents,
+        interval_seconds=PROTO_REFRESH_INTERVAL_SECONDS,
+        loader=_stub_schema_loader,
+    )
+    _schema_refresher.start()
+
 # Export the compiled graph for LangGraph with custom middleware:
-# 1. FirstRequestProtoLoader - Copies proto files to virtual filesystem on first request
+# 1. FirstRequestProtoLoader - Mounts proto files in virtual filesystem on first request
+#    and pins each thread to the schema version it started with
+#
+# The proto files are kept once in the shared file store and the thread state
+# only records the mounted file set, so checkpoints do not grow with proto size.
+# The loader's backend serves the mount lazily to the file tools; the subagent
+# gets the loader as well so the mount reaches its state.
 #
 # File-Based Requirements Storage:
 # The subagent uses native DeepAgents file tools (write_file, edit_file, read_file) 
@@ -217,11 +365,15 @@ _initialize_proto_schema_at_startup()
 # - RequirementsCacheMiddleware (was causing Runtime mutation errors)
 # - RequirementsSyncMiddleware (file is already the source of truth)
 # - Custom requirements state field and reducer
+_proto_loader = FirstRequestProtoLoader()
+
 graph = create_rds_agent(
     middleware=[
-        FirstRequestProtoLoader(),
+        _proto_loader,
     ],
     context_schema=RdsAgentState,
+    backend=_proto_loader.backend(),
+    subagent_middleware=[_proto_loader],
 )
 
 
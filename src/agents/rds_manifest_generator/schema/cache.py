@@ -0,0 +1,168 @@
+"""On-disk cache of parsed proto schemas.
+
+Every process start used to parse the proto files again, even though the
+files rarely change between restarts and are the same for every replica.
+SchemaCache stores the parsed spec fields (types, rules, foreign keys and
+descriptions) as compact JSON, keyed by the digest of the proto contents
+(loader.schema_version_digest), next to the shared repository cache:
+
+    <CACHE_DIR>/../schemas/
+    └── <version>.json      # Parsed spec fields of one schema version
+
+A cache entry is only used when its digest and cache format match, so
+changed protos or a changed parser never serve stale fields. Unreadable
+entries are ignored and the files are parsed as usual.
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from src.common.repos.config import CACHE_DIR
+from src.common.repos.files import atomic_write
+
+from .loader import ProtoField
+
+logger = logging.getLogger(__name__)
+
+# Directory of the parsed schema cache, shared by all processes on the host
+SCHEMA_CACHE_DIR = CACHE_DIR.parent / "schemas"
+
+# Bump when ProtoField or the way fields are parsed changes, to invalidate entries
+SCHEMA_CACHE_FORMAT = 1
+
+# Number of cached schema versions kept on disk; older entries are removed
+MAX_CACHED_SCHEMAS = 32
+
+
+class SchemaCache:
+    """Parsed spec fields stored on disk, keyed by proto content digest."""
+
+    def __init__(self, root: Path):
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding the cache entries
+
+        """
+        self.root = root
+
+    def _path(self, version: str) -> Path:
+        """Return the path of the cache entry of a schema version."""
+        return self.root / f"{version}.json"
+
+    def load(self, version: str) -> tuple[ProtoField, ...] | None:
+        """Return the cached spec fields of a schema version.
+
+        Args:
+            version: Digest of the proto contents (SchemaVersion.version)
+
+        Returns:
+            The spec fields, or None if not cached, unreadable or written by
+            another cache format
+
+        """
+        try:
+            entry = json.loads(self._path(version).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable schema cache entry {version}: {e}")
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or entry.get("format") != SCHEMA_CACHE_FORMAT
+            or entry.get("version") != version
+        ):
+            return None
+        try:
+            return tuple(_field_from_json(data) for data in entry["fields"])
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Ignoring invalid schema cache entry {version}: {e}")
+            return None
+
+    def save(self, version: str, fields: Iterable[ProtoField]) -> None:
+        """Store the spec fields of a schema version.
+
+        Failures are logged and otherwise ignored; the cache is an optimization.
+
+        Args:
+            version: Digest of the proto contents (SchemaVersion.version)
+            fields: Parsed spec fields
+
+        """
+        entry = {
+            "format": SCHEMA_CACHE_FORMAT,
+            "version": version,
+            "fields": [_field_to_json(field) for field in fields],
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            atomic_write(
+                self._path(version),
+                json.dumps(entry, separators=(",", ":")).encode("utf-8"),
+            )
+            self._prune()
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write schema cache entry {version}: {e}")
+
+    def _prune(self) -> None:
+        """Remove the least recently written entries beyond MAX_CACHED_SCHEMAS."""
+        entries = sorted(self.root.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for path in entries[:-MAX_CACHED_SCHEMAS]:
+            path.unlink(missing_ok=True)
+
+
+def _field_to_json(field: ProtoField) -> dict[str, Any]:
+    """Return the JSON form of a spec field."""
+    return {
+        "name": field.name,
+        "field_type": field.field_type,
+        "field_number": field.field_number,
+        "required": field.required,
+        "description": field.description,
+        "validation_rules": dict(field.validation_rules),
+        "foreign_key_info": (
+            dict(field.foreign_key_info) if field.foreign_key_info is not None else None
+        ),
+        "is_repeated": field.is_repeated,
+    }
+
+
+def _field_from_json(data: dict[str, Any]) -> ProtoField:
+    """Return the spec field of its JSON form."""
+    fk_info = data["foreign_key_info"]
+    return ProtoField(
+        name=data["name"],
+        field_type=data["field_type"],
+        field_number=data["field_number"],
+        required=data["required"],
+        description=data["description"],
+        validation_rules=MappingProxyType(dict(data["validation_rules"])),
+        foreign_key_info=MappingProxyType(dict(fk_info)) if fk_info is not None else None,
+        is_repeated=data["is_repeated"],
+    )
+
+
+# Global instance for easy access
+_schema_cache: SchemaCache | None = SchemaCache(SCHEMA_CACHE_DIR)
+
+
+def get_schema_cache() -> SchemaCache | None:
+    """Return the global schema cache, or None if caching is disabled."""
+    return _schema_cache
+
+
+def set_schema_cache(cache: SchemaCache | None) -> None:
+    """Set the global schema cache.
+
+    Args:
+        cache: Cache to use, or None to disable caching
+
+    """
+    global _schema_cache
+    _schema_cache = cache
@@ -0,0 +1,275 @@
+"""Schema loader reading the spec from the generated protobuf stubs.
+
+ProtoSchemaLoader parses .proto text fetched from Git. The generated Python
+stubs that manifest_validator.py validates against carry the same
+information in their message descriptors: field types and labels, and the
+buf.validate rules and foreign-key extensions as field options.
+DescriptorSchemaLoader reads the schema from those descriptors, without any
+file I/O or text parsing, so schema queries always match the validator.
+
+Generated stubs are built without source info, so field descriptions are
+only available when the descriptors were built with it, or when a
+FileDescriptorSet produced with ``protoc --include_source_info`` (or
+``buf build``) is passed in.
+
+    loader = load_descriptor_schema_loader()
+    if loader is not None:
+        set_schema_loader(loader)
+"""
+
+import logging
+from typing import Any
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.descriptor_pb2 import FileDescriptorProto, FileDescriptorSet
+from google.protobuf.message import DecodeError, Message
+
+from .loader import ProtoField, ProtoSchemaLoader
+from .proto_parser import FieldDef, ProtoOption
+
+logger = logging.getLogger(__name__)
+
+# Field of the top-level AwsRdsInstance message holding the spec
+SPEC_FIELD_NAME = "spec"
+
+# Path components of messages and fields in SourceCodeInfo locations
+# (see descriptor.proto: FileDescriptorProto.message_type, DescriptorProto.field
+# and DescriptorProto.nested_type)
+_FILE_MESSAGE_TYPE = 4
+_MESSAGE_FIELD = 2
+_MESSAGE_NESTED_TYPE = 3
+
+# Names of the scalar field types, as written in .proto files
+_SCALAR_TYPE_NAMES = {
+    FieldDescriptor.TYPE_DOUBLE: "double",
+    FieldDescriptor.TYPE_FLOAT: "float",
+    FieldDescriptor.TYPE_INT64: "int64",
+    FieldDescriptor.TYPE_UINT64: "uint64",
+    FieldDescriptor.TYPE_INT32: "int32",
+    FieldDescriptor.TYPE_FIXED64: "fixed64",
+    FieldDescriptor.TYPE_FIXED32: "fixed32",
+    FieldDescriptor.TYPE_BOOL: "bool",
+    FieldDescriptor.TYPE_STRING: "string",
+    FieldDescriptor.TYPE_BYTES: "bytes",
+    FieldDescriptor.TYPE_UINT32: "uint32",
+    FieldDescriptor.TYPE_SFIXED32: "sfixed32",
+    FieldDescriptor.TYPE_SFIXED64: "sfixed64",
+    FieldDescriptor.TYPE_SINT32: "sint32",
+    FieldDescriptor.TYPE_SINT64: "sint64",
+}
+
+
+class DescriptorSchemaLoader(ProtoSchemaLoader):
+    """Loads the spec schema from a protobuf message descriptor."""
+
+    def __init__(self, descriptor: Descriptor, source_info: FileDescriptorSet | None = None):
+        """Initialize the schema loader.
+
+        Args:
+            descriptor: Descriptor of the spec message (AwsRdsInstanceSpec)
+            source_info: Optional descriptor set with source info, used for
+                field descriptions when the descriptor itself has none
+
+        """
+        super().__init__()
+        self.descriptor = descriptor
+        self.source_info = source_info
+
+    def _parse_proto_file(self, filename: str) -> str:
+        """Refuse to read proto files; this loader only reads descriptors."""
+        raise FileNotFoundError(
+            f"Proto file {filename} is not available: schema is read from "
+            f"the {self.descriptor.full_name} descriptor"
+        )
+
+    def _parse_spec_fields(self) -> list[ProtoField]:
+        """Build the spec fields from the message descriptor."""
+        comments = _field_comments(self.descriptor, self.source_info)
+        return [
+            self._to_proto_field(_field_def(field, comments.get(field.name, "")))
+            for field in self.descriptor.fields
+        ]
+
+
+def _field_def(field: FieldDescriptor, comment: str = "") -> FieldDef:
+    """Convert a field descriptor to the FieldDef the proto parser produces.
+
+    Args:
+        field: Field descriptor
+        comment: Leading comment of the field
+
+    Returns:
+        Field definition with the type as written in .proto files and the
+        options named as in option statements (e.g. "(buf.validate.field)")
+
+    """
+    key_type = value_type = None
+    label = "repeated" if field.is_repeated else None
+    oneof = field.containing_oneof.name if field.containing_oneof is not None else None
+    if oneof == f"_{field.name}":
+        # Synthetic oneof of a proto3 "optional" field
+        label, oneof = "optional", None
+
+    if _is_map_entry(field.message_type):
+        key_type = _type_name(field.message_type.fields_by_name["key"])
+        value_type = _type_name(field.message_type.fields_by_name["value"])
+        type_name = f"map<{key_type}, {value_type}>"
+        label = None
+    else:
+        type_name = _type_name(field)
+
+    return FieldDef(
+        name=field.name,
+        type=type_name,
+        number=field.number,
+        label=label,
+        options=_options(field.GetOptions()),
+        comment=comment,
+        oneof=oneof,
+        key_type=key_type,
+        value_type=value_type,
+    )
+
+
+def _options(options: Message) -> tuple[ProtoOption, ...]:
+    """Convert a descriptor options message to ProtoOption values.
+
+    Extensions are named as in option statements ("(buf.validate.field)"),
+    message values become dicts and enum values their names, so the result
+    flattens (see flatten_options) to the same names as parsed options.
+
+    Args:
+        options: Options message (e.g. FieldOptions)
+
+    Returns:
+        The options that are set, one entry per value of repeated options
+
+    """
+    result: list[ProtoOption] = []
+    for field, value in options.ListFields():
+        name = f"({field.full_name})" if field.is_extension else field.name
+        if field.is_repeated:
+            result.extend(ProtoOption(name, _option_value(field, item)) for item in value)
+        else:
+            result.append(ProtoOption(name, _option_value(field, value)))
+    return tuple(result)
+
+
+def _option_value(field: FieldDescriptor, value: Any) -> Any:
+    """Convert a single option value to its parsed-option form."""
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        aggregate: dict[str, Any] = {}
+        for sub_field, sub_value in value.ListFields():
+            if sub_field.is_repeated:
+                aggregate[sub_field.name] = [_option_value(sub_field, item) for item in sub_value]
+            else:
+                aggregate[sub_field.name] = _option_value(sub_field, sub_value)
+        return aggregate
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        enum_value = field.enum_type.values_by_number.get(value)
+        return enum_value.name if enum_value is not None else value
+    return value
+
+
+def _type_name(field: FieldDescriptor) -> str:
+    """Return the type of a field as written in .proto files."""
+    if field.message_type is not None:
+        return field.message_type.full_name
+    if field.enum_type is not None:
+        return field.enum_type.full_name
+    return _SCALAR_TYPE_NAMES.get(field.type, str(field.type))
+
+
+def _is_map_entry(message_type: Descriptor | None) -> bool:
+    """Return whether a message type is the generated entry type of a map field."""
+    return message_type is not None and message_type.GetOptions().map_entry
+
+
+def _field_comments(
+    descriptor: Descriptor, source_info: FileDescriptorSet | None
+) -> dict[str, str]:
+    """Return the leading comments of the fields of a message by field name."""
+    file_proto = _source_file(descriptor, source_info)
+    if file_proto is None:
+        return {}
+
+    message_path = _message_path(descriptor)
+    comments_by_path = {
+        tuple(location.path): location.leading_comments
+        for location in file_proto.source_code_info.location
+        if location.leading_comments
+    }
+    comments: dict[str, str] = {}
+    for field in descriptor.fields:
+        comment = comments_by_path.get((*message_path, _MESSAGE_FIELD, field.index))
+        if comment:
+            comments[field.name] = " ".join(
+                line.strip() for line in comment.splitlines() if line.strip()
+            )
+    return comments
+
+
+def _source_file(
+    descriptor: Descriptor, source_info: FileDescriptorSet | None
+) -> FileDescriptorProto | None:
+    """Return the file of a descriptor with source info, or None if unavailable."""
+    filename = descriptor.file.name
+    if source_info is not None:
+        for file_proto in source_info.file:
+            if file_proto.name == filename and file_proto.HasField("source_code_info"):
+                return file_proto
+
+    try:
+        file_proto = FileDescriptorProto.FromString(descriptor.file.serialized_pb)
+    except DecodeError:
+        return None
+    return file_proto if file_proto.HasField("source_code_info") else None
+
+
+def _message_path(descriptor: Descriptor) -> tuple[int, ...]:
+    """Return the SourceCodeInfo path of a message."""
+    path: list[int] = []
+    while descriptor.containing_type is not None:
+        parent = descriptor.containing_type
+        path[:0] = [_MESSAGE_NESTED_TYPE, list(parent.nested_types).index(descriptor)]
+        descriptor = parent
+    top_level = list(descriptor.file.message_types_by_name.values())
+    return (_FILE_MESSAGE_TYPE, top_level.index(descriptor), *path)
+
+
+def get_spec_descriptor() -> Descriptor | None:
+    """Return the spec descriptor of the installed AwsRdsInstance stubs.
+
+    Returns:
+        Descriptor of the message type of AwsRdsInstance.spec, the same one
+        manifest validation uses, or None if the stubs are not installed
+
+    """
+    try:
+        from org.project_planton.provider.aws.awsrdsinstance.v1.api_pb2 import (
+            AwsRdsInstance,
+        )
+    except ImportError:
+        return None
+
+    spec_field = AwsRdsInstance.DESCRIPTOR.fields_by_name.get(SPEC_FIELD_NAME)
+    return spec_field.message_type if spec_field is not None else None
+
+
+def load_descriptor_schema_loader(
+    source_info: FileDescriptorSet | None = None,
+) -> DescriptorSchemaLoader | None:
+    """Create a schema loader from the installed AwsRdsInstance stubs.
+
+    Args:
+        source_info: Optional descriptor set with source info for field descriptions
+
+    Returns:
+        Loader reading the installed stubs, or None if they are not installed
+
+    """
+    descriptor = get_spec_descriptor()
+    if descriptor is None:
+        logger.debug("AwsRdsInstance stubs are not installed, no descriptor schema")
+        return None
+    return DescriptorSchemaLoader(descriptor, source_info)
@@ -2,44 +2,220 @@
 
 This module parses the proto files to extract field definitions, validation rules,
 and other metadata needed for intelligent manifest generation.
+
+Parsed schemas are published as immutable, versioned SchemaVersion objects. A new
+version can be swapped in at any time (see refresher.py); work that pinned a
+version with pin_schema_version keeps using it until it finishes.
+
+Versions are published per cloud resource kind. AwsRdsInstance is published at
+startup (see graph.py); other kinds are fetched and published on first use by
+the schema registry (see registry.py), which get_schema_loader goes through.
 """
 
-import re
-from collections.abc import Callable
-from dataclasses import dataclass
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, TypeVar
+
+from .proto_parser import FieldDef, ProtoFile, parse_proto
+
+logger = logging.getLogger(__name__)
+
+# Number of schema versions kept resolvable for threads pinned to them
+MAX_RETAINED_SCHEMA_VERSIONS = 8
+
+# Cloud resource kind served by this agent, published at startup
+DEFAULT_SCHEMA_KIND = "AwsRdsInstance"
+
+# Message in spec.proto holding the manifest spec fields
+SPEC_MESSAGE_NAME = f"{DEFAULT_SCHEMA_KIND}Spec"
+
+# Prefix of buf.validate field rule options
+_VALIDATE_FIELD_OPTION = "(buf.validate.field)."
+
+# buf.validate string rules and the validation_rules keys they map to
+_STRING_RULES = {"min_len": "min_len", "pattern": "pattern", "const": "const"}
 
+# buf.validate numeric rules and the validation_rules keys they map to
+_NUMERIC_RULES = {
+    "gt": "greater_than",
+    "gte": "greater_than_or_equal",
+    "lte": "less_than_or_equal",
+}
+_NUMERIC_TYPES = frozenset({
+    "int32", "int64", "uint32", "uint64", "sint32", "sint64",
+    "fixed32", "fixed64", "sfixed32", "sfixed64", "float", "double",
+})
 
-@dataclass
+# Foreign key extension options, matched by suffix so any package prefix works
+# (e.g. "(org.project_planton.shared.foreignkey.v1.default_kind)")
+_FOREIGN_KEY_KIND_OPTION = "foreignkey.v1.default_kind)"
+_FOREIGN_KEY_FIELD_PATH_OPTION = "foreignkey.v1.default_kind_field_path)"
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
 class ProtoField:
-    """Represents a field in a protobuf message."""
+    """Represents a field in a protobuf message.
+
+    Fields are immutable and shared by every caller of a loaded schema; the rule
+    and foreign key mappings are read-only views.
+    """
 
     name: str
     field_type: str
     field_number: int
     required: bool
     description: str
-    validation_rules: dict[str, Any]
-    foreign_key_info: dict[str, Any] | None = None
+    validation_rules: Mapping[str, Any]
+    foreign_key_info: Mapping[str, Any] | None = None
     is_repeated: bool = False
 
 
+def camel_case(name: str) -> str:
+    """Return the camelCase JSON name of a snake_case proto field name.
+
+    Args:
+        name: Proto field name (e.g. "allocated_storage_gb")
+
+    Returns:
+        The camelCase name (e.g. "allocatedStorageGb")
+
+    """
+    first, *rest = name.split("_")
+    return first + "".join(part[:1].upper() + part[1:] for part in rest)
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedSchema:
+    """The spec fields of a loaded schema, indexed for constant-time lookups.
+
+    Built once per loader, so schema tools never scan or rebuild field lists.
+
+    Attributes:
+        fields: All fields in declaration order
+        required: Required fields in declaration order
+        optional: Optional fields in declaration order
+        by_name: Fields by proto field name
+        by_alias: Fields by camelCase JSON name, where it differs from the proto name
+
+    """
+
+    fields: tuple[ProtoField, ...]
+    required: tuple[ProtoField, ...]
+    optional: tuple[ProtoField, ...]
+    by_name: Mapping[str, ProtoField]
+    by_alias: Mapping[str, ProtoField]
+    _derived: dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_fields(cls, fields: Iterable[ProtoField]) -> "IndexedSchema":
+        """Index a sequence of fields.
+
+        Args:
+            fields: Fields in declaration order
+
+        Returns:
+            The indexed schema
+
+        """
+        fields = tuple(fields)
+        by_name = {field.name: field for field in fields}
+        by_alias = {
+            alias: field
+            for field in fields
+            if (alias := camel_case(field.name)) not in by_name
+        }
+        return cls(
+            fields=fields,
+            required=tuple(field for field in fields if field.required),
+            optional=tuple(field for field in fields if not field.required),
+            by_name=MappingProxyType(by_name),
+            by_alias=MappingProxyType(by_alias),
+        )
+
+    def get(self, name: str) -> ProtoField | None:
+        """Return a field by proto name or camelCase JSON name.
+
+        Args:
+            name: Field name, e.g. "allocated_storage_gb" or "allocatedStorageGb"
+
+        Returns:
+            The field, or None if the schema has no such field
+
+        """
+        field = self.by_name.get(name)
+        return field if field is not None else self.by_alias.get(name)
+
+    def rendered(self, key: str, render: Callable[["IndexedSchema"], str]) -> str:
+        """Return a text rendering of the schema, rendering it once per schema.
+
+        Schemas are immutable and a hot-swapped schema version comes with a new
+        IndexedSchema, so renderings never go stale.
+
+        Args:
+            key: Identifies the rendering (e.g. "required_fields")
+            render: Renders the schema; called on first use of key only
+
+        Returns:
+            The rendered text
+
+        """
+        return self.derived(f"rendering:{key}", render)
+
+    def derived(self, key: str, build: Callable[["IndexedSchema"], _T]) -> _T:
+        """Return a value computed from the schema, computing it once per schema.
+
+        Args:
+            key: Identifies the value (e.g. "local_rules")
+            build: Computes the value; called on first use of key only
+
+        Returns:
+            The computed value
+
+        """
+        value = self._derived.get(key)
+        if value is None:
+            value = build(self)
+            self._derived[key] = value
+        return value
+
+
+def spec_message_name(kind: str) -> str:
+    """Return the spec message of a cloud resource kind (e.g. "AwsRdsInstanceSpec")."""
+    return f"{kind}Spec"
+
+
 class ProtoSchemaLoader:
     """Loads and parses AWS RDS proto schema files."""
 
-    def __init__(self, read_file_func: Callable[[str], str] | None = None):
+    def __init__(
+        self,
+        read_file_func: Callable[[str], str] | None = None,
+        message_name: str = SPEC_MESSAGE_NAME,
+    ):
         """Initialize the schema loader.
 
         Args:
             read_file_func: Optional function to read files from filesystem.
                 If None, reads from local filesystem (backwards compatibility).
                 Should accept file_path (str) and return file contents (str).
+            message_name: Message in spec.proto holding the spec fields
 
         """
         self.read_file_func = read_file_func
+        self.message_name = message_name
         self.schema_dir = Path(__file__).parent / "protos"
-        self._spec_fields: list[ProtoField] | None = None
+        self._schema: IndexedSchema | None = None
+        self._parsed_files: dict[str, ProtoFile] = {}
 
     def _parse_proto_file(self, filename: str) -> str:
         """Read a proto file and return its contents."""
@@ -62,230 +238,174 @@ class ProtoSchemaLoader:
                 raise FileNotFoundError(f"Proto file not found: {filepath}")
             return filepath.read_text()
 
-    def _extract_field_description(self, lines: list[str], field_index: int) -> str:
-        """Extract field description from comments above the field."""
-        description_lines: list[str] = []
-        # Look backwards from the field line to find comments
-        i = field_index - 1
-        comment_block_started = False
-        
-        while i >= 0:
-            line = lines[i].strip()
-            if line.startswith("//"):
-                # Remove the // prefix and leading/trailing whitespace
-                desc = line[2:].strip()
-                if desc:  # Only add non-empty descriptions
-                    description_lines.insert(0, desc)
-                    comment_block_started = True
-                i -= 1
-            elif not line:
-                # Empty line - if we haven't seen comments yet, keep looking
-                # If we have seen comments, stop (end of comment block)
-                if comment_block_started:
-                    break
-                i -= 1
-            else:
-                # Non-comment, non-empty line - stop
-                break
-
-        return " ".join(description_lines)
-
-    def _parse_validation_rules(self, field_line: str) -> dict[str, Any]:
-        """Parse buf.validate rules from a field definition."""
+    def parse_proto_file(self, filename: str) -> ProtoFile:
+        """Parse a proto file into an AST, caching the result.
+
+        Args:
+            filename: Proto filename (e.g. "spec.proto")
+
+        Returns:
+            AST of the whole file, with all of its messages
+
+        Raises:
+            FileNotFoundError: If the file cannot be read
+            ProtoSyntaxError: If the file is not valid protobuf syntax
+
+        """
+        if filename not in self._parsed_files:
+            self._parsed_files[filename] = parse_proto(
+                self._parse_proto_file(filename), filename=filename
+            )
+        return self._parsed_files[filename]
+
+    def _parse_validation_rules(self, options: Mapping[str, Any]) -> dict[str, Any]:
+        """Extract buf.validate rules from the flattened options of a field."""
         rules: dict[str, Any] = {}
 
-        # Extract all (buf.validate.field).xxx patterns
-        # Handle both single and multiple validations in brackets
-        validation_pattern = r"\(buf\.validate\.field\)\.([^,\]]+)"
-        matches = re.findall(validation_pattern, field_line)
-
-        for match in matches:
-            # Parse different validation types
-            if "string.min_len" in match:
-                min_len_match = re.search(r"string\.min_len\s*=\s*(\d+)", match)
-                if min_len_match:
-                    rules["min_len"] = int(min_len_match.group(1))
-
-            if "string.pattern" in match:
-                pattern_match = re.search(r'string\.pattern\s*=\s*"([^"]+)"', match)
-                if pattern_match:
-                    rules["pattern"] = pattern_match.group(1)
-
-            if "string.const" in match:
-                const_match = re.search(r'string\.const\s*=\s*"([^"]+)"', match)
-                if const_match:
-                    rules["const"] = const_match.group(1)
-
-            if "int32.gt" in match:
-                gt_match = re.search(r"int32\.gt\s*=\s*(\d+)", match)
-                if gt_match:
-                    rules["greater_than"] = int(gt_match.group(1))
-
-            if "int32.gte" in match:
-                gte_match = re.search(r"int32\.gte\s*=\s*(\d+)", match)
-                if gte_match:
-                    rules["greater_than_or_equal"] = int(gte_match.group(1))
-
-            if "int32.lte" in match:
-                lte_match = re.search(r"int32\.lte\s*=\s*(\d+)", match)
-                if lte_match:
-                    rules["less_than_or_equal"] = int(lte_match.group(1))
-
-            if "required = true" in match:
+        for name, value in options.items():
+            if not name.startswith(_VALIDATE_FIELD_OPTION):
+                continue
+            path = name[len(_VALIDATE_FIELD_OPTION):].split(".")
+
+            if path == ["required"] and value is True:
                 rules["required"] = True
+            elif len(path) != 2:
+                continue
+            elif path[0] == "string" and path[1] in _STRING_RULES:
+                rules[_STRING_RULES[path[1]]] = value
+            elif path[0] in _NUMERIC_TYPES and path[1] in _NUMERIC_RULES:
+                rules[_NUMERIC_RULES[path[1]]] = value
 
         return rules
 
-    def _parse_foreign_key_info(self, field_line: str) -> dict[str, Any] | None:
-        """Parse foreign key annotations from a field definition."""
+    def _parse_foreign_key_info(self, options: Mapping[str, Any]) -> dict[str, Any] | None:
+        """Extract foreign key annotations from the flattened options of a field."""
         fk_info: dict[str, Any] = {}
 
-        # Look for default_kind annotation
-        kind_pattern = r"\(project\.planton\.shared\.foreignkey\.v1\.default_kind\)\s*=\s*(\w+)"
-        kind_match = re.search(kind_pattern, field_line)
-        if kind_match:
-            fk_info["default_kind"] = kind_match.group(1)
-
-        # Look for default_kind_field_path annotation
-        path_pattern = r'\(project\.planton\.shared\.foreignkey\.v1\.default_kind_field_path\)\s*=\s*"([^"]+)"'
-        path_match = re.search(path_pattern, field_line)
-        if path_match:
-            fk_info["default_field_path"] = path_match.group(1)
+        for name, value in options.items():
+            if name.endswith(_FOREIGN_KEY_KIND_OPTION):
+                fk_info["default_kind"] = value
+            elif name.endswith(_FOREIGN_KEY_FIELD_PATH_OPTION):
+                fk_info["default_field_path"] = value
 
         return fk_info if fk_info else None
 
+    def _to_proto_field(self, field_def: FieldDef) -> ProtoField:
+        """Convert a parsed field into a ProtoField."""
+        options = field_def.option_values()
+        validation_rules = self._parse_validation_rules(options)
+        fk_info = self._parse_foreign_key_info(options)
+
+        # Determine if required
+        required = validation_rules.get("required", False)
+        # Also check if min_len is set for strings (indicates required)
+        if not required and "min_len" in validation_rules:
+            required = True
+
+        return ProtoField(
+            name=field_def.name,
+            field_type=field_def.type,
+            field_number=field_def.number,
+            required=required,
+            description=field_def.comment,
+            validation_rules=MappingProxyType(validation_rules),
+            foreign_key_info=MappingProxyType(fk_info) if fk_info is not None else None,
+            is_repeated=field_def.is_repeated,
+        )
+
     def _parse_spec_fields(self) -> list[ProtoField]:
         """Parse the spec.proto file to extract field definitions."""
-        spec_content = self._parse_proto_file("spec.proto")
-        lines = spec_content.split("\n")
-        fields = []
-
-        # Find the AwsRdsInstanceSpec message
-        in_message = False
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            if "message AwsRdsInstanceSpec" in line:
-                in_message = True
-                i += 1
-                continue
+        message = self.parse_proto_file("spec.proto").find_message(self.message_name)
+        if message is None:
+            return []
+        return [self._to_proto_field(field_def) for field_def in message.fields]
 
-            if in_message:
-                # End of message
-                if line.strip() == "}":
-                    break
-
-                # Skip empty lines and comments
-                if not line.strip() or line.strip().startswith("//"):
-                    i += 1
-                    continue
-
-                # Skip option lines
-                if line.strip().startswith("option"):
-                    i += 1
-                    continue
-
-                # Parse field definition
-                # Format: [repeated] type name = number [annotations];
-                field_match = re.match(
-                    r"\s*(repeated\s+)?(\S+)\s+(\w+)\s*=\s*(\d+)(.*)$", line
-                )
-                if field_match:
-                    is_repeated = bool(field_match.group(1))
-                    field_type = field_match.group(2)
-                    field_name = field_match.group(3)
-                    field_number = int(field_match.group(4))
-                    field_match.group(5)
-
-                    # Collect multi-line field definition
-                    # Continue reading lines until we find the closing semicolon or bracket
-                    full_field = line
-                    j = i + 1
-                    while j < len(lines) and '];' not in full_field:
-                        next_line = lines[j]
-                        # Stop at empty line or new field
-                        if not next_line.strip() or re.match(r'\s*(repeated\s+)?\S+\s+\w+\s*=', next_line):
-                            break
-                        full_field += " " + next_line.strip()
-                        j += 1
-
-                    # Get description from comments above
-                    description = self._extract_field_description(lines, i)
-
-                    # Parse validation rules from full field definition
-                    validation_rules = self._parse_validation_rules(full_field)
-
-                    # Parse foreign key info from full field definition
-                    fk_info = self._parse_foreign_key_info(full_field)
-
-                    # Determine if required
-                    required = validation_rules.get("required", False)
-                    # Also check if min_len is set for strings (indicates required)
-                    if not required and "min_len" in validation_rules:
-                        required = True
-
-                    field = ProtoField(
-                        name=field_name,
-                        field_type=field_type,
-                        field_number=field_number,
-                        required=required,
-                        description=description,
-                        validation_rules=validation_rules,
-                        foreign_key_info=fk_info,
-                        is_repeated=is_repeated,
-                    )
-                    fields.append(field)
-            
-            i += 1
-
-        return fields
-
-    def load_spec_schema(self) -> list[ProtoField]:
+    def set_spec_fields(self, fields: Iterable[ProtoField]) -> None:
+        """Use already parsed spec fields (e.g. from the schema cache) instead of parsing.
+
+        Args:
+            fields: Spec fields in declaration order
+
+        """
+        self._schema = IndexedSchema.from_fields(fields)
+
+    def load_indexed_schema(self) -> IndexedSchema:
+        """Load the spec schema once and return it indexed."""
+        if self._schema is None:
+            self._schema = IndexedSchema.from_fields(self._parse_spec_fields())
+        return self._schema
+
+    def load_spec_schema(self) -> tuple[ProtoField, ...]:
         """Load and return all fields from the spec schema."""
-        if self._spec_fields is None:
-            fields = self._parse_spec_fields()
-            self._spec_fields = fields
-        return self._spec_fields
+        return self.load_indexed_schema().fields
 
-    def get_required_fields(self) -> list[ProtoField]:
+    def get_required_fields(self) -> tuple[ProtoField, ...]:
         """Return only required fields from the spec."""
-        all_fields = self.load_spec_schema()
-        return [f for f in all_fields if f.required]
+        return self.load_indexed_schema().required
 
-    def get_optional_fields(self) -> list[ProtoField]:
+    def get_optional_fields(self) -> tuple[ProtoField, ...]:
         """Return only optional fields from the spec."""
-        all_fields = self.load_spec_schema()
-        return [f for f in all_fields if not f.required]
+        return self.load_indexed_schema().optional
 
     def get_field_by_name(self, field_name: str) -> ProtoField | None:
-        """Get a specific field by name."""
-        all_fields = self.load_spec_schema()
-        for field in all_fields:
-            if field.name == field_name:
-                return field
-        return None
+        """Get a specific field by proto name or camelCase JSON name."""
+        return self.load_indexed_schema().get(field_name)
 
 
 # Global instance for easy access
 _loader = None
 
 
-def get_schema_loader(read_file_func: Callable[[str], str] | None = None) -> ProtoSchemaLoader:
-    """Get the global schema loader instance.
+def get_schema_loader(
+    read_file_func: Callable[[str], str] | None = None,
+    kind: str = DEFAULT_SCHEMA_KIND,
+) -> ProtoSchemaLoader:
+    """Get the schema loader of a cloud resource kind.
+
+    Inside pin_schema_version, returns the loader of the pinned schema version.
+    Otherwise the loader comes from the schema registry (see registry.py),
+    which fetches and publishes kinds other than AwsRdsInstance on first use.
 
     Args:
         read_file_func: Optional function to read files from filesystem.
-            If None and loader not yet initialized, creates loader with local filesystem.
-            If provided, creates new loader with this function.
+            If provided, returns a new loader reading with this function; the
+            global loader is left unchanged (use set_schema_loader to replace it).
+        kind: Cloud resource kind (e.g. "AwsRdsInstance")
 
     Returns:
         ProtoSchemaLoader instance.
 
+    Raises:
+        RepositoryFetchError: If the protos of a kind fetched on first use
+            cannot be fetched
+
+    """
+    if read_file_func is not None:
+        return ProtoSchemaLoader(read_file_func, message_name=spec_message_name(kind))
+    pinned = (_pinned_schemas.get() or {}).get(kind)
+    if pinned is not None:
+        return pinned.loader
+
+    from .registry import get_schema_registry
+
+    return get_schema_registry().get_loader(kind)
+
+
+def default_schema_loader() -> ProtoSchemaLoader:
+    """Get the global AwsRdsInstance schema loader instance.
+
+    Returns:
+        The loader of the current AwsRdsInstance schema version. If none was
+        published or set, creates a loader reading the installed stubs (see
+        descriptor_loader.py), or the local filesystem if the stubs are not
+        installed.
+
     """
     global _loader
-    if _loader is None or read_file_func is not None:
-        _loader = ProtoSchemaLoader(read_file_func)
+    if _loader is None:
+        from .descriptor_loader import load_descriptor_schema_loader
+
+        _loader = load_descriptor_schema_loader() or ProtoSchemaLoader()
     return _loader
 
 
@@ -299,3 +419,213 @@ def set_schema_loader(loader: ProtoSchemaLoader) -> None:
     global _loader
     _loader = loader
 
+
+@dataclass(frozen=True)
+class SchemaVersion:
+    """An immutable, fully parsed version of the proto schema.
+
+    Attributes:
+        version: Content digest of the proto files; equal contents give equal versions
+        source: Where the files came from (e.g. the repository commit SHA)
+        proto_contents: Mapping of proto filename to file content
+        loader: Schema loader that has already parsed proto_contents
+        kind: Cloud resource kind of the schema
+
+    """
+
+    version: str
+    source: str
+    proto_contents: Mapping[str, str]
+    loader: ProtoSchemaLoader
+    kind: str = DEFAULT_SCHEMA_KIND
+
+
+# Published schema versions of all kinds, oldest first; the last entry of a
+# kind is its current version
+_schema_versions: OrderedDict[str, SchemaVersion] = OrderedDict()
+_schema_versions_lock = threading.Lock()
+
+# Schema versions pinned by the running request, by kind (see pin_schema_version)
+_pinned_schemas: ContextVar[Mapping[str, SchemaVersion] | None] = ContextVar(
+    "pinned_schemas", default=None
+)
+
+
+def schema_version_digest(
+    proto_contents: Mapping[str, str],
+    kind: str = DEFAULT_SCHEMA_KIND,
+) -> str:
+    """Return the version identifier of a set of proto files.
+
+    Args:
+        proto_contents: Mapping of proto filename to file content
+        kind: Cloud resource kind the files are parsed for
+
+    Returns:
+        Short SHA-256 digest over the sorted filenames and contents, and the
+        kind unless it is AwsRdsInstance
+
+    """
+    digest = hashlib.sha256()
+    if kind != DEFAULT_SCHEMA_KIND:
+        digest.update(kind.encode("utf-8") + b"\0")
+    for filename in sorted(proto_contents):
+        digest.update(filename.encode("utf-8") + b"\0")
+        digest.update(proto_contents[filename].encode("utf-8") + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def publish_schema(
+    proto_contents: Mapping[str, str],
+    source: str = "",
+    loader: ProtoSchemaLoader | None = None,
+    kind: str = DEFAULT_SCHEMA_KIND,
+) -> SchemaVersion:
+    """Parse proto files and atomically make them the current schema version of a kind.
+
+    The files are parsed before the swap, so a schema that fails to parse never
+    becomes current. Parsed fields are kept in the on-disk schema cache (see
+    cache.py), so contents parsed before, by any process, are not parsed again.
+    Publishing contents identical to the current version is a no-op that
+    returns the current version.
+
+    With a loader (e.g. the DescriptorSchemaLoader of the installed stubs),
+    the schema is read from it instead; the proto files then only identify
+    the version and are served to threads as they are.
+
+    Args:
+        proto_contents: Mapping of proto filename to file content
+        source: Where the files came from (e.g. the repository commit SHA)
+        loader: Loader to read the schema from instead of parsing proto_contents
+        kind: Cloud resource kind whose spec message is read
+
+    Returns:
+        The current schema version of the kind after publishing
+
+    Raises:
+        Exception: Any error raised while parsing the proto files
+
+    """
+    contents = MappingProxyType(dict(proto_contents))
+    version = schema_version_digest(contents, kind)
+
+    current = current_schema_version(kind)
+    if current is not None and current.version == version:
+        return current
+
+    def read_from_contents(file_path: str) -> str:
+        filename = file_path.split("/")[-1]
+        if filename in contents:
+            return contents[filename]
+        raise ValueError(f"Proto file not found in schema version {version}: {filename}")
+
+    if loader is None:
+        loader = ProtoSchemaLoader(read_file_func=read_from_contents, message_name=spec_message_name(kind))
+        _load_spec_fields(loader, version)
+    else:
+        loader.load_spec_schema()
+    schema = SchemaVersion(
+        version=version,
+        source=source,
+        proto_contents=contents,
+        loader=loader,
+        kind=kind,
+    )
+
+    global _loader
+    with _schema_versions_lock:
+        _schema_versions.pop(version, None)
+        _schema_versions[version] = schema
+        retained = [key for key, value in _schema_versions.items() if value.kind == kind]
+        for stale in retained[:-MAX_RETAINED_SCHEMA_VERSIONS]:
+            del _schema_versions[stale]
+        if kind == DEFAULT_SCHEMA_KIND:
+            _loader = loader
+
+    logger.info(
+        f"Published {kind} proto schema version {version} (source: {source or 'unknown'})"
+    )
+    return schema
+
+
+def _load_spec_fields(loader: ProtoSchemaLoader, version: str) -> None:
+    """Load the spec fields of a schema version from the schema cache, or parse and cache them."""
+    from .cache import get_schema_cache
+
+    cache = get_schema_cache()
+    cached = cache.load(version) if cache is not None else None
+    if cached is not None:
+        loader.set_spec_fields(cached)
+        logger.info(f"Loaded proto schema version {version} from the schema cache")
+        return
+
+    fields = loader.load_spec_schema()
+    if cache is not None:
+        cache.save(version, fields)
+
+
+def current_schema_version(kind: str = DEFAULT_SCHEMA_KIND) -> SchemaVersion | None:
+    """Return the most recently published schema version of a kind, or None if none was published."""
+    with _schema_versions_lock:
+        return next(
+            (schema for schema in reversed(_schema_versions.values()) if schema.kind == kind),
+            None,
+        )
+
+
+def active_schema_version(kind: str = DEFAULT_SCHEMA_KIND) -> SchemaVersion | None:
+    """Return the schema version of a kind pinned by the running request, or else the current one."""
+    pinned = (_pinned_schemas.get() or {}).get(kind)
+    return pinned if pinned is not None else current_schema_version(kind)
+
+
+def discard_schema_versions(kind: str) -> None:
+    """Forget the published schema versions of a kind.
+
+    Requests that pinned one of them keep using it; others get the kind's
+    schema published again.
+
+    Args:
+        kind: Cloud resource kind
+
+    """
+    with _schema_versions_lock:
+        for version in [key for key, value in _schema_versions.items() if value.kind == kind]:
+            del _schema_versions[version]
+
+
+def get_schema_version(version: str) -> SchemaVersion | None:
+    """Return a retained schema version by its identifier.
+
+    Args:
+        version: Version identifier (SchemaVersion.version)
+
+    Returns:
+        The schema version, or None if it was never published in this process
+        or has been evicted
+
+    """
+    with _schema_versions_lock:
+        return _schema_versions.get(version)
+
+
+@contextmanager
+def pin_schema_version(schema: SchemaVersion) -> Iterator[SchemaVersion]:
+    """Make get_schema_loader return *schema* for its kind for the duration of the block.
+
+    The pin is stored in a context variable, so it applies to the current
+    thread or task (and work started from it) while other requests keep
+    seeing their own version. Pins of other kinds are kept.
+
+    Args:
+        schema: Schema version to pin
+
+    Yields:
+        The pinned schema version
+
+    """
+    token = _pinned_schemas.set({**(_pinned_schemas.get() or {}), schema.kind: schema})
+    try:
+        yield schema
+    finally:
+        _pinned_schemas.reset(token)
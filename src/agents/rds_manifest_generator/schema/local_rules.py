@@ -0,0 +1,231 @@
+"""In-process checks of the simple buf.validate rules of spec fields.
+
+The loader extracts each field's min_len, pattern, const, gt, gte and lte
+rules (see ProtoField.validation_rules). LocalRules compiles them once per
+schema, with precompiled regexes and numeric bounds, so a value can be
+checked without building a proto message or evaluating CEL:
+
+    rules = get_local_rules(get_schema_loader().load_indexed_schema())
+    rules.check_value("allocated_storage_gb", 0)
+    # ['allocated_storage_gb: value must be greater than 0 and less than or equal to 65536']
+
+Messages mirror protovalidate's, so a violation found locally reads the
+same as one found by protovalidate. Only values of the rule's type are
+checked; anything else (wrong types, required fields, CEL rules) is left to
+protovalidate, which remains the authority on whether a manifest is valid.
+
+get_stub_rules compiles the rules of the installed AwsRdsInstance stubs,
+the same descriptors protovalidate validates against, so both agree on
+every rule checked here.
+"""
+
+import logging
+import re
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from .descriptor_loader import load_descriptor_schema_loader
+from .loader import IndexedSchema, ProtoField
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class FieldRules:
+    """The compiled simple rules of one field.
+
+    Attributes:
+        name: Proto field name
+        min_len: Minimum string length, in characters
+        pattern: Regex a string must contain a match of
+        const: Exact string value
+        gt: Exclusive lower bound of a number
+        gte: Inclusive lower bound of a number
+        lte: Inclusive upper bound of a number
+
+    """
+
+    name: str
+    min_len: int | None = None
+    pattern: re.Pattern[str] | None = None
+    const: str | None = None
+    gt: int | float | None = None
+    gte: int | float | None = None
+    lte: int | float | None = None
+
+    @classmethod
+    def from_field(cls, field: ProtoField) -> "FieldRules | None":
+        """Compile the simple rules of a field.
+
+        Args:
+            field: Schema field
+
+        Returns:
+            The compiled rules, or None if the field has none that apply to
+            single values
+
+        """
+        rules = field.validation_rules
+        if field.is_repeated or not rules.keys() - {"required"}:
+            return None
+
+        pattern = None
+        if "pattern" in rules:
+            try:
+                pattern = re.compile(rules["pattern"])
+            except re.error as e:
+                # RE2 syntax Python does not support; protovalidate checks it
+                logger.debug(f"Not checking pattern of {field.name} locally: {e}")
+
+        return cls(
+            name=field.name,
+            min_len=rules.get("min_len"),
+            pattern=pattern,
+            const=rules.get("const"),
+            gt=rules.get("greater_than"),
+            gte=rules.get("greater_than_or_equal"),
+            lte=rules.get("less_than_or_equal"),
+        )
+
+    def check(self, value: Any) -> list[str]:
+        """Check a value against the rules.
+
+        Args:
+            value: Field value, as in a manifest dict
+
+        Returns:
+            Violation messages, empty if the value passes
+
+        """
+        if isinstance(value, str):
+            return self._check_string(value)
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            return self._check_number(value)
+        return []
+
+    def _check_string(self, value: str) -> list[str]:
+        """Check a string value against the string rules."""
+        violations: list[str] = []
+        if self.const is not None and value != self.const:
+            violations.append(f"value must equal `{self.const}`")
+        if self.min_len is not None and len(value) < self.min_len:
+            violations.append(f"value length must be at least {self.min_len} characters")
+        if self.pattern is not None and self.pattern.search(value) is None:
+            violations.append(f"value does not match regex pattern `{self.pattern.pattern}`")
+        return violations
+
+    def _check_number(self, value: int | float) -> list[str]:
+        """Check a number against the numeric bounds."""
+        lower, below = None, False
+        if self.gt is not None:
+            lower = f"greater than {self.gt}"
+            below = value <= self.gt
+        elif self.gte is not None:
+            lower = f"greater than or equal to {self.gte}"
+            below = value < self.gte
+
+        if self.lte is None:
+            return [f"value must be {lower}"] if below else []
+
+        upper = f"less than or equal to {self.lte}"
+        if lower is not None:
+            # Ranges are reported as one violation, as protovalidate does
+            if below or value > self.lte:
+                return [f"value must be {lower} and {upper}"]
+            return []
+        return [f"value must be {upper}"] if value > self.lte else []
+
+
+class LocalRules:
+    """The compiled simple rules of every field of a schema."""
+
+    def __init__(self, schema: IndexedSchema):
+        """Compile the rules of a schema.
+
+        Args:
+            schema: Indexed spec schema
+
+        """
+        self._schema = schema
+        self._rules: Mapping[str, FieldRules] = MappingProxyType({
+            field.name: rules
+            for field in schema.fields
+            if (rules := FieldRules.from_field(field)) is not None
+        })
+
+    def check_value(self, field_name: str, value: Any) -> list[str]:
+        """Check a candidate value of one field.
+
+        Args:
+            field_name: Proto field name or camelCase JSON name
+            value: Candidate value
+
+        Returns:
+            Violations as "field: message", empty if the value passes or the
+            field is unknown
+
+        """
+        field = self._schema.get(field_name)
+        rules = self._rules.get(field.name) if field is not None else None
+        if rules is None:
+            return []
+        return [f"{rules.name}: {message}" for message in rules.check(value)]
+
+    def check_spec(self, spec: Mapping[str, Any], path: str = "spec") -> list[str]:
+        """Check every value of a spec dict.
+
+        Args:
+            spec: Spec as a dict, with proto or camelCase JSON field names
+            path: Path of the spec in the manifest, prefixed to field names
+
+        Returns:
+            Violations as "path.field: message", empty if all values pass
+
+        """
+        violations: list[str] = []
+        for name, value in spec.items():
+            violations.extend(
+                f"{path}.{violation}" for violation in self.check_value(name, value)
+            )
+        return violations
+
+
+def get_local_rules(schema: IndexedSchema) -> LocalRules:
+    """Get the compiled rules of a schema, compiling them on first use.
+
+    Args:
+        schema: Indexed spec schema
+
+    Returns:
+        LocalRules of the schema, shared by all callers
+
+    """
+    return schema.derived("local_rules", LocalRules)
+
+
+# Global instance for easy access
+_stub_rules: LocalRules | None = None
+_stub_rules_loaded = False
+_stub_rules_lock = threading.Lock()
+
+
+def get_stub_rules() -> LocalRules | None:
+    """Get the compiled rules of the installed AwsRdsInstance stubs.
+
+    Returns:
+        LocalRules of the stubs' spec message, or None if the stubs are not
+        installed
+
+    """
+    global _stub_rules, _stub_rules_loaded
+    with _stub_rules_lock:
+        if not _stub_rules_loaded:
+            # Missing stubs are remembered too, so they are looked up only once
+            loader = load_descriptor_schema_loader()
+            if loader is not None:
+                _stub_rules = get_local_rules(loader.load_indexed_schema())
+            _stub_rules_loaded = True
+        return _stub_rules
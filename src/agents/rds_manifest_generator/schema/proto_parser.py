@@ -0,0 +1,834 @@
+"""Lexer and parser producing an AST for a whole .proto file.
+
+The parser reads a file in a single pass over its tokens, so parsing time is
+linear in the file size. It understands the parts of the protobuf language
+that schema queries need:
+
+- messages (including nested messages), enums, oneofs and map fields
+- field labels, types, numbers and options, including aggregate option
+  values such as ``(buf.validate.field).cel = {id: "..." expression: "..."}``
+- file and message level options
+
+Leading comments are attached to messages, enums, fields and enum values.
+Services, extensions, reserved ranges and groups are skipped.
+
+    proto = parse_proto(source, filename="spec.proto")
+    message = proto.find_message("AwsRdsInstanceSpec")
+    for field in message.fields:
+        print(field.name, field.type, field.comment, field.option_values())
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple, NoReturn
+
+
+class ProtoSyntaxError(ValueError):
+    """Raised when a .proto file cannot be parsed."""
+
+    def __init__(self, message: str, filename: str, line: int):
+        """Initialize the error.
+
+        Args:
+            message: Description of the problem
+            filename: Name of the parsed file
+            line: 1-based line number of the problem
+
+        """
+        super().__init__(f"{filename or '<proto>'}:{line}: {message}")
+        self.filename = filename
+        self.line = line
+
+
+@dataclass(frozen=True)
+class ProtoOption:
+    """An option set on a file, message, field, enum or enum value.
+
+    Attributes:
+        name: Normalized option name, e.g. "(buf.validate.field).string.min_len"
+        value: Parsed value: str, int, float, bool, an enum value name (str),
+            or a dict for aggregate values
+
+    """
+
+    name: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class FieldDef:
+    """A field of a message.
+
+    Attributes:
+        name: Field name
+        type: Field type as written (e.g. "string", "foo.v1.Bar", "map<string, string>")
+        number: Field number
+        label: "repeated", "optional", "required" or None
+        options: Field options in declaration order
+        comment: Leading comment, joined into one line
+        oneof: Name of the enclosing oneof, if any
+        key_type: Key type of a map field
+        value_type: Value type of a map field
+        line: 1-based line number of the declaration
+
+    """
+
+    name: str
+    type: str
+    number: int
+    label: str | None = None
+    options: tuple[ProtoOption, ...] = ()
+    comment: str = ""
+    oneof: str | None = None
+    key_type: str | None = None
+    value_type: str | None = None
+    line: int = 0
+
+    @property
+    def is_repeated(self) -> bool:
+        """Return whether the field is a repeated field."""
+        return self.label == "repeated"
+
+    @property
+    def is_map(self) -> bool:
+        """Return whether the field is a map field."""
+        return self.key_type is not None
+
+    def option_values(self) -> dict[str, Any]:
+        """Return the field options flattened to dotted names (see flatten_options)."""
+        return flatten_options(self.options)
+
+
+@dataclass(frozen=True)
+class OneofDef:
+    """A oneof of a message.
+
+    Attributes:
+        name: Oneof name
+        fields: Names of the fields in the oneof
+        options: Oneof options
+        comment: Leading comment
+
+    """
+
+    name: str
+    fields: tuple[str, ...]
+    options: tuple[ProtoOption, ...] = ()
+    comment: str = ""
+
+
+@dataclass(frozen=True)
+class EnumValueDef:
+    """A value of an enum.
+
+    Attributes:
+        name: Value name
+        number: Value number
+        options: Value options
+        comment: Leading comment
+
+    """
+
+    name: str
+    number: int
+    options: tuple[ProtoOption, ...] = ()
+    comment: str = ""
+
+
+@dataclass(frozen=True)
+class EnumDef:
+    """An enum definition.
+
+    Attributes:
+        name: Enum name
+        full_name: Name qualified with the package and enclosing messages
+        values: Enum values in declaration order
+        options: Enum options
+        comment: Leading comment
+
+    """
+
+    name: str
+    full_name: str
+    values: tuple[EnumValueDef, ...]
+    options: tuple[ProtoOption, ...] = ()
+    comment: str = ""
+
+
+@dataclass(frozen=True)
+class MessageDef:
+    """A message definition.
+
+    Attributes:
+        name: Message name
+        full_name: Name qualified with the package and enclosing messages
+        fields: Fields in declaration order, including oneof members
+        oneofs: Oneofs of the message
+        messages: Nested messages
+        enums: Nested enums
+        options: Message options
+        comment: Leading comment
+
+    """
+
+    name: str
+    full_name: str
+    fields: tuple[FieldDef, ...] = ()
+    oneofs: tuple[OneofDef, ...] = ()
+    messages: tuple["MessageDef", ...] = ()
+    enums: tuple[EnumDef, ...] = ()
+    options: tuple[ProtoOption, ...] = ()
+    comment: str = ""
+
+    def field(self, name: str) -> FieldDef | None:
+        """Return a field by name, or None if the message has no such field."""
+        for field_def in self.fields:
+            if field_def.name == name:
+                return field_def
+        return None
+
+
+@dataclass(frozen=True)
+class ProtoFile:
+    """AST of a whole .proto file.
+
+    Attributes:
+        filename: Name the file was parsed under
+        syntax: Value of the syntax (or edition) statement
+        package: Package name
+        imports: Imported file paths
+        options: File options
+        messages: Top-level messages
+        enums: Top-level enums
+
+    """
+
+    filename: str = ""
+    syntax: str = ""
+    package: str = ""
+    imports: tuple[str, ...] = ()
+    options: tuple[ProtoOption, ...] = ()
+    messages: tuple[MessageDef, ...] = ()
+    enums: tuple[EnumDef, ...] = ()
+    _messages_by_name: dict[str, MessageDef] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """Index all messages by simple and full name."""
+        for message in self.iter_messages():
+            self._messages_by_name.setdefault(message.name, message)
+            self._messages_by_name[message.full_name] = message
+
+    def iter_messages(self) -> Iterator[MessageDef]:
+        """Yield all messages of the file, nested messages after their parent."""
+        stack = list(reversed(self.messages))
+        while stack:
+            message = stack.pop()
+            yield message
+            stack.extend(reversed(message.messages))
+
+    def find_message(self, name: str) -> MessageDef | None:
+        """Return a message by simple or fully qualified name.
+
+        Args:
+            name: Message name, e.g. "AwsRdsInstanceSpec" or
+                "org.project_planton.provider.aws.awsrdsinstance.v1.AwsRdsInstanceSpec"
+
+        Returns:
+            The message, or None if the file defines no such message
+
+        """
+        return self._messages_by_name.get(name.lstrip("."))
+
+
+def flatten_options(options: tuple[ProtoOption, ...]) -> dict[str, Any]:
+    """Flatten options to a mapping of dotted option names to values.
+
+    Aggregate values are expanded, so ``(buf.validate.field).string = {min_len: 1}``
+    and ``(buf.validate.field).string.min_len = 1`` both give
+    ``{"(buf.validate.field).string.min_len": 1}``. Options set more than once
+    (e.g. several ``cel`` rules) map to a list of their values.
+
+    Args:
+        options: Options in declaration order
+
+    Returns:
+        Mapping of option name to value
+
+    """
+    flat: dict[str, Any] = {}
+    for option in options:
+        _flatten_into(flat, option.name, option.value)
+    return flat
+
+
+def _flatten_into(flat: dict[str, Any], name: str, value: Any) -> None:
+    """Add an option value to flat, expanding aggregate values."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten_into(flat, f"{name}.{key}", item)
+        return
+    if name not in flat:
+        flat[name] = value
+    elif isinstance(flat[name], list):
+        flat[name].append(value)
+    else:
+        flat[name] = [flat[name], value]
+
+
+# -- Lexer -----------------------------------------------------------------
+
+
+class _Token(NamedTuple):
+    """A lexical token; comments span start_line to line."""
+
+    kind: str
+    value: str
+    line: int
+    start_line: int
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<newline>\n)
+    | (?P<space>[ \t\r\f\v]+)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*.*?\*/)
+    | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?)
+    | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<symbol>[{}\[\]()<>;,=.:+-])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_ESCAPES = {
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "?": "?",
+}
+
+_ESCAPE_RE = re.compile(r"\\(x[0-9a-fA-F]{1,2}|[0-7]{1,3}|.)", re.DOTALL)
+
+
+def _tokenize(source: str, filename: str) -> list[_Token]:
+    """Split source into tokens, dropping whitespace and keeping comments."""
+    tokens: list[_Token] = []
+    line = 1
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN_RE.match(source, pos)
+        if match is None:
+            raise ProtoSyntaxError(f"Unexpected character {source[pos]!r}", filename, line)
+        kind = match.lastgroup
+        text = match.group()
+        pos = match.end()
+        if kind == "newline":
+            line += 1
+        elif kind == "space":
+            continue
+        elif kind == "line_comment":
+            tokens.append(_Token("comment", text[2:].strip(), line, line))
+        elif kind == "block_comment":
+            end_line = line + text.count("\n")
+            tokens.append(_Token("comment", _block_comment_text(text), end_line, line))
+            line = end_line
+        else:
+            tokens.append(_Token(kind or "", text, line, line))
+    tokens.append(_Token("eof", "", line, line))
+    return tokens
+
+
+def _block_comment_text(text: str) -> str:
+    """Return the text of a /* */ comment without delimiters and leading stars."""
+    lines = [part.strip().lstrip("*").strip() for part in text[2:-2].split("\n")]
+    return " ".join(part for part in lines if part)
+
+
+def _unescape(literal: str) -> str:
+    """Return the value of a quoted string literal."""
+
+    def replace(match: re.Match[str]) -> str:
+        escape = match.group(1)
+        if escape[0] in "xX" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        if escape[0].isdigit():
+            return chr(int(escape, 8))
+        return _ESCAPES.get(escape, escape)
+
+    return _ESCAPE_RE.sub(replace, literal[1:-1])
+
+
+# -- Parser ----------------------------------------------------------------
+
+# Statements skipped inside files and messages, up to ";" or a matching block
+_SKIPPED_STATEMENTS = frozenset({"service", "extend", "reserved", "extensions", "group"})
+
+
+class _Parser:
+    """Recursive-descent parser over the token list of one file."""
+
+    def __init__(self, source: str, filename: str):
+        self._filename = filename
+        self._tokens = _tokenize(source, filename)
+        self._pos = 0
+        # Line of the last consumed non-comment token, to tell trailing comments apart
+        self._last_line = 0
+        self._comments: list[_Token] = []
+        self._package = ""
+
+    # Token access
+
+    def _peek(self, offset: int = 0) -> _Token:
+        """Return an upcoming non-comment token, collecting skipped comments."""
+        while self._tokens[self._pos].kind == "comment":
+            self._comments.append(self._tokens[self._pos])
+            self._pos += 1
+        if offset == 0:
+            return self._tokens[self._pos]
+        index = self._pos
+        for _ in range(offset):
+            index += 1
+            while self._tokens[index].kind == "comment":
+                index += 1
+        return self._tokens[index]
+
+    def _next(self) -> _Token:
+        """Consume and return the next non-comment token."""
+        token = self._peek()
+        if token.kind != "eof":
+            self._pos += 1
+        self._last_line = token.line
+        self._comments = []
+        return token
+
+    def _is(self, value: str, offset: int = 0) -> bool:
+        """Return whether an upcoming token is the given symbol or keyword."""
+        token = self._peek(offset)
+        return token.kind in ("symbol", "ident") and token.value == value
+
+    def _accept(self, value: str) -> bool:
+        """Consume the next token if it is the given symbol or keyword."""
+        if self._is(value):
+            self._next()
+            return True
+        return False
+
+    def _expect(self, value: str) -> _Token:
+        """Consume the next token, which must be the given symbol or keyword."""
+        if not self._is(value):
+            self._error(f"Expected {value!r}")
+        return self._next()
+
+    def _error(self, message: str) -> NoReturn:
+        """Raise a syntax error at the next token."""
+        token = self._peek()
+        found = token.value or "end of file"
+        raise ProtoSyntaxError(f"{message}, found {found!r}", self._filename, token.line)
+
+    def _leading_comment(self) -> str:
+        """Return the comment block directly above the next declaration."""
+        self._peek()
+        comments = [c for c in self._comments if c.start_line != self._last_line]
+        if not comments:
+            return ""
+        block = [comments[-1]]
+        for comment in reversed(comments[:-1]):
+            if comment.line + 1 < block[0].start_line:
+                break
+            block.insert(0, comment)
+        return " ".join(comment.value for comment in block if comment.value)
+
+    # Basic elements
+
+    def _ident(self) -> str:
+        """Consume an identifier."""
+        token = self._peek()
+        if token.kind != "ident":
+            self._error("Expected identifier")
+        return self._next().value
+
+    def _full_ident(self) -> str:
+        """Consume a dotted identifier, optionally starting with a dot."""
+        parts = ["."] if self._accept(".") else []
+        parts.append(self._ident())
+        while self._is("."):
+            self._next()
+            parts.append(".")
+            parts.append(self._ident())
+        return "".join(parts)
+
+    def _int(self) -> int:
+        """Consume an integer, optionally negative."""
+        negative = self._accept("-")
+        token = self._peek()
+        if token.kind != "number":
+            self._error("Expected number")
+        value = _number(token.value)
+        if not isinstance(value, int):
+            self._error("Expected integer")
+        self._next()
+        return -value if negative else value
+
+    def _string(self) -> str:
+        """Consume one or more adjacent string literals."""
+        token = self._peek()
+        if token.kind != "string":
+            self._error("Expected string")
+        parts = []
+        while self._peek().kind == "string":
+            parts.append(_unescape(self._next().value))
+        return "".join(parts)
+
+    def _constant(self) -> Any:
+        """Consume a scalar constant or an aggregate value."""
+        token = self._peek()
+        if token.kind == "string":
+            return self._string()
+        if self._is("{"):
+            return self._aggregate("}")
+        if self._is("-") or self._is("+"):
+            sign = -1 if self._next().value == "-" else 1
+            value = self._constant()
+            if not isinstance(value, int | float) or isinstance(value, bool):
+                self._error("Expected number after sign")
+            return sign * value
+        if token.kind == "number":
+            self._next()
+            return _number(token.value)
+        if token.kind == "ident":
+            name = self._full_ident()
+            return {"true": True, "false": False, "inf": float("inf"), "nan": float("nan")}.get(
+                name, name
+            )
+        self._error("Expected value")
+
+    def _aggregate(self, closing: str) -> dict[str, Any]:
+        """Consume a text-format message value like {a: 1 b {c: "x"}}."""
+        self._next()
+        values: dict[str, Any] = {}
+        while not self._accept(closing):
+            if self._accept("["):
+                key = f"[{self._full_ident()}]"
+                self._expect("]")
+            else:
+                key = self._ident()
+            if self._accept(":"):
+                value = self._text_value()
+            elif self._is("{") or self._is("<"):
+                value = self._aggregate("}" if self._is("{") else ">")
+            else:
+                self._error("Expected ':' or message value")
+            if key not in values:
+                values[key] = value
+            elif isinstance(values[key], list):
+                values[key].append(value)
+            else:
+                values[key] = [values[key], value]
+            if not self._accept(","):
+                self._accept(";")
+        return values
+
+    def _text_value(self) -> Any:
+        """Consume a value inside an aggregate, including lists."""
+        if self._is("<"):
+            return self._aggregate(">")
+        if self._accept("["):
+            items = []
+            while not self._accept("]"):
+                items.append(self._text_value())
+                self._accept(",")
+            return items
+        return self._constant()
+
+    def _option_name(self) -> str:
+        """Consume an option name like (buf.validate.field).string.min_len."""
+        parts = []
+        while True:
+            if self._accept("("):
+                parts.append(f"({self._full_ident().lstrip('.')})")
+                self._expect(")")
+            else:
+                parts.append(self._ident())
+            if not self._accept("."):
+                return ".".join(parts)
+
+    def _option(self) -> ProtoOption:
+        """Consume "name = value"."""
+        name = self._option_name()
+        self._expect("=")
+        return ProtoOption(name, self._constant())
+
+    def _field_options(self) -> tuple[ProtoOption, ...]:
+        """Consume an optional [name = value, ...] list."""
+        if not self._accept("["):
+            return ()
+        options = [self._option()]
+        while self._accept(","):
+            options.append(self._option())
+        self._expect("]")
+        return tuple(options)
+
+    def _skip_statement(self) -> None:
+        """Skip a statement up to its ";" or the end of its block."""
+        depth = 0
+        while True:
+            token = self._next()
+            if token.kind == "eof":
+                raise ProtoSyntaxError("Unexpected end of file", self._filename, token.line)
+            if token.kind != "symbol":
+                continue
+            if token.value == "{":
+                depth += 1
+            elif token.value == "}":
+                depth -= 1
+                if depth == 0:
+                    return
+            elif token.value == ";" and depth == 0:
+                return
+
+    # Declarations
+
+    def parse_file(self) -> ProtoFile:
+        """Parse the whole file."""
+        syntax = ""
+        imports: list[str] = []
+        options: list[ProtoOption] = []
+        messages: list[MessageDef] = []
+        enums: list[EnumDef] = []
+        while self._peek().kind != "eof":
+            if self._accept(";"):
+                continue
+            comment = self._leading_comment()
+            keyword = self._peek()
+            if keyword.kind != "ident":
+                self._error("Expected declaration")
+            if keyword.value in ("syntax", "edition"):
+                self._next()
+                self._expect("=")
+                syntax = self._string()
+                self._expect(";")
+            elif keyword.value == "package":
+                self._next()
+                self._package = self._full_ident()
+                self._expect(";")
+            elif keyword.value == "import":
+                self._next()
+                if self._peek().kind == "ident":
+                    self._next()
+                imports.append(self._string())
+                self._expect(";")
+            elif keyword.value == "option":
+                self._next()
+                options.append(self._option())
+                self._expect(";")
+            elif keyword.value == "message":
+                messages.append(self._message(self._package, comment))
+            elif keyword.value == "enum":
+                enums.append(self._enum(self._package, comment))
+            elif keyword.value in _SKIPPED_STATEMENTS:
+                self._skip_statement()
+            else:
+                self._error("Expected declaration")
+        return ProtoFile(
+            filename=self._filename,
+            syntax=syntax,
+            package=self._package,
+            imports=tuple(imports),
+            options=tuple(options),
+            messages=tuple(messages),
+            enums=tuple(enums),
+        )
+
+    def _message(self, scope: str, comment: str) -> MessageDef:
+        """Parse "message Name { ... }"."""
+        self._expect("message")
+        name = self._ident()
+        full_name = f"{scope}.{name}" if scope else name
+        fields: list[FieldDef] = []
+        oneofs: list[OneofDef] = []
+        messages: list[MessageDef] = []
+        enums: list[EnumDef] = []
+        options: list[ProtoOption] = []
+        self._expect("{")
+        while not self._accept("}"):
+            if self._accept(";"):
+                continue
+            member_comment = self._leading_comment()
+            if self._is("message") and self._peek(1).kind == "ident":
+                messages.append(self._message(full_name, member_comment))
+            elif self._is("enum") and self._peek(1).kind == "ident":
+                enums.append(self._enum(full_name, member_comment))
+            elif self._is("oneof") and self._peek(1).kind == "ident":
+                oneof, oneof_fields = self._oneof(member_comment)
+                oneofs.append(oneof)
+                fields.extend(oneof_fields)
+            elif self._is("option"):
+                self._next()
+                options.append(self._option())
+                self._expect(";")
+            elif self._is("map") and self._is("<", 1):
+                fields.append(self._map_field(member_comment))
+            elif self._peek().value in _SKIPPED_STATEMENTS:
+                self._skip_statement()
+            elif self._peek().kind == "eof":
+                self._error(f"Unterminated message {name}")
+            else:
+                fields.append(self._field(member_comment))
+        return MessageDef(
+            name=name,
+            full_name=full_name,
+            fields=tuple(fields),
+            oneofs=tuple(oneofs),
+            messages=tuple(messages),
+            enums=tuple(enums),
+            options=tuple(options),
+            comment=comment,
+        )
+
+    def _field(self, comment: str, oneof: str | None = None) -> FieldDef:
+        """Parse "[label] type name = number [options];"."""
+        line = self._peek().line
+        label = None
+        if self._peek().value in ("repeated", "optional", "required"):
+            label = self._next().value
+        field_type = self._full_ident()
+        name = self._ident()
+        self._expect("=")
+        number = self._int()
+        options = self._field_options()
+        self._expect(";")
+        return FieldDef(
+            name=name,
+            type=field_type,
+            number=number,
+            label=label,
+            options=options,
+            comment=comment,
+            oneof=oneof,
+            line=line,
+        )
+
+    def _map_field(self, comment: str) -> FieldDef:
+        """Parse "map<key, value> name = number [options];"."""
+        line = self._peek().line
+        self._expect("map")
+        self._expect("<")
+        key_type = self._full_ident()
+        self._expect(",")
+        value_type = self._full_ident()
+        self._expect(">")
+        name = self._ident()
+        self._expect("=")
+        number = self._int()
+        options = self._field_options()
+        self._expect(";")
+        return FieldDef(
+            name=name,
+            type=f"map<{key_type}, {value_type}>",
+            number=number,
+            options=options,
+            comment=comment,
+            key_type=key_type,
+            value_type=value_type,
+            line=line,
+        )
+
+    def _oneof(self, comment: str) -> tuple[OneofDef, list[FieldDef]]:
+        """Parse "oneof name { fields }"."""
+        self._expect("oneof")
+        name = self._ident()
+        fields: list[FieldDef] = []
+        options: list[ProtoOption] = []
+        self._expect("{")
+        while not self._accept("}"):
+            if self._accept(";"):
+                continue
+            member_comment = self._leading_comment()
+            if self._is("option"):
+                self._next()
+                options.append(self._option())
+                self._expect(";")
+            elif self._peek().kind == "eof":
+                self._error(f"Unterminated oneof {name}")
+            else:
+                fields.append(self._field(member_comment, oneof=name))
+        oneof = OneofDef(
+            name=name,
+            fields=tuple(f.name for f in fields),
+            options=tuple(options),
+            comment=comment,
+        )
+        return oneof, fields
+
+    def _enum(self, scope: str, comment: str) -> EnumDef:
+        """Parse "enum Name { VALUE = number [options]; ... }"."""
+        self._expect("enum")
+        name = self._ident()
+        values: list[EnumValueDef] = []
+        options: list[ProtoOption] = []
+        self._expect("{")
+        while not self._accept("}"):
+            if self._accept(";"):
+                continue
+            value_comment = self._leading_comment()
+            if self._is("option") and not self._is("=", 1):
+                self._next()
+                options.append(self._option())
+                self._expect(";")
+            elif self._is("reserved") and not self._is("=", 1):
+                self._skip_statement()
+            elif self._peek().kind == "eof":
+                self._error(f"Unterminated enum {name}")
+            else:
+                value_name = self._ident()
+                self._expect("=")
+                number = self._int()
+                value_options = self._field_options()
+                self._expect(";")
+                values.append(EnumValueDef(value_name, number, value_options, value_comment))
+        return EnumDef(
+            name=name,
+            full_name=f"{scope}.{name}" if scope else name,
+            values=tuple(values),
+            options=tuple(options),
+            comment=comment,
+        )
+
+
+def _number(text: str) -> int | float:
+    """Return the value of a numeric literal."""
+    if text[:2] in ("0x", "0X"):
+        return int(text, 16)
+    if any(char in text for char in ".eE"):
+        return float(text)
+    if len(text) > 1 and text.startswith("0"):
+        return int(text, 8)
+    return int(text)
+
+
+def parse_proto(source: str, filename: str = "") -> ProtoFile:
+    """Parse the source of a .proto file.
+
+    Args:
+        source: File content
+        filename: Name used in error messages and ProtoFile.filename
+
+    Returns:
+        AST of the file
+
+    Raises:
+        ProtoSyntaxError: If the source is not valid protobuf syntax
+
+    """
+    return _Parser(source, filename).parse_file()
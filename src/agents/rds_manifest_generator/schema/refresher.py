@@ -0,0 +1,109 @@
+"""Background refresh of the proto schema.
+
+The proto files are fetched once at startup, but the upstream repository keeps
+changing. ProtoSchemaRefresher periodically re-fetches them in a daemon thread,
+parses them with ProtoSchemaLoader and publishes the result as a new schema
+version (see loader.publish_schema). Threads that already started keep the
+version they pinned; new threads pick up the new one, so proto changes reach
+the agent without a restart. Given the installed stubs' loader, the schema is
+read from the stubs and only the served proto files change.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Mapping
+
+from .loader import (
+    ProtoSchemaLoader,
+    SchemaVersion,
+    current_schema_version,
+    publish_schema,
+)
+
+logger = logging.getLogger(__name__)
+
+# Returns the source identifier (e.g. commit SHA) and the proto file contents
+ProtoFetcher = Callable[[], tuple[str, Mapping[str, str]]]
+
+
+class ProtoSchemaRefresher:
+    """Periodically re-fetch proto files and hot-swap the published schema.
+
+    Attributes:
+        interval_seconds: Seconds between refreshes
+
+    """
+
+    def __init__(
+        self,
+        fetch: ProtoFetcher,
+        interval_seconds: float,
+        loader: ProtoSchemaLoader | None = None,
+    ):
+        """Initialize the refresher.
+
+        Args:
+            fetch: Function returning the source identifier and proto contents
+            interval_seconds: Seconds between refreshes
+            loader: Loader to read the schema from instead of parsing the
+                fetched files (see publish_schema)
+
+        """
+        self._fetch = fetch
+        self._loader = loader
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def refresh_once(self) -> SchemaVersion | None:
+        """Fetch the proto files and publish them if they changed.
+
+        Errors are logged and the current schema version stays in place.
+
+        Returns:
+            The newly published schema version, or None if nothing changed or
+            the refresh failed
+
+        """
+        previous = current_schema_version()
+        try:
+            source, proto_contents = self._fetch()
+            schema = publish_schema(proto_contents, source=source, loader=self._loader)
+        except Exception as e:
+            logger.warning(f"Proto schema refresh failed, keeping current version: {e}")
+            return None
+
+        if previous is not None and schema.version == previous.version:
+            logger.debug(f"Proto schema unchanged at version {schema.version}")
+            return None
+        return schema
+
+    def start(self) -> None:
+        """Start refreshing in a daemon thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="proto-schema-refresher",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Proto schema refresher started (every {self.interval_seconds:.0f}s)")
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the refresher thread.
+
+        Args:
+            timeout: Seconds to wait for a refresh in progress to finish
+
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Refresh every interval until stopped."""
+        while not self._stop.wait(self.interval_seconds):
+            self.refresh_once()
@@ -0,0 +1,213 @@
+"""Registry of the spec schemas of many cloud resource kinds.
+
+get_schema_loader(kind=...) serves the schema of any cloud resource kind
+(e.g. "AwsRdsInstance", "GcpCloudSql") from one process. AwsRdsInstance is
+fetched and published at startup (see graph.py). Every other kind is fetched
+from its own RepositoryConfig on first use and published as a versioned
+schema of that kind, so it gets the same on-disk schema cache and version
+pinning (see loader.py):
+
+    fields = get_schema_loader(kind="AwsVpc").get_required_fields()
+
+Only a bounded number of kinds is kept, least recently used first out. An
+evicted kind's versions are discarded; requests that pinned one keep it,
+and the next use fetches the kind again, usually from the repository cache.
+
+The registry is thread-safe. Concurrent first requests for the same kind
+fetch and parse its protos once, and other kinds are served meanwhile.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import PurePosixPath
+
+from src.common.repos import RepositoryConfig, fetch_repository_snapshot
+
+from ..config import REPO_CONFIG
+from .loader import (
+    DEFAULT_SCHEMA_KIND,
+    ProtoSchemaLoader,
+    SchemaVersion,
+    current_schema_version,
+    default_schema_loader,
+    discard_schema_versions,
+    publish_schema,
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of kinds, besides AwsRdsInstance, whose schemas are kept in memory
+DEFAULT_MAX_KINDS = int(os.getenv("GRAPH_FLEET_SCHEMA_REGISTRY_MAX_KINDS", "16"))
+
+# Directory of the per-provider proto packages in the project-planton repository
+# (e.g. "apis/org/project_planton/provider")
+PROVIDER_PROTO_ROOT = str(PurePosixPath(REPO_CONFIG.repo_path).parents[2])
+
+# Returns the repository config of a cloud resource kind's proto files
+KindConfigFactory = Callable[[str], RepositoryConfig]
+
+
+def kind_repository_config(kind: str) -> RepositoryConfig:
+    """Return the config fetching a kind's protos from the project-planton repository.
+
+    Args:
+        kind: Cloud resource kind, starting with its provider (e.g. "GcpCloudSql")
+
+    Returns:
+        Config of "<provider>/<kind lowercased>/v1", with the files and fetch
+        mode of the AwsRdsInstance config and a repository name of its own
+
+    Raises:
+        ValueError: If kind is not a CamelCase kind name
+
+    """
+    match = re.fullmatch(r"([A-Z][a-z0-9]*)(?:[A-Z][a-z0-9]*)+", kind)
+    if match is None:
+        raise ValueError(f"Invalid cloud resource kind: {kind!r}")
+    provider = match.group(1).lower()
+    return REPO_CONFIG._replace(
+        name=f"{REPO_CONFIG.name}-{kind.lower()}",
+        repo_path=f"{PROVIDER_PROTO_ROOT}/{provider}/{kind.lower()}/v1",
+    )
+
+
+class SchemaRegistry:
+    """Lazily fetched, bounded set of the schemas of cloud resource kinds.
+
+    Attributes:
+        max_kinds: Number of kinds, besides AwsRdsInstance, kept published
+
+    """
+
+    def __init__(
+        self,
+        config_factory: KindConfigFactory = kind_repository_config,
+        max_kinds: int = DEFAULT_MAX_KINDS,
+    ):
+        """Initialize the registry.
+
+        Args:
+            config_factory: Returns the repository config of a kind that was
+                not registered
+            max_kinds: Number of kinds, besides AwsRdsInstance, kept published
+
+        """
+        self._config_factory = config_factory
+        self.max_kinds = max_kinds
+        self._configs: dict[str, RepositoryConfig] = {}
+        self._kinds: OrderedDict[str, None] = OrderedDict()
+        self._kind_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, config: RepositoryConfig) -> None:
+        """Fetch the protos of a kind with the given config instead of the derived one.
+
+        Args:
+            kind: Cloud resource kind
+            config: Repository config of the kind's proto files
+
+        """
+        with self._lock:
+            self._configs[kind] = config
+
+    def repository_config(self, kind: str) -> RepositoryConfig:
+        """Return the repository config of a kind's proto files."""
+        with self._lock:
+            config = self._configs.get(kind)
+        return config if config is not None else self._config_factory(kind)
+
+    def get_loader(self, kind: str = DEFAULT_SCHEMA_KIND) -> ProtoSchemaLoader:
+        """Return the schema loader of the current schema version of a kind.
+
+        Args:
+            kind: Cloud resource kind
+
+        Returns:
+            The kind's loader; for AwsRdsInstance, the global loader
+
+        Raises:
+            RepositoryFetchError: If the kind's protos cannot be fetched
+
+        """
+        if kind == DEFAULT_SCHEMA_KIND:
+            return default_schema_loader()
+        return self.get(kind).loader
+
+    def get(self, kind: str) -> SchemaVersion:
+        """Return the current schema version of a kind, fetching it on first use.
+
+        Args:
+            kind: Cloud resource kind other than AwsRdsInstance
+
+        Returns:
+            The kind's current schema version
+
+        Raises:
+            ValueError: If kind is AwsRdsInstance, which is published at startup
+            RepositoryFetchError: If the kind's protos cannot be fetched
+
+        """
+        if kind == DEFAULT_SCHEMA_KIND:
+            raise ValueError(f"{DEFAULT_SCHEMA_KIND} schemas are published at startup")
+
+        with self._lock:
+            kind_lock = self._kind_locks.setdefault(kind, threading.Lock())
+        with kind_lock:
+            schema = current_schema_version(kind)
+            if schema is None:
+                schema = self._publish(kind)
+            with self._lock:
+                self._kinds[kind] = None
+                self._kinds.move_to_end(kind)
+                evicted = []
+                while len(self._kinds) > self.max_kinds:
+                    evicted.append(self._kinds.popitem(last=False)[0])
+
+        for evicted_kind in evicted:
+            self._evict(evicted_kind)
+        return schema
+
+    def _publish(self, kind: str) -> SchemaVersion:
+        """Fetch the protos of a kind and publish them as its current schema version."""
+        config = self.repository_config(kind)
+        logger.info(f"Fetching {kind} proto schema from {config.name} ({config.repo_path})")
+        snapshot = fetch_repository_snapshot(config)
+        proto_contents = {
+            PurePosixPath(repo_file_path).name: snapshot.read_text(repo_file_path)
+            for repo_file_path in snapshot.files
+        }
+        return publish_schema(proto_contents, source=snapshot.commit, kind=kind)
+
+    def _evict(self, kind: str) -> None:
+        """Discard the versions of a kind, unless it was used again meanwhile."""
+        with self._lock:
+            kind_lock = self._kind_locks[kind]
+        with kind_lock:
+            with self._lock:
+                if kind in self._kinds:
+                    return
+            discard_schema_versions(kind)
+        logger.info(f"Evicted {kind} proto schema (registry holds {self.max_kinds} kinds)")
+
+
+# Global instance for easy access
+_registry: SchemaRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_schema_registry() -> SchemaRegistry:
+    """Get the global schema registry instance.
+
+    Returns:
+        SchemaRegistry shared by all callers
+
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SchemaRegistry()
+        return _registry
@@ -8,6 +8,7 @@ from .manifest_tools import (
 from .requirement_tools import (
     check_requirement_collected,
     get_collected_requirements,
+    validate_requirement,
 )
 from .schema_tools import (
     get_all_rds_fields,
@@ -25,6 +26,7 @@ __all__ = [
     # Requirement tools
     "check_requirement_collected",
     "get_collected_requirements",
+    "validate_requirement",
     # Manifest tools
     "generate_rds_manifest",
     "set_manifest_metadata",
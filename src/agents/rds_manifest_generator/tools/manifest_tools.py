@@ -12,7 +12,7 @@ from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langgraph.types import Command
 
-from ..validation.manifest_validator import validate_manifest_yaml
+from ..validation.manifest_validator import validate_manifest_dict
 from .field_converter import proto_to_yaml_field_name
 from .requirement_tools import _read_requirements
 
@@ -146,11 +146,8 @@ def validate_manifest(runtime: ToolRuntime, config: RunnableConfig = None) -> st
         "spec": spec,
     }
 
-    # Convert to YAML
-    manifest_yaml = yaml.dump(manifest, default_flow_style=False, sort_keys=False)
-
-    # Validate using protovalidate
-    validation_errors = validate_manifest_yaml(manifest_yaml)
+    # Validate using protovalidate, straight from the dict
+    validation_errors = validate_manifest_dict(manifest)
 
     if validation_errors:
         return "Validation issues found:\n" + "\n".join(f"  - {error}" for error in validation_errors)
@@ -1,6 +1,7 @@
 """Tools for collecting and managing RDS manifest requirements.
 
-This module provides tools for querying collected requirements from /requirements.json.
+This module provides tools for querying collected requirements from /requirements.json
+and for validating a single answer before it is stored.
 The subagent uses native DeepAgents file tools (write_file, edit_file) to store requirements.
 """
 
@@ -10,6 +11,8 @@ from typing import Any
 from langchain.tools import ToolRuntime
 from langchain_core.tools import tool
 
+from ..validation.incremental import validate_fields
+
 
 def _read_requirements(runtime: ToolRuntime) -> dict[str, Any]:
     """Read requirements from /requirements.json file.
@@ -100,3 +103,36 @@ def check_requirement_collected(field_name: str, runtime: ToolRuntime) -> str:
         return f"Yes, {field_name} = {requirements[field_name]}"
     return f"No, {field_name} has not been collected yet"
 
+
+@tool
+def validate_requirement(field_name: str, value: Any, runtime: ToolRuntime) -> str:
+    """Validate a single requirement value before storing it.
+
+    Checks the value against the field's validation rules and against the
+    cross-field rules it takes part in, using the other requirements already
+    in /requirements.json. Rules of fields not collected yet are ignored, so
+    this is cheap to call after every answer.
+
+    Args:
+        field_name: The proto field name (e.g., 'allocated_storage_gb', 'multi_az')
+        value: The value the user gave
+        runtime: Tool runtime with access to filesystem state
+
+    Returns:
+        Whether the value is valid, or the rule violations it causes
+
+    Example:
+        validate_requirement('allocated_storage_gb', 0)
+        # Returns: "✗ allocated_storage_gb = 0 is invalid:
+        #   - allocated_storage_gb: value must be greater than 0"
+
+    """
+    requirements = _read_requirements(runtime)
+    verdict = validate_fields({field_name: value}, requirements)[field_name]
+
+    if verdict.valid:
+        return f"✓ {field_name} = {value} is valid"
+
+    lines = [f"✗ {field_name} = {value} is invalid:"]
+    lines.extend(f"  - {violation}" for violation in verdict.violations)
+    return "\n".join(lines)
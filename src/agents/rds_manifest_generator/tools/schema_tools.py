@@ -2,38 +2,66 @@
 
 These tools allow the agent to understand the AWS RDS proto schema,
 including field definitions, validation rules, and requirements.
+
+Responses depend only on the immutable schema, so each one is rendered once
+per schema version and reused (see IndexedSchema.rendered); a hot-swapped
+schema version starts with fresh renderings.
 """
 
+from typing import Any
+
 from langchain_core.tools import tool
 
-from ..schema.loader import get_schema_loader
+from ..schema.loader import IndexedSchema, ProtoField, get_schema_loader
+from ..schema.local_rules import get_local_rules, get_stub_rules
 
 
 @tool
-def get_rds_field_info(field_name: str) -> str:
+def get_rds_field_info(field_name: str, candidate_value: Any = None) -> str:
     """Get detailed information about an AWS RDS Instance field.
 
     Use this to understand what a specific field means, whether it's required,
-    what type it is, and what validation rules apply.
+    what type it is, and what validation rules apply. Pass candidate_value to
+    also check a value the user gave against the field's rules.
 
     Args:
         field_name: The name of the field to query (e.g., "engine", "instance_class")
+        candidate_value: Optional value to check against the field's validation rules
 
     Returns:
-        Detailed information about the field including description, type, and validations
+        Detailed information about the field including description, type, and validations,
+        followed by the result of checking candidate_value if given
 
     """
-    loader = get_schema_loader()
-    field = loader.get_field_by_name(field_name)
+    schema = get_schema_loader().load_indexed_schema()
+    field = schema.get(field_name)
 
     if field is None:
-        available_fields = [f.name for f in loader.load_spec_schema()]
-        return (
-            f"Field '{field_name}' not found. "
-            f"Available fields: {', '.join(available_fields)}"
-        )
+        available_fields = schema.rendered("field_names", _render_field_names)
+        return f"Field '{field_name}' not found. Available fields: {available_fields}"
+
+    info = schema.rendered(f"field:{field.name}", lambda _: _render_field_info(field))
+    if candidate_value is None:
+        return info
+
+    # Rules of the installed stubs match what validate_manifest enforces
+    rules = get_stub_rules() or get_local_rules(schema)
+    violations = rules.check_value(field.name, candidate_value)
+    if not violations:
+        return f"{info}\nCandidate value {candidate_value!r}: passes the validation rules"
+    return "\n".join(
+        [f"{info}\nCandidate value {candidate_value!r} violates:"]
+        + [f"  - {violation}" for violation in violations]
+    )
+
 
-    # Build detailed response
+def _render_field_names(schema: IndexedSchema) -> str:
+    """Render the comma-separated names of all fields."""
+    return ", ".join(f.name for f in schema.fields)
+
+
+def _render_field_info(field: ProtoField) -> str:
+    """Render the detailed information about a field."""
     parts = [f"Field: {field.name}"]
     parts.append(f"Type: {field.field_type}")
     parts.append(f"Required: {'Yes' if field.required else 'No'}")
@@ -87,8 +115,13 @@ def list_required_fields() -> str:
         A formatted list of all required fields with brief descriptions
 
     """
-    loader = get_schema_loader()
-    required_fields = loader.get_required_fields()
+    schema = get_schema_loader().load_indexed_schema()
+    return schema.rendered("required_fields", _render_required_fields)
+
+
+def _render_required_fields(schema: IndexedSchema) -> str:
+    """Render the list of required fields."""
+    required_fields = schema.required
 
     if not required_fields:
         return "No required fields found (this seems wrong - check schema loading)"
@@ -117,8 +150,13 @@ def list_optional_fields() -> str:
         A formatted list of all optional fields with brief descriptions
 
     """
-    loader = get_schema_loader()
-    optional_fields = loader.get_optional_fields()
+    schema = get_schema_loader().load_indexed_schema()
+    return schema.rendered("optional_fields", _render_optional_fields)
+
+
+def _render_optional_fields(schema: IndexedSchema) -> str:
+    """Render the list of optional fields."""
+    optional_fields = schema.optional
 
     if not optional_fields:
         return "No optional fields found."
@@ -146,33 +184,33 @@ def get_all_rds_fields() -> str:
         A comprehensive list of all fields organized by requirement status
 
     """
-    loader = get_schema_loader()
-    all_fields = loader.load_spec_schema()
-    required_fields = loader.get_required_fields()
-    optional_fields = loader.get_optional_fields()
+    schema = get_schema_loader().load_indexed_schema()
+    return schema.rendered("all_fields", _render_all_fields)
+
 
+def _render_all_fields(schema: IndexedSchema) -> str:
+    """Render the overview of all fields grouped by requirement status."""
     lines = ["AWS RDS Instance Complete Field Schema", "=" * 50, ""]
 
     # Required fields section
-    lines.append(f"REQUIRED FIELDS ({len(required_fields)}):")
+    lines.append(f"REQUIRED FIELDS ({len(schema.required)}):")
     lines.append("-" * 50)
-    for field in required_fields:
+    for field in schema.required:
         desc = field.description or "No description"
         lines.append(f"{field.name} ({field.field_type})")
         lines.append(f"  {desc}")
         lines.append("")
 
     # Optional fields section
-    lines.append(f"OPTIONAL FIELDS ({len(optional_fields)}):")
+    lines.append(f"OPTIONAL FIELDS ({len(schema.optional)}):")
     lines.append("-" * 50)
-    for field in optional_fields:
+    for field in schema.optional:
         desc = field.description or "No description"
         lines.append(f"{field.name} ({field.field_type})")
         lines.append(f"  {desc}")
         lines.append("")
 
     lines.append("=" * 50)
-    lines.append(f"Total fields: {len(all_fields)}")
+    lines.append(f"Total fields: {len(schema.fields)}")
 
     return "\n".join(lines)
-
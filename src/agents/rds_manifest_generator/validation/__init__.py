@@ -1,7 +1,21 @@
 """Validation module for AWS RDS manifest validation using protovalidate."""
 
-from .manifest_validator import validate_manifest_yaml
+from .incremental import FieldVerdict, validate_fields
+from .manifest_validator import (
+    validate_manifest_dict,
+    validate_manifest_yaml,
+    warm_manifest_validator,
+)
+from .validator import WarmValidator, get_manifest_validator
 
-__all__ = ["validate_manifest_yaml"]
+__all__ = [
+    "FieldVerdict",
+    "WarmValidator",
+    "get_manifest_validator",
+    "validate_fields",
+    "validate_manifest_dict",
+    "validate_manifest_yaml",
+    "warm_manifest_validator",
+]
 
 
@@ -0,0 +1,157 @@
+"""Incremental, field-level validation of requirement changes.
+
+Validating the whole manifest after every collected answer evaluates every
+rule of AwsRdsInstance, most of which concern fields the user has not been
+asked about yet. validate_fields validates only what a change can affect:
+a spec message holding the changed fields, plus the fields referenced by
+message-level CEL rules (``(buf.validate.message).cel``) that mention a
+changed field. Violations are attributed back to the changed fields, so the
+requirements collector gets a verdict per answer:
+
+    verdicts = validate_fields({"allocated_storage_gb": 0}, requirements)
+    verdicts["allocated_storage_gb"].violations
+    # ('allocated_storage_gb: value must be greater than 0',)
+
+Rules of other fields (e.g. "required" on fields not collected yet), and
+message-level rules referencing a field not collected yet, are not reported;
+validate_manifest_dict remains the check of the complete manifest.
+"""
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+from google.protobuf.descriptor import Descriptor
+from google.protobuf.message_factory import GetMessageClass
+
+from ..schema.loader import camel_case
+from .manifest_validator import AwsRdsInstance, dict_to_proto, protovalidate
+from .validator import get_manifest_validator
+from .violations import format_field_path, format_violation, get_attr
+
+# Full name of the buf.validate message rules extension
+_MESSAGE_RULES_EXTENSION = "buf.validate.message"
+
+# Field references in CEL expressions, e.g. "this.multi_az"
+_CEL_FIELD_REFERENCE = re.compile(r"\bthis\.(\w+)")
+
+
+@dataclass(frozen=True)
+class FieldVerdict:
+    """Validation verdict of one changed field.
+
+    Attributes:
+        field: Proto field name
+        violations: Violations caused by the field, as "path: message"
+
+    """
+
+    field: str
+    violations: tuple[str, ...] = ()
+
+    @property
+    def valid(self) -> bool:
+        """Return whether the field value satisfies its rules."""
+        return not self.violations
+
+
+@dataclass(frozen=True)
+class _MessageRule:
+    """A message-level CEL rule and the fields it references."""
+
+    rule_id: str
+    fields: frozenset[str]
+
+
+def validate_fields(
+    changes: Mapping[str, Any],
+    requirements: Mapping[str, Any] | None = None,
+) -> dict[str, FieldVerdict]:
+    """Validate changed requirement fields against the rules they affect.
+
+    Args:
+        changes: Changed fields, by proto field name, with their new values
+        requirements: All collected requirements, by proto field name; values
+            of fields referenced by message-level rules are taken from here
+
+    Returns:
+        Verdict per changed field
+
+    """
+    if AwsRdsInstance is None:
+        error = ("Error: AwsRdsInstance proto stubs not installed",)
+        return {field: FieldVerdict(field, error) for field in changes}
+
+    spec_descriptor = AwsRdsInstance.DESCRIPTOR.fields_by_name["spec"].message_type
+    verdicts = {
+        field: FieldVerdict(field, (f"{field}: unknown field",))
+        for field in changes
+        if field not in spec_descriptor.fields_by_name
+    }
+
+    known = [field for field in changes if field not in verdicts]
+    if not known:
+        return verdicts
+
+    # Message-level rules mentioning a changed field, and the fields they need.
+    # A rule referencing a field without a value would see the field's default,
+    # so it is only evaluated once every field it references is collected.
+    values = {**(requirements or {}), **changes}
+    rules = _message_rules(spec_descriptor)
+    complete_rules = [rule for rule in rules if rule.fields <= values.keys()]
+    incomplete_rule_ids = {rule.rule_id for rule in rules} - {
+        rule.rule_id for rule in complete_rules
+    }
+    related_rules = {
+        field: {rule.rule_id for rule in complete_rules if field in rule.fields}
+        for field in known
+    }
+    fields = set(known)
+    for rule in complete_rules:
+        if rule.fields & fields:
+            fields.update(name for name in rule.fields if name in spec_descriptor.fields_by_name)
+
+    partial_spec = {camel_case(field): values[field] for field in fields}
+    msg, errors = dict_to_proto(partial_spec, GetMessageClass(spec_descriptor))
+    if msg is None:
+        verdicts.update({field: FieldVerdict(field, tuple(errors)) for field in known})
+        return verdicts
+
+    try:
+        found = get_manifest_validator().collect_violations(msg)
+    except protovalidate.CompilationError as err:
+        error = (f"validation rules could not be compiled: {err}",)
+        verdicts.update({field: FieldVerdict(field, error) for field in known})
+        return verdicts
+
+    violations: dict[str, list[str]] = {field: [] for field in known}
+    for violation in found:
+        top_level_field = re.split(r"[.\[]", format_field_path(violation), maxsplit=1)[0]
+        rule_id = get_attr(violation, "rule_id")
+        if rule_id in incomplete_rule_ids:
+            continue
+        for field in known:
+            if top_level_field == field or rule_id in related_rules[field]:
+                violations[field].append(format_violation(violation))
+
+    verdicts.update({field: FieldVerdict(field, tuple(violations[field])) for field in known})
+    return verdicts
+
+
+@cache
+def _message_rules(descriptor: Descriptor) -> tuple[_MessageRule, ...]:
+    """Return the message-level CEL rules of a message type."""
+    rules: list[_MessageRule] = []
+    for option, value in descriptor.GetOptions().ListFields():
+        if option.full_name != _MESSAGE_RULES_EXTENSION:
+            continue
+        for rule in value.cel:
+            rules.append(
+                _MessageRule(
+                    rule_id=rule.id,
+                    fields=frozenset(_CEL_FIELD_REFERENCE.findall(rule.expression)),
+                )
+            )
+    return tuple(rules)
@@ -2,17 +2,36 @@
 
 This module validates AWS RDS manifest YAML against proto validation rules
 defined in the AwsRdsInstance protobuf message.
+
+Spec values are first checked against the simple field rules compiled in
+process from the same stubs (see schema/local_rules.py). A manifest that
+violates one of them is rejected right away, without building the proto
+message or evaluating CEL.
 """
 
 from __future__ import annotations
 
-from typing import TypeVar
+import logging
+from collections.abc import Mapping
+from typing import Any, TypeVar
 
-import protovalidate
 import yaml
 from google.protobuf.json_format import ParseDict
 from google.protobuf.message import Message
 
+from ..schema.loader import active_schema_version
+from ..schema.local_rules import get_stub_rules
+from .result_cache import get_validation_cache, manifest_digest
+from .validator import get_manifest_validator
+from .violations import format_violation
+
+# protovalidate imports the buf.validate stubs, which may be missing
+try:
+    import protovalidate
+except ImportError:
+    # Fallback for development/testing without installed stubs
+    protovalidate = None
+
 # Import the AwsRdsInstance proto message
 try:
     from org.project_planton.provider.aws.awsrdsinstance.v1.api_pb2 import (
@@ -22,94 +41,22 @@ except ImportError:
     # Fallback for development/testing without installed stubs
     AwsRdsInstance = None  # type: ignore
 
-# FieldPath is optional at runtime – import it if the stubs are present.
-try:
-    from buf.validate.validate_pb2 import FieldPath
-except ModuleNotFoundError:  # stubs were not generated / vendored
-    FieldPath = None  # type: ignore
-
 T = TypeVar("T", bound=Message)
 
+logger = logging.getLogger(__name__)
+
 
 # --------------------------------------------------------------------------- #
 # helpers                                                                     #
 # --------------------------------------------------------------------------- #
-def _get_attr(obj, name: str):
-    """Retrieve *name* from *obj*.
-
-    If absent, fall back to obj.proto.<name>.
-    Works with both old (flat) and new (wrapped) Violation objects.
-    """
-    if hasattr(obj, name):
-        return getattr(obj, name)
-    proto = getattr(obj, "proto", None)
-    if proto is not None and hasattr(proto, name):
-        return getattr(proto, name)
-    return None
-
-
-def _fmt_field_path(violation) -> str:
-    """Render FieldPath → dotted.path[0] form.
-
-    Falls back to the string in older protovalidate builds.
-    """
-    fp = _get_attr(violation, "field")
-    if fp is None:
-        legacy = _get_attr(violation, "field_path")
-        return legacy if legacy else "<unknown>"
-
-    # Handle both "real" FieldPath objects and stub‑less message instances.
-    if FieldPath is not None and isinstance(fp, FieldPath):
-        elems = fp.elements
-    else:
-        elems = getattr(fp, "elements", None)  # type: ignore[assignment]
-        if elems is None:  # not a FieldPath at all
-            legacy = _get_attr(violation, "field_path")
-            return legacy if legacy else "<unknown>"
-
-    parts: list[str] = []
-    for elem in elems:
-        # field name or number
-        name = elem.field_name or str(elem.field_number)
-
-        # map / repeated subscripts
-        sub = elem.WhichOneof("subscript")
-        if sub == "index":
-            name += f"[{elem.index}]"
-        elif sub == "bool_key":
-            name += f"[{elem.bool_key}]"
-        elif sub == "int_key":
-            name += f"[{elem.int_key}]"
-        elif sub == "uint_key":  # unsigned‑int map keys
-            name += f"[{elem.uint_key}]"
-        elif sub == "string_key":
-            name += f"['{elem.string_key}']"  # mirror Java
-        parts.append(name)
-
-    return ".".join(parts)
-
-
-def _violation_msg(violation) -> str:
-    """Retrieve the human‑readable message.
-
-    Regardless of the exact attribute name used by the generated code.
-    """
-    for attr in ("message", "message_", "msg", "msg_"):
-        val = _get_attr(violation, attr)
-        if val:
-            return val
-    rid = _get_attr(violation, "rule_id")
-    return rid if rid else "validation error"
-
-
-def yaml_to_proto(
-    yaml_str: str,
+def dict_to_proto(
+    manifest_dict: Mapping[str, Any],
     proto_message_cls: type[T],
 ) -> tuple[T | None, list[str]]:
-    """Convert YAML text to a Protobuf message instance.
+    """Convert a manifest dict to a Protobuf message instance.
 
     Args:
-        yaml_str: YAML document as a string.
+        manifest_dict: Manifest as a dict, with the JSON (camelCase) field names.
         proto_message_cls: Generated Protobuf message class (e.g. AwsRdsInstance).
 
     Returns:
@@ -118,13 +65,6 @@ def yaml_to_proto(
         * On failure: (None, ["error message"])
 
     """
-    # YAML → dict --------------------------------------------------------------
-    try:
-        manifest_dict = yaml.safe_load(yaml_str) or {}
-    except yaml.YAMLError as exc:
-        return None, [f"invalid YAML: {exc}"]
-
-    # dict → proto -------------------------------------------------------------
     msg = proto_message_cls()
     try:
         ParseDict(manifest_dict, msg, ignore_unknown_fields=False)
@@ -137,10 +77,20 @@ def yaml_to_proto(
 # --------------------------------------------------------------------------- #
 # public API                                                                  #
 # --------------------------------------------------------------------------- #
-def validate_manifest_yaml(
-    manifest_yaml: str,
+def validate_manifest_dict(
+    manifest: Mapping[str, Any],
+    use_cache: bool = True,
 ) -> list[str]:
-    """Validate *manifest_yaml* against rules declared on AwsRdsInstance.
+    """Validate a manifest dict against rules declared on AwsRdsInstance.
+
+    The dict is converted straight to the proto message, so callers that
+    build manifests in code skip the YAML dump and parse. Results are
+    memoized per schema version (see result_cache.py), so validating an
+    unchanged manifest again is a lookup.
+
+    Args:
+        manifest: Manifest as a dict, with the JSON (camelCase) field names.
+        use_cache: Whether cached results may be returned and stored.
 
     Returns:
         []                 – when the manifest is valid.
@@ -150,17 +100,80 @@ def validate_manifest_yaml(
     if AwsRdsInstance is None:
         return ["Error: AwsRdsInstance proto stubs not installed"]
 
-    msg, errors = yaml_to_proto(manifest_yaml, AwsRdsInstance)
+    if not use_cache:
+        return _validate_manifest_dict(manifest)
+
+    schema = active_schema_version()
+    schema_version = schema.version if schema is not None else ""
+    digest = manifest_digest(manifest)
+    cache = get_validation_cache()
+
+    cached = cache.get(schema_version, digest)
+    if cached is not None:
+        return cached
+
+    violations = _validate_manifest_dict(manifest)
+    cache.put(schema_version, digest, violations)
+    return violations
+
+
+def _validate_manifest_dict(manifest: Mapping[str, Any]) -> list[str]:
+    """Validate a manifest dict without the result cache."""
+    # local rules → short-circuit ------------------------------------------
+    local_violations = _check_local_rules(manifest)
+    if local_violations:
+        return local_violations
+
+    msg, errors = dict_to_proto(manifest, AwsRdsInstance)
     if errors:
         return errors
 
     # proto → validate --------------------------------------------------------
     try:
-        protovalidate.validate(msg)  # raises on failure
+        get_manifest_validator().validate(msg)  # raises on failure
         return []  # ✅ all good
     except protovalidate.ValidationError as err:
-        return [
-            f"{_fmt_field_path(v)}: {_violation_msg(v)}" for v in err.violations
-        ]
+        return [format_violation(v) for v in err.violations]
+    except protovalidate.CompilationError as err:
+        return [f"validation rules could not be compiled: {err}"]
+
+
+def _check_local_rules(manifest: Mapping[str, Any]) -> list[str]:
+    """Check the spec values of a manifest against the local field rules."""
+    spec = manifest.get("spec")
+    rules = get_stub_rules()
+    if not isinstance(spec, Mapping) or rules is None:
+        return []
+    return rules.check_spec(spec)
+
+
+def validate_manifest_yaml(
+    manifest_yaml: str,
+) -> list[str]:
+    """Validate *manifest_yaml* against rules declared on AwsRdsInstance.
 
+    Thin wrapper over validate_manifest_dict for YAML text.
 
+    Returns:
+        []                 – when the manifest is valid.
+        ["field: message"] – one entry per violation when invalid.
+
+    """
+    try:
+        manifest = yaml.safe_load(manifest_yaml) or {}
+    except yaml.YAMLError as exc:
+        return [f"invalid YAML: {exc}"]
+
+    return validate_manifest_dict(manifest)
+
+
+def warm_manifest_validator() -> None:
+    """Compile the AwsRdsInstance validation rules ahead of the first request.
+
+    Called at startup, so the first validation does not pay for compiling
+    the CEL rules (see validator.py).
+    """
+    if AwsRdsInstance is None:
+        logger.warning("AwsRdsInstance proto stubs not installed, validator not warmed")
+        return
+    get_manifest_validator().register(AwsRdsInstance)
@@ -0,0 +1,122 @@
+"""Memoized manifest validation results.
+
+The agent often validates the same manifest several times in a row, for
+example when /requirements.json did not change between validate_manifest
+calls. ValidationResultCache remembers the violations of recently
+validated manifests, keyed by a canonical digest of the manifest and the
+schema version it was validated under, so repeating a validation is a
+dictionary lookup instead of a proto conversion plus CEL evaluation.
+
+Keys include the schema version (see schema/loader.py), so hot-swapping the
+schema never serves results computed under the old one; entries of old
+versions age out of the bounded LRU.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from src.common.metrics import get_metrics_registry
+
+# Number of validation results kept
+DEFAULT_MAX_RESULTS = 256
+
+# Validation result cache lookups; labels: outcome ("hit" or "miss")
+METRIC_CACHE_LOOKUPS = "validation.result_cache"
+
+
+def manifest_digest(manifest: Mapping[str, Any]) -> str:
+    """Return a canonical digest of a manifest.
+
+    Manifests that differ only in key order have the same digest.
+
+    Args:
+        manifest: Manifest as a dict
+
+    Returns:
+        SHA-256 hex digest of the manifest's canonical JSON form
+
+    """
+    canonical = json.dumps(
+        manifest, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ValidationResultCache:
+    """Thread-safe, bounded LRU of validation results per schema version.
+
+    Attributes:
+        max_results: Maximum number of results kept
+
+    """
+
+    def __init__(self, max_results: int = DEFAULT_MAX_RESULTS):
+        """Initialize the cache.
+
+        Args:
+            max_results: Maximum number of results kept
+
+        """
+        self.max_results = max_results
+        self._results: OrderedDict[tuple[str, str], tuple[str, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, schema_version: str, digest: str) -> list[str] | None:
+        """Return the cached violations of a manifest.
+
+        Args:
+            schema_version: Schema version the manifest is validated under
+            digest: Manifest digest (see manifest_digest)
+
+        Returns:
+            The violations ([] if the manifest was valid), or None if not cached
+
+        """
+        key = (schema_version, digest)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+        get_metrics_registry().increment(
+            METRIC_CACHE_LOOKUPS, outcome="hit" if result is not None else "miss"
+        )
+        return list(result) if result is not None else None
+
+    def put(self, schema_version: str, digest: str, violations: list[str]) -> None:
+        """Remember the violations of a manifest.
+
+        Args:
+            schema_version: Schema version the manifest was validated under
+            digest: Manifest digest (see manifest_digest)
+            violations: Validation result
+
+        """
+        key = (schema_version, digest)
+        with self._lock:
+            self._results[key] = tuple(violations)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached results."""
+        with self._lock:
+            return len(self._results)
+
+
+# Global instance for easy access
+_cache = ValidationResultCache()
+
+
+def get_validation_cache() -> ValidationResultCache:
+    """Get the process-wide validation result cache."""
+    return _cache
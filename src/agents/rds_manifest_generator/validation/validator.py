@@ -0,0 +1,181 @@
+"""Long-lived protovalidate validator, warmed up at startup.
+
+protovalidate compiles the CEL programs of a message type's rules the first
+time a message of that type is validated, and caches them per Validator
+instance. The module-level ``protovalidate.validate`` therefore makes the
+first validation in every process pay for compiling all AwsRdsInstance
+rules.
+
+WarmValidator keeps one Validator for the process and compiles the rules of
+registered message types (and every message type reachable from them) up
+front, so no request pays for compilation:
+
+    validator = get_manifest_validator()
+    validator.register(AwsRdsInstance)   # at startup
+    validator.validate(msg)              # raises protovalidate.ValidationError
+
+Validation time is recorded in the shared metrics registry, labeled "cold"
+when the message type's rules were not compiled yet and "warm" otherwise.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from google.protobuf.descriptor import Descriptor
+from google.protobuf.message import Message
+from google.protobuf.message_factory import GetMessageClass
+
+from src.common.metrics import get_metrics_registry
+
+# protovalidate imports the buf.validate stubs, which may be missing
+try:
+    import protovalidate
+except ImportError:
+    # Fallback for development/testing without installed stubs
+    protovalidate = None
+
+if TYPE_CHECKING:
+    from protovalidate.validator import Violation
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent validating one message; labels: message, cache ("cold" or "warm")
+METRIC_VALIDATE_SECONDS = "validation.validate_seconds"
+
+# Seconds spent compiling the rules of a registered message type at startup
+METRIC_WARMUP_SECONDS = "validation.warmup_seconds"
+
+
+class WarmValidator:
+    """A process-wide protovalidate Validator with precompiled rules."""
+
+    def __init__(self, validator: protovalidate.Validator | None = None):
+        """Initialize the validator.
+
+        Args:
+            validator: Validator to reuse (defaults to a new protovalidate.Validator)
+
+        """
+        self._validator = validator if validator is not None else protovalidate.Validator()
+        self._compiled: set[str] = set()
+        self._lock = threading.Lock()
+
+    def register(self, message_cls: type[Message]) -> int:
+        """Compile the rules of a message type and all message types it contains.
+
+        Rules that fail to compile are logged; validating such a message
+        raises protovalidate.CompilationError as before.
+
+        Args:
+            message_cls: Generated message class (e.g. AwsRdsInstance)
+
+        Returns:
+            Number of message types whose rules were compiled
+
+        """
+        start = time.perf_counter()
+        compiled = 0
+        for descriptor in _reachable_message_types(message_cls.DESCRIPTOR):
+            if self.is_warm(descriptor):
+                continue
+            try:
+                self._validator.collect_violations(GetMessageClass(descriptor)())
+            except protovalidate.CompilationError as e:
+                logger.warning(f"Could not compile validation rules of {descriptor.full_name}: {e}")
+            with self._lock:
+                self._compiled.add(descriptor.full_name)
+            compiled += 1
+
+        elapsed = time.perf_counter() - start
+        get_metrics_registry().observe(
+            METRIC_WARMUP_SECONDS, elapsed, message=message_cls.DESCRIPTOR.full_name
+        )
+        logger.info(
+            f"Compiled validation rules of {compiled} message type(s) for "
+            f"{message_cls.DESCRIPTOR.full_name} in {elapsed:.3f} seconds"
+        )
+        return compiled
+
+    def is_warm(self, descriptor: Descriptor) -> bool:
+        """Return whether the rules of a message type are already compiled."""
+        with self._lock:
+            return descriptor.full_name in self._compiled
+
+    def validate(self, message: Message) -> None:
+        """Validate a message against its rules.
+
+        Args:
+            message: Message to validate
+
+        Raises:
+            protovalidate.ValidationError: If the message is invalid
+            protovalidate.CompilationError: If the rules could not be compiled
+
+        """
+        violations = self.collect_violations(message)
+        if violations:
+            raise protovalidate.ValidationError(f"invalid {message.DESCRIPTOR.name}", violations)
+
+    def collect_violations(self, message: Message) -> list[Violation]:
+        """Return the violations of a message's rules.
+
+        Args:
+            message: Message to validate
+
+        Returns:
+            Violations, empty if the message is valid
+
+        Raises:
+            protovalidate.CompilationError: If the rules could not be compiled
+
+        """
+        descriptor = message.DESCRIPTOR
+        cache = "warm" if self.is_warm(descriptor) else "cold"
+        try:
+            with get_metrics_registry().timer(
+                METRIC_VALIDATE_SECONDS, message=descriptor.full_name, cache=cache
+            ):
+                return self._validator.collect_violations(message)
+        finally:
+            if cache == "cold":
+                with self._lock:
+                    self._compiled.add(descriptor.full_name)
+
+
+def _reachable_message_types(descriptor: Descriptor) -> Iterator[Descriptor]:
+    """Yield a message type and every message type reachable through its fields."""
+    seen = {descriptor.full_name}
+    stack = [descriptor]
+    while stack:
+        current = stack.pop()
+        yield current
+        for field in current.fields:
+            message_type = field.message_type
+            if message_type is None or message_type.full_name in seen:
+                continue
+            seen.add(message_type.full_name)
+            stack.append(message_type)
+
+
+# Global instance for easy access
+_validator: WarmValidator | None = None
+_validator_lock = threading.Lock()
+
+
+def get_manifest_validator() -> WarmValidator:
+    """Get the process-wide validator.
+
+    Returns:
+        WarmValidator instance
+
+    """
+    global _validator
+    with _validator_lock:
+        if _validator is None:
+            _validator = WarmValidator()
+        return _validator
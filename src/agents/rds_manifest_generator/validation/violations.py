@@ -0,0 +1,90 @@
+"""Accessors for protovalidate Violation objects.
+
+protovalidate builds differ in how they expose a violation: older ones use
+flat attributes, newer ones wrap a buf.validate.Violation message in
+``violation.proto``. These helpers read either form, so callers can render
+violations as "field.path: message".
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+# FieldPath is optional at runtime – import it if the stubs are present.
+try:
+    from buf.validate.validate_pb2 import FieldPath
+except ModuleNotFoundError:  # stubs were not generated / vendored
+    FieldPath = None  # type: ignore
+
+
+def get_attr(obj, name: str) -> Any:
+    """Retrieve *name* from *obj*.
+
+    If absent, fall back to obj.proto.<name>.
+    Works with both old (flat) and new (wrapped) Violation objects.
+    """
+    if hasattr(obj, name):
+        return getattr(obj, name)
+    proto = getattr(obj, "proto", None)
+    if proto is not None and hasattr(proto, name):
+        return getattr(proto, name)
+    return None
+
+
+def format_field_path(violation) -> str:
+    """Render FieldPath → dotted.path[0] form.
+
+    Falls back to the string in older protovalidate builds.
+    """
+    fp = get_attr(violation, "field")
+    if fp is None:
+        legacy = get_attr(violation, "field_path")
+        return legacy if legacy else "<unknown>"
+
+    # Handle both "real" FieldPath objects and stub‑less message instances.
+    if FieldPath is not None and isinstance(fp, FieldPath):
+        elems = fp.elements
+    else:
+        elems = getattr(fp, "elements", None)  # type: ignore[assignment]
+        if elems is None:  # not a FieldPath at all
+            legacy = get_attr(violation, "field_path")
+            return legacy if legacy else "<unknown>"
+
+    parts: list[str] = []
+    for elem in elems:
+        # field name or number
+        name = elem.field_name or str(elem.field_number)
+
+        # map / repeated subscripts
+        sub = elem.WhichOneof("subscript")
+        if sub == "index":
+            name += f"[{elem.index}]"
+        elif sub == "bool_key":
+            name += f"[{elem.bool_key}]"
+        elif sub == "int_key":
+            name += f"[{elem.int_key}]"
+        elif sub == "uint_key":  # unsigned‑int map keys
+            name += f"[{elem.uint_key}]"
+        elif sub == "string_key":
+            name += f"['{elem.string_key}']"  # mirror Java
+        parts.append(name)
+
+    return ".".join(parts)
+
+
+def violation_message(violation) -> str:
+    """Retrieve the human‑readable message.
+
+    Regardless of the exact attribute name used by the generated code.
+    """
+    for attr in ("message", "message_", "msg", "msg_"):
+        val = get_attr(violation, attr)
+        if val:
+            return val
+    rid = get_attr(violation, "rule_id")
+    return rid if rid else "validation error"
+
+
+def format_violation(violation) -> str:
+    """Render a violation as "field.path: message"."""
+    return f"{format_field_path(violation)}: {violation_message(violation)}"
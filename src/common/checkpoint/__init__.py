@@ -0,0 +1,28 @@
+"""Checkpoint storage helpers for Graph Fleet agents.
+
+DedupSerializer keeps large, repeated checkpoint contents (file contents in
+the "files" channel) once in a content-addressed blob store instead of in
+every checkpoint. generate_checkpointer opens an async Postgres checkpointer
+using it; tests use it with InMemoryBlobStore.
+"""
+
+from .blobs import (
+    AsyncBlobStore,
+    AsyncPostgresBlobStore,
+    BlobStore,
+    InMemoryBlobStore,
+    PostgresBlobStore,
+)
+from .postgres import DedupAsyncPostgresSaver, generate_checkpointer
+from .serializer import DedupSerializer
+
+__all__ = [
+    "AsyncBlobStore",
+    "AsyncPostgresBlobStore",
+    "BlobStore",
+    "InMemoryBlobStore",
+    "PostgresBlobStore",
+    "DedupAsyncPostgresSaver",
+    "DedupSerializer",
+    "generate_checkpointer",
+]
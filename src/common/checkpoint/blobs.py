@@ -0,0 +1,267 @@
+"""Content-addressed blob stores for checkpoint values.
+
+A blob store keeps serialized values keyed by the SHA-256 of their bytes, so
+identical values written by many checkpoints are stored once.
+DedupSerializer (see serializer.py) writes large values here and keeps only
+their hash in the checkpoint.
+
+Blobs are never deleted automatically. A blob is shared by every checkpoint,
+in any thread, that holds the same contents, and its hash is only recorded
+inside the serialized checkpoint values, so the database cannot tell which
+blobs are still referenced. Serializers also skip writing blobs they have
+recently written or read (see DedupSerializer), so a blob deleted while
+servers run may be referenced again without being written back. Storage
+grows with the number of distinct contents, not with the number of
+checkpoints; to reclaim it, delete the blob table together with the
+checkpoint tables it serves, while no server is using them.
+"""
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Protocol, runtime_checkable
+
+from psycopg import AsyncConnection, AsyncCursor, Connection, Cursor, sql
+from psycopg.rows import tuple_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+# Table holding the blobs of PostgresBlobStore
+DEFAULT_BLOB_TABLE = "checkpoint_content_blobs"
+
+
+class BlobStore(Protocol):
+    """Storage of immutable blobs keyed by content hash."""
+
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs; hashes that are already stored are left unchanged.
+
+        Args:
+            blobs: Mapping of content hash to blob bytes
+
+        """
+        ...
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs of the given hashes.
+
+        Args:
+            hashes: Content hashes to look up
+
+        Returns:
+            Mapping of hash to blob bytes; unknown hashes are omitted
+
+        """
+        ...
+
+
+@runtime_checkable
+class AsyncBlobStore(BlobStore, Protocol):
+    """Blob store that can also be used from the event loop."""
+
+    async def aput_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs; hashes that are already stored are left unchanged.
+
+        Args:
+            blobs: Mapping of content hash to blob bytes
+
+        """
+        ...
+
+    async def aget_many(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs of the given hashes.
+
+        Args:
+            hashes: Content hashes to look up
+
+        Returns:
+            Mapping of hash to blob bytes; unknown hashes are omitted
+
+        """
+        ...
+
+
+class InMemoryBlobStore:
+    """Thread-safe blob store kept in process memory (for tests and local runs)."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._lock = threading.Lock()
+        self._blobs: dict[str, bytes] = {}
+
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs; hashes that are already stored are left unchanged."""
+        with self._lock:
+            for digest, data in blobs.items():
+                self._blobs.setdefault(digest, data)
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs of the given hashes."""
+        with self._lock:
+            return {digest: self._blobs[digest] for digest in hashes if digest in self._blobs}
+
+    def __len__(self) -> int:
+        """Return the number of stored blobs."""
+        with self._lock:
+            return len(self._blobs)
+
+
+class PostgresBlobStore:
+    """Blob store in a Postgres table next to the LangGraph checkpoint tables.
+
+    Blobs are inserted with ON CONFLICT DO NOTHING, so writing a blob that
+    is already stored costs no row write.
+    """
+
+    def __init__(
+        self,
+        conn: Connection[Any] | ConnectionPool,
+        table: str = DEFAULT_BLOB_TABLE,
+    ):
+        """Initialize the store.
+
+        Args:
+            conn: psycopg connection or connection pool (autocommit connections,
+                as used by PostgresSaver)
+            table: Name of the blob table
+
+        """
+        self._conn = conn
+        self._table = sql.Identifier(table)
+
+    def setup(self) -> None:
+        """Create the blob table if it does not exist."""
+        with self._cursor() as cur:
+            cur.execute(_create_table_sql(self._table))
+
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs; hashes that are already stored are left unchanged."""
+        if not blobs:
+            return
+        with self._cursor() as cur:
+            cur.executemany(_insert_sql(self._table), list(blobs.items()))
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs of the given hashes."""
+        wanted = list(dict.fromkeys(hashes))
+        if not wanted:
+            return {}
+        with self._cursor() as cur:
+            cur.execute(_select_sql(self._table), (wanted,))
+            return {digest: bytes(data) for digest, data in cur.fetchall()}
+
+    @contextmanager
+    def _cursor(self) -> Iterator["Cursor[Any]"]:
+        """Yield a cursor of the connection, or of a connection borrowed from the pool."""
+        if isinstance(self._conn, ConnectionPool):
+            with self._conn.connection() as conn, conn.cursor(row_factory=tuple_row) as cur:
+                yield cur
+        else:
+            with self._conn.cursor(row_factory=tuple_row) as cur:
+                yield cur
+
+
+class AsyncPostgresBlobStore:
+    """Postgres blob store for AsyncPostgresSaver, sharing its connection or pool.
+
+    The sync methods are only allowed from threads other than the event loop
+    the store was created on, like those of AsyncPostgresSaver, which
+    serializes and loads pending writes in worker threads.
+    """
+
+    def __init__(
+        self,
+        conn: AsyncConnection[Any] | AsyncConnectionPool,
+        table: str = DEFAULT_BLOB_TABLE,
+    ):
+        """Initialize the store; must be called from the event loop using it.
+
+        Args:
+            conn: psycopg async connection or connection pool (autocommit
+                connections, as used by AsyncPostgresSaver)
+            table: Name of the blob table
+
+        """
+        self._conn = conn
+        self._table = sql.Identifier(table)
+        self.loop = asyncio.get_running_loop()
+
+    async def asetup(self) -> None:
+        """Create the blob table if it does not exist."""
+        async with self._cursor() as cur:
+            await cur.execute(_create_table_sql(self._table))
+
+    async def aput_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs; hashes that are already stored are left unchanged."""
+        if not blobs:
+            return
+        async with self._cursor() as cur:
+            await cur.executemany(_insert_sql(self._table), list(blobs.items()))
+
+    async def aget_many(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs of the given hashes."""
+        wanted = list(dict.fromkeys(hashes))
+        if not wanted:
+            return {}
+        async with self._cursor() as cur:
+            await cur.execute(_select_sql(self._table), (wanted,))
+            return {digest: bytes(data) for digest, data in await cur.fetchall()}
+
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs from a thread other than the event loop's."""
+        self._check_thread()
+        asyncio.run_coroutine_threadsafe(self.aput_many(blobs), self.loop).result()
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs from a thread other than the event loop's."""
+        self._check_thread()
+        return asyncio.run_coroutine_threadsafe(self.aget_many(hashes), self.loop).result()
+
+    def _check_thread(self) -> None:
+        """Raise if called from the event loop, which the call would block.
+
+        Raises:
+            asyncio.InvalidStateError: If called from the store's event loop
+
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if running_loop is self.loop:
+            raise asyncio.InvalidStateError(
+                "Synchronous calls to AsyncPostgresBlobStore are only allowed from a "
+                "different thread. From the event loop, use aput_many and aget_many."
+            )
+
+    @asynccontextmanager
+    async def _cursor(self) -> AsyncIterator["AsyncCursor[Any]"]:
+        """Yield a cursor of the connection, or of a connection borrowed from the pool."""
+        if isinstance(self._conn, AsyncConnectionPool):
+            async with self._conn.connection() as conn, conn.cursor(row_factory=tuple_row) as cur:
+                yield cur
+        else:
+            async with self._conn.cursor(row_factory=tuple_row) as cur:
+                yield cur
+
+
+def _create_table_sql(table: sql.Identifier) -> sql.Composed:
+    """Return the statement creating the blob table."""
+    return sql.SQL(
+        "CREATE TABLE IF NOT EXISTS {} ("
+        "hash TEXT PRIMARY KEY, "
+        "data BYTEA NOT NULL, "
+        "created_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+    ).format(table)
+
+
+def _insert_sql(table: sql.Identifier) -> sql.Composed:
+    """Return the statement inserting a blob unless its hash is stored."""
+    return sql.SQL(
+        "INSERT INTO {} (hash, data) VALUES (%s, %s) ON CONFLICT (hash) DO NOTHING"
+    ).format(table)
+
+
+def _select_sql(table: sql.Identifier) -> sql.Composed:
+    """Return the statement selecting the blobs of a list of hashes."""
+    return sql.SQL("SELECT hash, data FROM {} WHERE hash = ANY(%s)").format(table)
@@ -0,0 +1,91 @@
+"""Postgres checkpointer with deduplicated checkpoint contents.
+
+generate_checkpointer builds an AsyncPostgresSaver whose serializer is a
+DedupSerializer writing to an AsyncPostgresBlobStore in the same database,
+sharing one connection pool:
+
+    async with generate_checkpointer() as checkpointer:
+        graph = create_rds_agent().compile(checkpointer=checkpointer)
+
+The database is the one of DATABASE_URL (see .env.example) unless a
+connection string is given. The blob table and the checkpoint tables are
+created on entry.
+
+AsyncPostgresSaver deserializes channel values on the event loop; the saver
+returned here prefetches their blobs first, so the blob store is never
+called synchronously from the loop. Pending writes are loaded in worker
+threads, which may call the blob store directly.
+"""
+
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import DictRow, dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from .blobs import AsyncPostgresBlobStore
+from .serializer import DEFAULT_MIN_BLOB_SIZE, DedupSerializer
+
+# Environment variable holding the connection string of the checkpoint database
+DATABASE_URL_ENV = "DATABASE_URL"
+
+
+class DedupAsyncPostgresSaver(AsyncPostgresSaver):
+    """AsyncPostgresSaver that loads the blobs of channel values off the event loop."""
+
+    async def _load_checkpoint_tuple(self, value: DictRow) -> CheckpointTuple:
+        """Prefetch the blobs of the row's channel values, then load the checkpoint.
+
+        Args:
+            value: Checkpoint row, as selected by AsyncPostgresSaver
+
+        Returns:
+            The checkpoint tuple of the row
+
+        """
+        if not isinstance(self.serde, DedupSerializer):
+            return await super()._load_checkpoint_tuple(value)
+        values = [(type_.decode(), data) for _, type_, data in value["channel_values"] or []]
+        async with self.serde.prefetched(values):
+            return await super()._load_checkpoint_tuple(value)
+
+
+@asynccontextmanager
+async def generate_checkpointer(
+    conn_string: str | None = None,
+    min_blob_size: int = DEFAULT_MIN_BLOB_SIZE,
+) -> AsyncIterator[DedupAsyncPostgresSaver]:
+    """Open a Postgres checkpointer storing large contents once.
+
+    Args:
+        conn_string: Postgres connection string (defaults to DATABASE_URL)
+        min_blob_size: Minimum size in characters of a value moved to the
+            blob table
+
+    Yields:
+        Checkpointer with its tables set up, open until the block exits
+
+    Raises:
+        ValueError: If no connection string is given or configured
+
+    """
+    conn_string = conn_string or os.getenv(DATABASE_URL_ENV)
+    if not conn_string:
+        raise ValueError(f"{DATABASE_URL_ENV} is not set; no database to store checkpoints in")
+
+    # Connection settings AsyncPostgresSaver requires
+    async with AsyncConnectionPool(
+        conn_string,
+        open=False,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+    ) as pool:
+        blob_store = AsyncPostgresBlobStore(pool)
+        checkpointer = DedupAsyncPostgresSaver(
+            pool, serde=DedupSerializer(blob_store, min_blob_size=min_blob_size)
+        )
+        await blob_store.asetup()
+        await checkpointer.setup()
+        yield checkpointer
@@ -0,0 +1,272 @@
+"""Checkpoint serializer that moves large values into a blob store.
+
+LangGraph checkpointers serialize every changed channel value on every
+checkpoint. Channels such as the DeepAgents "files" channel hold large file
+contents (manifests, requirements, proto files) that stay identical across
+many checkpoints and threads, so the same bytes are written again and again.
+
+DedupSerializer wraps the regular serializer: large strings and lists of
+strings (FileData "content" is a list of lines) are serialized separately,
+stored once in a content-addressed BlobStore, and replaced by a small marker
+holding their hash. Values without large contents are serialized unchanged,
+so existing checkpoints stay readable.
+
+    blob_store = PostgresBlobStore(pool)
+    blob_store.setup()
+    checkpointer = PostgresSaver(pool, serde=DedupSerializer(blob_store))
+
+AsyncPostgresSaver loads channel values on the event loop, where the blob
+store must not be called synchronously. Readers on the event loop load the
+blobs of the values first with prefetched (see postgres.py):
+
+    async with serde.prefetched(values):
+        serde.loads_typed(values[0])  # no blob store call
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .blobs import AsyncBlobStore, BlobStore
+
+# Type tag prefix of checkpoint values whose large contents are in the blob store
+BLOB_TYPE_PREFIX = "blobref+"
+
+# Key of the marker dict replacing a value moved to the blob store
+BLOB_MARKER_KEY = "__checkpoint_blob__"
+
+# Strings (or lists of strings) with at least this many characters are moved
+DEFAULT_MIN_BLOB_SIZE = 1024
+
+# Number of blobs kept in memory to skip repeated writes and reads
+DEFAULT_BLOB_CACHE_SIZE = 256
+
+# Blobs loaded by DedupSerializer.prefetched for the current task (None if missing)
+_prefetched_blobs: ContextVar[Mapping[str, bytes | None] | None] = ContextVar(
+    "prefetched_checkpoint_blobs", default=None
+)
+
+
+class DedupSerializer:
+    """Serializer storing large contents once in a blob store, keyed by hash.
+
+    Attributes:
+        min_blob_size: Minimum size in characters of a moved value
+
+    """
+
+    def __init__(
+        self,
+        blob_store: BlobStore,
+        serde: SerializerProtocol | None = None,
+        min_blob_size: int = DEFAULT_MIN_BLOB_SIZE,
+        cache_size: int = DEFAULT_BLOB_CACHE_SIZE,
+    ):
+        """Initialize the serializer.
+
+        Args:
+            blob_store: Store receiving the large contents
+            serde: Serializer of checkpoint values and blobs (defaults to
+                LangGraph's JsonPlusSerializer)
+            min_blob_size: Minimum size in characters of a moved value
+            cache_size: Number of blobs kept in memory
+
+        """
+        self._blob_store = blob_store
+        self._serde = serde if serde is not None else JsonPlusSerializer()
+        self.min_blob_size = min_blob_size
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Serialize a value, moving its large contents to the blob store.
+
+        Args:
+            obj: Checkpoint value
+
+        Returns:
+            Type tag and serialized bytes
+
+        """
+        blobs: dict[str, bytes] = {}
+        stripped = self._extract(obj, blobs)
+        type_, data = self._serde.dumps_typed(stripped)
+        if not blobs:
+            return type_, data
+        self._put_blobs(blobs)
+        return f"{BLOB_TYPE_PREFIX}{type_}", data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        """Deserialize a value, restoring contents from the blob store.
+
+        Args:
+            data: Type tag and serialized bytes
+
+        Returns:
+            The checkpoint value
+
+        Raises:
+            KeyError: If a referenced blob is missing from the blob store
+
+        """
+        type_, payload = data
+        if not type_.startswith(BLOB_TYPE_PREFIX):
+            return self._serde.loads_typed(data)
+
+        obj = self._serde.loads_typed((type_[len(BLOB_TYPE_PREFIX):], payload))
+        hashes: set[str] = set()
+        _collect_markers(obj, hashes)
+        blobs = self._get_blobs(hashes)
+        return self._restore(obj, blobs)
+
+    @asynccontextmanager
+    async def prefetched(self, values: Iterable[tuple[str, bytes]]) -> AsyncIterator[None]:
+        """Load the blobs of serialized values for loads_typed calls in the block.
+
+        Blobs are read with the store's async methods, or in a worker thread
+        for sync stores. Within the block, loads_typed of the values (in
+        the same task, or in threads started from it) uses them without
+        calling the blob store.
+
+        Args:
+            values: Type tags and serialized bytes of the values to be loaded
+
+        """
+        hashes: set[str] = set()
+        for type_, payload in values:
+            if type_.startswith(BLOB_TYPE_PREFIX):
+                obj = self._serde.loads_typed((type_[len(BLOB_TYPE_PREFIX):], payload))
+                _collect_markers(obj, hashes)
+        blobs = await self._aget_blobs(hashes)
+        # Missing blobs are remembered too, so loads_typed raises without a store call
+        token = _prefetched_blobs.set({digest: blobs.get(digest) for digest in hashes})
+        try:
+            yield
+        finally:
+            _prefetched_blobs.reset(token)
+
+    def _extract(self, obj: Any, blobs: dict[str, bytes]) -> Any:
+        """Return obj with large contents replaced by markers, adding them to blobs."""
+        if isinstance(obj, str):
+            return self._to_marker(obj, blobs) if len(obj) >= self.min_blob_size else obj
+        if type(obj) is dict:
+            return {key: self._extract(value, blobs) for key, value in obj.items()}
+        if type(obj) is list:
+            if obj and all(isinstance(item, str) for item in obj):
+                if sum(len(item) for item in obj) >= self.min_blob_size:
+                    return self._to_marker(obj, blobs)
+                return obj
+            return [self._extract(item, blobs) for item in obj]
+        if type(obj) is tuple:
+            return tuple(self._extract(item, blobs) for item in obj)
+        return obj
+
+    def _to_marker(self, value: str | list[str], blobs: dict[str, bytes]) -> dict[str, str]:
+        """Serialize a large value as a blob and return the marker replacing it."""
+        type_, data = self._serde.dumps_typed(value)
+        blob = type_.encode() + b"\0" + data
+        digest = hashlib.sha256(blob).hexdigest()
+        blobs[digest] = blob
+        return {BLOB_MARKER_KEY: digest}
+
+    def _restore(self, obj: Any, blobs: dict[str, bytes]) -> Any:
+        """Return obj with markers replaced by the deserialized blobs."""
+        if type(obj) is dict:
+            digest = _marker_hash(obj)
+            if digest is not None:
+                if digest not in blobs:
+                    raise KeyError(f"Checkpoint blob {digest} is missing from the blob store")
+                type_, _, data = blobs[digest].partition(b"\0")
+                return self._serde.loads_typed((type_.decode(), data))
+            return {key: self._restore(value, blobs) for key, value in obj.items()}
+        if type(obj) is list:
+            return [self._restore(item, blobs) for item in obj]
+        if type(obj) is tuple:
+            return tuple(self._restore(item, blobs) for item in obj)
+        return obj
+
+    def _put_blobs(self, blobs: dict[str, bytes]) -> None:
+        """Write blobs that were not recently written or read."""
+        with self._lock:
+            new_blobs = {digest: blob for digest, blob in blobs.items() if digest not in self._cache}
+        if new_blobs:
+            self._blob_store.put_many(new_blobs)
+        self._remember(blobs)
+
+    def _get_blobs(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return blobs prefetched or cached, reading the others from the blob store."""
+        blobs, missing = self._cached_blobs(hashes)
+        if missing:
+            loaded = self._blob_store.get_many(missing)
+            self._remember(loaded)
+            blobs.update(loaded)
+        return blobs
+
+    async def _aget_blobs(self, hashes: Iterable[str]) -> dict[str, bytes]:
+        """Return blobs prefetched or cached, reading the others off the event loop."""
+        blobs, missing = self._cached_blobs(hashes)
+        if missing:
+            if isinstance(self._blob_store, AsyncBlobStore):
+                loaded = await self._blob_store.aget_many(missing)
+            else:
+                loaded = await asyncio.to_thread(self._blob_store.get_many, missing)
+            self._remember(loaded)
+            blobs.update(loaded)
+        return blobs
+
+    def _cached_blobs(self, hashes: Iterable[str]) -> tuple[dict[str, bytes], list[str]]:
+        """Split hashes into the blobs prefetched or cached and the missing hashes."""
+        prefetched = _prefetched_blobs.get() or {}
+        blobs: dict[str, bytes] = {}
+        missing: list[str] = []
+        with self._lock:
+            for digest in hashes:
+                if digest in prefetched:
+                    blob = prefetched[digest]
+                    if blob is not None:
+                        blobs[digest] = blob
+                elif digest in self._cache:
+                    self._cache.move_to_end(digest)
+                    blobs[digest] = self._cache[digest]
+                else:
+                    missing.append(digest)
+        return blobs, missing
+
+    def _remember(self, blobs: dict[str, bytes]) -> None:
+        """Add blobs to the bounded in-memory cache."""
+        with self._lock:
+            for digest, blob in blobs.items():
+                self._cache[digest] = blob
+                self._cache.move_to_end(digest)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+
+def _marker_hash(obj: dict[Any, Any]) -> str | None:
+    """Return the blob hash of a marker dict, or None if obj is not a marker."""
+    if len(obj) == 1 and isinstance(obj.get(BLOB_MARKER_KEY), str):
+        return obj[BLOB_MARKER_KEY]
+    return None
+
+
+def _collect_markers(obj: Any, hashes: set[str]) -> None:
+    """Add the blob hashes of all markers in obj to hashes."""
+    if type(obj) is dict:
+        digest = _marker_hash(obj)
+        if digest is not None:
+            hashes.add(digest)
+            return
+        for value in obj.values():
+            _collect_markers(value, hashes)
+    elif type(obj) in (list, tuple):
+        for item in obj:
+            _collect_markers(item, hashes)
@@ -0,0 +1,255 @@
+"""In-process metrics registry shared by Graph Fleet components.
+
+Components record counters (how often something happened) and observations
+(durations, sizes) under a metric name plus string labels:
+
+    registry = get_metrics_registry()
+    registry.increment("repos.fetch", repository="project-planton", outcome="pull")
+    with registry.timer("repos.git_seconds", repository="project-planton", phase="pull"):
+        ...
+
+Values are aggregated in memory and can be read back with counter(),
+summary() or snapshot(). Hooks registered with add_hook() receive every
+recorded value as a MetricEvent, which is how metrics are forwarded to an
+external system (Prometheus, OpenTelemetry, logs) without this module
+depending on one.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Literal, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+MetricKind = Literal["counter", "observation"]
+
+# Metric name plus sorted (label, value) pairs
+_MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class MetricEvent(NamedTuple):
+    """A single recorded metric value, as passed to hooks.
+
+    Attributes:
+        kind: "counter" for increments, "observation" for durations and sizes
+        name: Metric name (e.g. "repos.git_seconds")
+        value: Increment or observed value
+        labels: Label names and values
+
+    """
+
+    kind: MetricKind
+    name: str
+    value: float
+    labels: Mapping[str, str]
+
+
+MetricsHook = Callable[[MetricEvent], None]
+
+
+@dataclass
+class MetricSummary:
+    """Aggregate of the values observed for one metric and label set.
+
+    Attributes:
+        count: Number of observations
+        total: Sum of the observed values
+        min: Smallest observed value
+        max: Largest observed value
+
+    """
+
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+
+    @property
+    def mean(self) -> float:
+        """Return the mean observed value (0.0 without observations)."""
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, value: float) -> None:
+        """Add an observed value to the summary."""
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and observation summaries."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: dict[_MetricKey, float] = {}
+        self._summaries: dict[_MetricKey, MetricSummary] = {}
+        self._hooks: list[MetricsHook] = []
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Metric name
+            value: Amount to add
+            **labels: Label names and values
+
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+        self._emit(MetricEvent("counter", name, value, labels))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record an observed value such as a duration or a size.
+
+        Args:
+            name: Metric name
+            value: Observed value
+            **labels: Label names and values
+
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._summaries.setdefault(key, MetricSummary()).add(value)
+        self._emit(MetricEvent("observation", name, value, labels))
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the wall time of a block in seconds.
+
+        The time is recorded even if the block raises.
+
+        Args:
+            name: Metric name
+            **labels: Label names and values
+
+        Yields:
+            None while the block runs
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return the value of a counter (0.0 if never incremented).
+
+        Args:
+            name: Metric name
+            **labels: Label names and values
+
+        Returns:
+            Current counter value
+
+        """
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0.0)
+
+    def summary(self, name: str, **labels: str) -> MetricSummary | None:
+        """Return a copy of the summary of an observed metric.
+
+        Args:
+            name: Metric name
+            **labels: Label names and values
+
+        Returns:
+            The summary, or None if nothing was observed
+
+        """
+        with self._lock:
+            summary = self._summaries.get(_key(name, labels))
+            if summary is None:
+                return None
+            return MetricSummary(summary.count, summary.total, summary.min, summary.max)
+
+    def snapshot(self, prefix: str = "") -> dict[str, Any]:
+        """Return all metrics as plain data, e.g. for logging or an HTTP endpoint.
+
+        Args:
+            prefix: Only include metrics whose name starts with this prefix
+
+        Returns:
+            Dictionary with "counters" and "summaries", each a list of entries
+            holding the metric name, labels and values
+
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+                if name.startswith(prefix)
+            ]
+            summaries = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": summary.count,
+                    "total": summary.total,
+                    "min": summary.min,
+                    "max": summary.max,
+                }
+                for (name, labels), summary in sorted(self._summaries.items())
+                if name.startswith(prefix)
+            ]
+        return {"counters": counters, "summaries": summaries}
+
+    def add_hook(self, hook: MetricsHook) -> Callable[[], None]:
+        """Register a function called with every recorded value.
+
+        Hooks run synchronously in the recording thread; exceptions they raise
+        are logged and ignored.
+
+        Args:
+            hook: Function receiving MetricEvent values
+
+        Returns:
+            Function that unregisters the hook
+
+        """
+        with self._lock:
+            self._hooks.append(hook)
+
+        def remove() -> None:
+            with self._lock:
+                if hook in self._hooks:
+                    self._hooks.remove(hook)
+
+        return remove
+
+    def reset(self) -> None:
+        """Clear all recorded values (hooks stay registered)."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def _emit(self, event: MetricEvent) -> None:
+        """Pass an event to every registered hook."""
+        with self._lock:
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logger.warning(f"Metrics hook {hook!r} failed for {event.name}: {e}")
+
+
+def _key(name: str, labels: Mapping[str, str]) -> _MetricKey:
+    """Return the aggregation key of a metric name and label set."""
+    return name, tuple(sorted(labels.items()))
+
+
+# Process-wide registry used by default
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _registry
@@ -5,18 +5,50 @@ external repositories (like project-planton) that agents need to access
 proto files or other resources.
 
 All agents share the same repository cache at ~/.cache/graph-fleet/repos/
-to avoid redundant clones.
+to avoid redundant clones. Fetched files are also kept as content-addressed
+snapshots, so agents can start from the last good snapshot when Git is
+unavailable. The afetch_* functions fetch many repositories concurrently
+from asyncio code. Files mounted into agent threads are kept once in a shared
+file store; thread state only references them.
 """
 
 from .config import RepositoryConfig, get_repository_config
-from .fetcher import RepositoryFetchError, fetch_repository
+from .fetcher import (
+    RepositoryFetchError,
+    afetch_repositories,
+    afetch_repository,
+    afetch_repository_snapshot,
+    afetch_repository_snapshots,
+    fetch_repository,
+    fetch_repository_snapshot,
+)
 from .middleware import RepositoryFilesMiddleware
+from .shared_files import (
+    RepositoryFilesState,
+    SharedFileRef,
+    SharedFilesBackend,
+    SharedFileStore,
+    get_shared_file_store,
+)
+from .snapshots import RepositorySnapshot, SnapshotStore
 
 __all__ = [
     "RepositoryConfig",
     "get_repository_config",
     "fetch_repository",
+    "fetch_repository_snapshot",
+    "afetch_repository",
+    "afetch_repository_snapshot",
+    "afetch_repositories",
+    "afetch_repository_snapshots",
     "RepositoryFetchError",
+    "RepositorySnapshot",
+    "SnapshotStore",
     "RepositoryFilesMiddleware",
+    "RepositoryFilesState",
+    "SharedFileRef",
+    "SharedFileStore",
+    "SharedFilesBackend",
+    "get_shared_file_store",
 ]
 
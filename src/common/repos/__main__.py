@@ -0,0 +1,48 @@
+"""Command-line entry point for shared repository tasks.
+
+Usage:
+    python -m src.common.repos bundle --output repo-bundle.tar.gz [name ...]
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from .bundle import build_bundle
+from .config import get_repository_config
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse command-line arguments and run the requested task."""
+    parser = argparse.ArgumentParser(prog="python -m src.common.repos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bundle_parser = subparsers.add_parser(
+        "bundle",
+        help="Build a pre-fetched repository bundle for offline startup",
+    )
+    bundle_parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Path of the bundle tarball to write",
+    )
+    bundle_parser.add_argument(
+        "repositories",
+        nargs="*",
+        default=["project-planton"],
+        help="Names of the repositories to bundle (default: project-planton)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "bundle":
+        configs = [get_repository_config(name) for name in args.repositories]
+        output = build_bundle(configs, args.output)
+        logger.info(f"Wrote repository bundle to {output}")
+
+
+if __name__ == "__main__":
+    main()
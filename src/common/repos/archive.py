@@ -0,0 +1,199 @@
+"""HTTP archive backend for repository fetching.
+
+Instead of cloning, the "archive" fetch mode downloads the branch tarball of a
+repository (for GitHub: `<repo>/archive/refs/heads/<branch>.tar.gz`) and
+extracts only the members under the configured checkout paths while the
+download streams in. It needs no git binary, and nothing outside repo_path is
+ever written to disk.
+
+The extracted files are laid out exactly like a Git working tree:
+
+    <CACHE_DIR>/<name>/<repo_path>/<file>
+
+so everything downstream of the fetcher (file lookup, snapshots, bundles) works
+unchanged. The commit SHA is taken from the pax header `git archive` writes
+into every tarball. Refreshes send the previous ETag, so an unchanged branch
+costs a single 304 response.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tarfile
+import urllib.error
+import urllib.request
+from pathlib import Path, PurePosixPath
+from typing import IO, NamedTuple
+
+from .config import RepositoryConfig
+
+logger = logging.getLogger(__name__)
+
+# Network timeout for archive downloads (per socket operation)
+DEFAULT_ARCHIVE_TIMEOUT_SECONDS = float(
+    os.getenv("GRAPH_FLEET_REPO_ARCHIVE_TIMEOUT_SECONDS", "60")
+)
+
+_USER_AGENT = "graph-fleet-repo-fetcher"
+
+
+class ArchiveResult(NamedTuple):
+    """Outcome of a successful archive download.
+
+    Attributes:
+        commit: Commit SHA of the archive (or a content digest if the archive
+            does not record one)
+        etag: ETag of the response, used for conditional refreshes
+        files: Number of files extracted
+
+    """
+
+    commit: str
+    etag: str | None
+    files: int
+
+
+def archive_url(config: RepositoryConfig) -> str:
+    """Return the URL of the branch tarball for a repository.
+
+    Uses config.archive_url if set ("{branch}" is substituted), otherwise the
+    GitHub archive URL derived from config.url.
+
+    Args:
+        config: Repository configuration
+
+    Returns:
+        URL of the .tar.gz archive
+
+    """
+    if config.archive_url:
+        return config.archive_url.format(branch=config.branch)
+    base = config.url.removesuffix(".git").rstrip("/")
+    return f"{base}/archive/refs/heads/{config.branch}.tar.gz"
+
+
+def fetch_archive(
+    config: RepositoryConfig,
+    target_dir: Path,
+    etag: str | None = None,
+    timeout: float | None = None,
+) -> ArchiveResult | None:
+    """Download a repository archive and extract the checkout paths into target_dir.
+
+    Extraction goes to a temporary directory that replaces target_dir only
+    after the whole archive was read, so target_dir never holds a partial
+    extraction.
+
+    Args:
+        config: Repository configuration (URL, branch and paths to extract)
+        target_dir: Directory to hold the extracted files
+        etag: ETag of the archive currently in target_dir, if any
+        timeout: Network timeout in seconds. None uses
+            GRAPH_FLEET_REPO_ARCHIVE_TIMEOUT_SECONDS.
+
+    Returns:
+        The result of the download, or None if the server reported the archive
+        unchanged since etag
+
+    Raises:
+        OSError: If the download fails or the files cannot be written
+        tarfile.TarError: If the archive is malformed
+
+    """
+    if timeout is None:
+        timeout = DEFAULT_ARCHIVE_TIMEOUT_SECONDS
+
+    url = archive_url(config)
+    headers = {"User-Agent": _USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    request = urllib.request.Request(url, headers=headers)
+
+    tmp_dir = target_dir.with_name(f".{target_dir.name}.{os.getpid()}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    try:
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                logger.info(f"Archive of '{config.name}' not modified ({url})")
+                return None
+            raise
+        with response:
+            tmp_dir.mkdir(parents=True)
+            commit, extracted = _extract_paths(response, tmp_dir, config.checkout_paths())
+            new_etag = response.headers.get("ETag")
+
+        _replace_dir(tmp_dir, target_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    logger.info(f"Extracted {extracted} files of '{config.name}' from {url}")
+    return ArchiveResult(commit=commit, etag=new_etag, files=extracted)
+
+
+def _extract_paths(
+    fileobj: IO[bytes],
+    target_dir: Path,
+    paths: list[str],
+) -> tuple[str, int]:
+    """Stream a .tar.gz and write the regular files under *paths* to target_dir.
+
+    Archives have a single top-level directory (e.g. "repo-main/"), which is
+    stripped from member names.
+
+    Args:
+        fileobj: Readable binary stream of the gzipped tarball
+        target_dir: Directory to write the files into
+        paths: Repository-relative directories to extract
+
+    Returns:
+        Tuple of the archive's commit SHA and the number of extracted files
+
+    Raises:
+        tarfile.TarError: If the archive is malformed
+
+    """
+    prefixes = tuple(f"{path.strip('/')}/" for path in paths)
+    digest = hashlib.sha256()
+    extracted = 0
+    commit: str | None = None
+
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        for member in tar:
+            if commit is None:
+                # git archive stores the commit SHA in the pax global header
+                commit = tar.pax_headers.get("comment") or None
+            if not member.isfile():
+                continue
+            parts = PurePosixPath(member.name).parts[1:]
+            if not parts or ".." in parts:
+                continue
+            relative_path = "/".join(parts)
+            if not relative_path.startswith(prefixes):
+                continue
+            source = tar.extractfile(member)
+            if source is None:
+                continue
+            content = source.read()
+            destination = target_dir.joinpath(*parts)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.write_bytes(content)
+            digest.update(relative_path.encode("utf-8") + b"\0" + content)
+            extracted += 1
+
+    return commit or f"archive-{digest.hexdigest()[:40]}", extracted
+
+
+def _replace_dir(source: Path, target: Path) -> None:
+    """Move source to target, replacing any existing target directory."""
+    if target.exists():
+        old = target.with_name(f".{target.name}.{os.getpid()}.old")
+        os.rename(target, old)
+        os.rename(source, target)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.rename(source, target)
@@ -0,0 +1,167 @@
+"""Pre-fetched repository bundles baked into the container image.
+
+A bundle is a gzipped tarball holding one snapshot per repository, built at
+image build time when network access is available:
+
+    <name>/bundle.json          # {"repository", "commit", "files": [...]}
+    <name>/files/<repo path>    # File contents
+
+When GRAPH_FLEET_REPO_BUNDLE points at a bundle, fetch_repository_snapshot
+serves the bundled snapshot first, so startup needs no network access and takes
+the same time on every pod. Set GRAPH_FLEET_REPO_BUNDLE_REFRESH=true to let
+agents refresh the repository from Git after startup.
+
+Build a bundle with:
+
+    python -m src.common.repos bundle --output repo-bundle.tar.gz
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+import tarfile
+from collections.abc import Iterable
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from .config import RepositoryConfig
+from .snapshots import RepositorySnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def write_bundle(snapshots: Iterable[RepositorySnapshot], output: Path) -> Path:
+    """Write repository snapshots into a bundle tarball.
+
+    The same snapshots always give the same bytes: entries are sorted and
+    carry no timestamps, and the gzip header has neither mtime nor filename.
+
+    Args:
+        snapshots: Snapshots to include (one per repository)
+        output: Path of the bundle to create
+
+    Returns:
+        Path of the written bundle
+
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    with (
+        open(tmp_output, "wb") as raw,
+        gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz,
+        tarfile.open(fileobj=gz, mode="w") as tar,
+    ):
+        for snapshot in snapshots:
+            metadata = {
+                "repository": snapshot.repository,
+                "commit": snapshot.commit,
+                "files": sorted(snapshot.files),
+            }
+            _add_member(
+                tar,
+                f"{snapshot.repository}/bundle.json",
+                json.dumps(metadata, indent=2).encode("utf-8"),
+            )
+            for path, content in sorted(snapshot.files.items()):
+                _add_member(tar, f"{snapshot.repository}/files/{path}", content)
+    os.replace(tmp_output, output)
+    return output
+
+
+def build_bundle(configs: Iterable[RepositoryConfig], output: Path) -> Path:
+    """Fetch repositories and write their snapshots into a bundle.
+
+    Args:
+        configs: Repositories to include
+        output: Path of the bundle to create
+
+    Returns:
+        Path of the written bundle
+
+    Raises:
+        RepositoryFetchError: If any repository cannot be fetched, even if an
+            earlier snapshot of it exists
+
+    """
+    # Imported here because the fetcher itself loads bundles
+    from .fetcher import fetch_repository_snapshot
+
+    snapshots = []
+    for config in configs:
+        # A bundle must hold the current files, never a fallback snapshot
+        snapshot = fetch_repository_snapshot(config, use_bundle=False, fallback=False)
+        logger.info(
+            f"Bundling '{config.name}' at {snapshot.commit[:12]} "
+            f"({len(snapshot.files)} files)"
+        )
+        snapshots.append(snapshot)
+    return write_bundle(snapshots, output)
+
+
+def load_bundled_snapshot(
+    config: RepositoryConfig,
+    bundle_path: Path | None,
+) -> RepositorySnapshot | None:
+    """Load the snapshot of a repository from a bundle.
+
+    Args:
+        config: Repository configuration whose files must be in the bundle
+        bundle_path: Path of the bundle, or None if no bundle is configured
+
+    Returns:
+        The bundled snapshot, or None if there is no bundle, the repository is
+        not bundled, or the bundle lacks any requested file
+
+    """
+    if bundle_path is None or not bundle_path.exists():
+        return None
+
+    prefix = f"{config.name}/"
+    metadata: dict[str, Any] | None = None
+    files: dict[str, bytes] = {}
+    try:
+        with tarfile.open(bundle_path, "r:gz") as tar:
+            for member in tar:
+                if not member.isfile() or not member.name.startswith(prefix):
+                    continue
+                extracted = tar.extractfile(member)
+                if extracted is None:
+                    continue
+                content = extracted.read()
+                relative_name = member.name[len(prefix):]
+                if relative_name == "bundle.json":
+                    metadata = json.loads(content)
+                elif relative_name.startswith("files/"):
+                    files[relative_name[len("files/"):]] = content
+    except (OSError, tarfile.TarError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable repository bundle {bundle_path}: {e}")
+        return None
+
+    if metadata is None:
+        return None
+
+    selected, missing = config.select_paths(files)
+    if missing:
+        logger.warning(
+            f"Repository bundle {bundle_path} is missing files of "
+            f"'{config.name}': {', '.join(missing)}"
+        )
+        return None
+
+    return RepositorySnapshot(
+        repository=config.name,
+        commit=metadata["commit"],
+        files=MappingProxyType({path: files[path] for path in selected}),
+    )
+
+
+def _add_member(tar: tarfile.TarFile, name: str, content: bytes) -> None:
+    """Add an in-memory file to a tarball with a fixed mtime for reproducible output."""
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    info.mode = 0o644
+    info.mtime = 0
+    tar.addfile(info, io.BytesIO(content))
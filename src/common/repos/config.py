@@ -4,11 +4,27 @@ This module defines available repositories that Graph Fleet agents can use.
 Each repository configuration specifies:
 - Git repository URL
 - Path within the repository to fetch files from
-- Specific files to fetch (or patterns)
+- Specific files to fetch, or glob patterns matching many files across
+  directories (e.g. "*/v1/*.proto")
+- How the repository should be fetched (shallow clone, sparse clone, or
+  HTTP archive download)
+- How long a fetched copy is considered fresh before checking the remote again
 """
 
+import os
+import re
+from collections.abc import Iterable
+from functools import lru_cache
 from pathlib import Path
-from typing import NamedTuple
+from typing import Literal, NamedTuple
+
+# Supported fetch modes:
+# - "shallow": `git clone --depth 1` of the whole repository
+# - "sparse": blobless partial clone with a sparse checkout restricted to the
+#   paths the agent actually needs (repo_path + sparse_paths)
+# - "archive": download the branch tarball over HTTP and extract only
+#   repo_path + sparse_paths (no git binary needed, see archive.py)
+FetchMode = Literal["shallow", "sparse", "archive"]
 
 
 class RepositoryConfig(NamedTuple):
@@ -18,7 +34,19 @@ class RepositoryConfig(NamedTuple):
         name: Unique identifier for this repository (used for caching)
         url: Git repository URL (HTTPS)
         repo_path: Path within the repository to the files we need
-        files: List of file names to fetch from repo_path
+        files: File names or glob patterns, relative to repo_path. Patterns
+            support "*" and "?" within one path segment, "[...]" character
+            classes, and "**" for any number of directories.
+        fetch_mode: How to fetch the repository ("shallow", "sparse" or
+            "archive")
+        sparse_paths: Additional repository paths to include in the sparse
+            checkout or archive extraction, besides repo_path (used in
+            "sparse" and "archive" modes)
+        branch: Branch to track on the remote
+        refresh_ttl_seconds: How long a fetched copy is used without contacting
+            the remote. None uses DEFAULT_REFRESH_TTL_SECONDS.
+        archive_url: URL of the branch tarball for "archive" mode, with
+            "{branch}" substituted. None derives the GitHub archive URL from url.
 
     """
     
@@ -26,11 +54,139 @@ class RepositoryConfig(NamedTuple):
     url: str
     repo_path: str
     files: list[str]
+    fetch_mode: FetchMode = "shallow"
+    sparse_paths: tuple[str, ...] = ()
+    branch: str = "main"
+    refresh_ttl_seconds: int | None = None
+    archive_url: str | None = None
+
+    def refresh_ttl(self) -> int:
+        """Return the effective freshness TTL for this repository in seconds."""
+        if self.refresh_ttl_seconds is not None:
+            return self.refresh_ttl_seconds
+        return DEFAULT_REFRESH_TTL_SECONDS
+
+    def checkout_paths(self) -> list[str]:
+        """Return the repository paths that must be present in the working tree.
+
+        Returns:
+            repo_path followed by any extra sparse_paths, without duplicates
+
+        """
+        paths = [self.repo_path]
+        for path in self.sparse_paths:
+            if path not in paths:
+                paths.append(path)
+        return paths
+
+    def select_paths(self, available: Iterable[str]) -> tuple[list[str], list[str]]:
+        """Select the requested files from the paths present in a repository.
+
+        All entries of files are resolved in a single pass over *available*.
+
+        Args:
+            available: Repository-relative paths of the files that exist
+
+        Returns:
+            Tuple of the selected repository-relative paths (literal files in
+            the configured order, then pattern matches sorted by path) and the
+            entries of files that matched nothing
+
+        """
+        prefix = f"{self.repo_path.strip('/')}/"
+        candidates = {
+            path[len(prefix):] for path in available if path.startswith(prefix)
+        }
+
+        selected: list[str] = []
+        missing: list[str] = []
+        patterns: list[tuple[str, re.Pattern[str]]] = []
+        for entry in self.files:
+            if is_file_pattern(entry):
+                patterns.append((entry, _compile_file_pattern(entry)))
+            elif entry in candidates:
+                selected.append(entry)
+            else:
+                missing.append(entry)
+
+        if patterns:
+            matched = {entry: False for entry, _ in patterns}
+            literal = set(selected)
+            for candidate in sorted(candidates):
+                for entry, regex in patterns:
+                    if regex.fullmatch(candidate):
+                        matched[entry] = True
+                        if candidate not in literal:
+                            selected.append(candidate)
+                            literal.add(candidate)
+            missing.extend(entry for entry, found in matched.items() if not found)
+
+        return [f"{prefix}{path}" for path in selected], missing
+
+
+def is_file_pattern(entry: str) -> bool:
+    """Return True if a RepositoryConfig.files entry is a glob pattern."""
+    return any(char in entry for char in "*?[")
+
+
+@lru_cache(maxsize=256)
+def _compile_file_pattern(pattern: str) -> re.Pattern[str]:
+    """Translate a glob pattern into a regex matching whole relative paths.
+
+    "*" and "?" never cross a "/"; "**/" matches zero or more directories and a
+    trailing "**" matches everything below.
+    """
+    parts: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape("["))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^/" + body[1:]
+                parts.append(f"[{body}]")
+                i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts))
 
 
 # Shared cache directory for all repositories
 CACHE_DIR = Path.home() / ".cache" / "graph-fleet" / "repos"
 
+# How long (in seconds) a cached repository is trusted without asking the remote
+# whether it changed. Within this window startup makes no network calls at all.
+# Set to 0 to always check the remote head (the pull itself is still skipped
+# when the remote head matches the cached commit).
+DEFAULT_REFRESH_TTL_SECONDS = int(os.getenv("GRAPH_FLEET_REPO_REFRESH_TTL_SECONDS", "300"))
+
+# Pre-fetched repository bundle baked into the container image (see bundle.py).
+# When set, repository snapshots are served from the bundle without network access.
+_bundle_path = os.getenv("GRAPH_FLEET_REPO_BUNDLE")
+REPO_BUNDLE_PATH = Path(_bundle_path) if _bundle_path else None
+
+# Whether agents keep bundled repositories current by re-fetching them from Git
+# after startup (e.g. the RDS agent's proto schema refresher). Off by default,
+# so a pod started from a bundle never runs Git.
+REPO_BUNDLE_REFRESH = os.getenv("GRAPH_FLEET_REPO_BUNDLE_REFRESH", "false").lower() == "true"
+
 
 # Repository definitions
 PROJECT_PLANTON = RepositoryConfig(
@@ -38,6 +194,9 @@ PROJECT_PLANTON = RepositoryConfig(
     url="https://github.com/project-planton/project-planton.git",
     repo_path="apis/org/project_planton/provider/aws/awsrdsinstance/v1",
     files=["api.proto", "spec.proto", "stack_outputs.proto"],
+    # Only three small proto files are needed from a large monorepo, so avoid
+    # downloading blobs and checking out anything outside repo_path
+    fetch_mode="sparse",
 )
 
 
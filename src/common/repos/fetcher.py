@@ -2,12 +2,105 @@
 
 This module handles cloning and updating Git repositories to a local cache,
 making repository files available for agents to use.
+
+Each fetch records the checked-out commit SHA and the time the remote was last
+checked in a small state file next to the cache. Within the repository's
+freshness TTL the cache is used as-is without any network round trip, and
+after the TTL a cheap `git ls-remote` decides whether a pull is needed at all.
+
+`fetch_repository_snapshot` additionally keeps a content-addressed snapshot of
+the requested files (see snapshots.py). Fresh caches are served straight from
+the snapshot, and the last good snapshot is served when fetching fails. A
+bundle baked into the image (see bundle.py) takes precedence over both.
+
+Cache updates are single-flight across processes (see locking.py): one process
+clones or pulls a repository while the others wait and then reuse its result.
+New clones are made in a temporary directory and renamed into place, so a
+half-finished clone is never mistaken for a usable cache.
+
+The fetch logic is written once as generators that yield the Git commands to
+run and receive their output. The synchronous API runs those commands with
+`subprocess.run`; the asyncio API (`afetch_*`) runs them as asyncio
+subprocesses, so many repositories can be fetched concurrently with a bounded
+concurrency limit and per-repository timeouts.
+
+Repositories in "archive" fetch mode skip Git entirely and download the branch
+tarball over HTTP (see archive.py).
+
+Every fetch records metrics in the shared registry (src/common/metrics.py):
+how each fetch was satisfied, wall time per Git phase, lock wait time and the
+bytes of every served file (see the METRIC_* names below).
 """
 
+import asyncio
+import json
+import logging
+import os
+import shutil
 import subprocess
+import tarfile
+import time
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+)
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
+from typing import Any, TypeVar
+
+from src.common.metrics import get_metrics_registry
+
+from .archive import archive_url, fetch_archive
+from .bundle import load_bundled_snapshot
+from .config import (
+    CACHE_DIR,
+    REPO_BUNDLE_PATH,
+    RepositoryConfig,
+    is_file_pattern,
+)
+from .files import atomic_write
+from .locking import RepositoryLockTimeout, arepository_lock, repository_lock
+from .snapshots import (
+    SNAPSHOT_DIRNAME,
+    RepositorySnapshot,
+    SnapshotStore,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A fetch step generator yields Git commands (argv lists), receives each
+# command's stdout, and returns its result when done. Failed commands are
+# thrown back into the generator as subprocess.CalledProcessError.
+GitSteps = Generator[list[str], str, T]
+
+# Metric names recorded in the shared metrics registry
+# Counter: how a fetch was satisfied. Labels: repository, outcome ("clone",
+# "pull", "remote_unchanged", "cache_hit", "archive_download", "archive_not_modified")
+METRIC_FETCHES = "repos.fetches"
+# Counter: where a served snapshot came from. Labels: repository, source
+# ("bundle", "snapshot", "fetched", "fallback")
+METRIC_SNAPSHOTS = "repos.snapshots"
+# Observation: seconds per Git command. Labels: repository, phase (e.g. "clone")
+METRIC_GIT_SECONDS = "repos.git_seconds"
+# Observation: seconds per archive download. Labels: repository
+METRIC_ARCHIVE_SECONDS = "repos.archive_seconds"
+# Observation: seconds spent waiting for the repository lock. Labels: repository
+METRIC_LOCK_WAIT_SECONDS = "repos.lock_wait_seconds"
+# Observation: bytes of each served file. Labels: repository, path, source
+METRIC_FILE_BYTES = "repos.file_bytes"
 
-from .config import CACHE_DIR, RepositoryConfig
+# Defaults for the asyncio multi-repository API
+DEFAULT_FETCH_CONCURRENCY = int(os.getenv("GRAPH_FLEET_REPO_FETCH_CONCURRENCY", "4"))
+DEFAULT_FETCH_TIMEOUT_SECONDS = float(os.getenv("GRAPH_FLEET_REPO_FETCH_TIMEOUT_SECONDS", "120"))
+
+# Maximum seconds a single Git command may run in the synchronous API
+GIT_COMMAND_TIMEOUT_SECONDS = float(os.getenv("GRAPH_FLEET_GIT_COMMAND_TIMEOUT_SECONDS", "120"))
 
 
 class RepositoryFetchError(Exception):
@@ -18,41 +111,129 @@ class RepositoryFetchError(Exception):
 
 def fetch_repository(config: RepositoryConfig) -> list[Path]:
     """Fetch files from a Git repository.
-    
+
     This function clones or updates the repository in the cache directory
-    and returns paths to the requested files.
-    
+    and returns paths to the requested files. An existing cache is only
+    pulled when the remote branch head differs from the cached commit, and
+    the remote is not contacted at all while the cache is within its
+    freshness TTL.
+
+    The update runs under the repository's cross-process lock. Processes
+    that had to wait for the lock find the cache freshly updated and reuse it.
+
+    Args:
+        config: Repository configuration specifying what to fetch
+
+    Returns:
+        List of Path objects pointing to the requested files in the cache
+
+    Raises:
+        RepositoryFetchError: If Git operations fail, files are not found, or
+            the repository lock cannot be acquired
+
+    """
+    return _run_locked(config, _fetch_steps(config))
+
+
+async def afetch_repository(
+    config: RepositoryConfig,
+    timeout: float | None = None,
+) -> list[Path]:
+    """Asyncio version of fetch_repository.
+
+    Git commands run as asyncio subprocesses and the lock is awaited without
+    blocking the event loop. On timeout the running Git process is killed and
+    any temporary clone is removed.
+
     Args:
         config: Repository configuration specifying what to fetch
-        
+        timeout: Maximum seconds for the whole fetch, including waiting for the
+            lock. None means no limit.
+
     Returns:
         List of Path objects pointing to the requested files in the cache
-        
+
+    Raises:
+        RepositoryFetchError: If Git operations fail, files are not found, the
+            lock cannot be acquired, or the timeout expires
+
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            return await _arun_locked(config, _fetch_steps(config))
+    except TimeoutError as e:
+        raise RepositoryFetchError(
+            f"Fetching repository '{config.name}' timed out after {timeout}s"
+        ) from e
+
+
+async def afetch_repositories(
+    configs: Iterable[RepositoryConfig],
+    *,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+) -> dict[str, list[Path]]:
+    """Fetch several repositories concurrently.
+
+    Args:
+        configs: Repository configurations to fetch
+        max_concurrency: Maximum number of repositories fetched at once. None
+            uses GRAPH_FLEET_REPO_FETCH_CONCURRENCY (default 4).
+        timeout: Per-repository timeout in seconds. None uses
+            GRAPH_FLEET_REPO_FETCH_TIMEOUT_SECONDS (default 120).
+
+    Returns:
+        Mapping of repository name to the paths of its requested files
+
+    Raises:
+        RepositoryFetchError: If any repository fails; raised after all other
+            repositories have finished, listing every failure
+
+    """
+    if timeout is None:
+        timeout = DEFAULT_FETCH_TIMEOUT_SECONDS
+    return await _gather_bounded(
+        configs,
+        lambda config: afetch_repository(config, timeout=timeout),
+        max_concurrency,
+    )
+
+
+def _fetch_steps(config: RepositoryConfig) -> GitSteps[list[Path]]:
+    """Clone or update a repository and return the requested file paths.
+
+    Must be driven while holding the repository lock (see _locked/_alocked).
+
+    Args:
+        config: Repository configuration specifying what to fetch
+
+    Returns:
+        List of Path objects pointing to the requested files in the cache
+
     Raises:
         RepositoryFetchError: If Git operations fail or files are not found
 
     """
     # Ensure cache directory exists
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    
+
     repo_cache_dir = CACHE_DIR / config.name
-    
-    try:
-        if repo_cache_dir.exists():
-            # Repository exists, pull latest changes
-            _git_pull(repo_cache_dir)
-        else:
-            # First run, clone the repository
-            _git_clone(config.url, repo_cache_dir)
-    except subprocess.CalledProcessError as e:
-        error_msg = (
-            f"Failed to fetch repository '{config.name}' from Git.\n"
-            f"Error: {e.stderr.decode() if e.stderr else str(e)}\n"
-            f"This operation requires network access to clone/update the repository.\n"
-            f"Repository URL: {config.url}"
-        )
-        raise RepositoryFetchError(error_msg) from e
-    
+
+    if config.fetch_mode == "archive":
+        # No Git involved: download the branch tarball over HTTP
+        try:
+            _refresh_archive(config, repo_cache_dir)
+        except (OSError, tarfile.TarError) as e:
+            error_msg = (
+                f"Failed to download archive of repository '{config.name}'.\n"
+                f"Error: {e}\n"
+                f"This operation requires network access to download the archive.\n"
+                f"Archive URL: {archive_url(config)}"
+            )
+            raise RepositoryFetchError(error_msg) from e
+    else:
+        yield from _git_fetch_steps(config, repo_cache_dir)
+
     # Verify files exist and return their paths
     files_dir = repo_cache_dir / config.repo_path
     if not files_dir.exists():
@@ -62,17 +243,9 @@ def fetch_repository(config: RepositoryConfig) -> list[Path]:
             f"The repository structure may have changed."
         )
         raise RepositoryFetchError(error_msg)
-    
-    file_paths = []
-    missing_files = []
-    
-    for file_name in config.files:
-        file_path = files_dir / file_name
-        if file_path.exists():
-            file_paths.append(file_path)
-        else:
-            missing_files.append(file_name)
-    
+
+    selected, missing_files = config.select_paths(_list_files(repo_cache_dir, config))
+
     if missing_files:
         error_msg = (
             f"Required files not found in repository '{config.name}'.\n"
@@ -80,45 +253,870 @@ def fetch_repository(config: RepositoryConfig) -> list[Path]:
             f"Location: {files_dir}"
         )
         raise RepositoryFetchError(error_msg)
-    
-    return file_paths
 
+    return [repo_cache_dir / relative_path for relative_path in selected]
+
+
+def _list_files(repo_dir: Path, config: RepositoryConfig) -> list[str]:
+    """Return the repository-relative paths that can satisfy config.files.
+
+    Literal file names are checked directly. The repo_path tree is only walked,
+    once, when config.files contains glob patterns.
+
+    Args:
+        repo_dir: Directory of the cached repository
+        config: Repository configuration
+
+    Returns:
+        Repository-relative paths of existing files
+
+    """
+    repo_path = config.repo_path.strip("/")
+    if not any(is_file_pattern(entry) for entry in config.files):
+        return [
+            f"{repo_path}/{entry}"
+            for entry in config.files
+            if (repo_dir / repo_path / entry).is_file()
+        ]
+
+    paths: list[str] = []
+    for dirpath, dirnames, filenames in os.walk(repo_dir / repo_path):
+        dirnames[:] = [d for d in dirnames if d != ".git"]
+        relative_dir = Path(dirpath).relative_to(repo_dir).as_posix()
+        paths.extend(f"{relative_dir}/{filename}" for filename in filenames)
+    return paths
+
+
+def fetch_repository_snapshot(
+    config: RepositoryConfig,
+    *,
+    use_bundle: bool = True,
+    fallback: bool = True,
+) -> RepositorySnapshot:
+    """Fetch the requested files of a repository as an immutable snapshot.
+
+    If a repository bundle is configured (GRAPH_FLEET_REPO_BUNDLE) and contains
+    the repository, the bundled snapshot is returned without any network or
+    Git access.
+
+    While the cache is within its freshness TTL and a snapshot of the recorded
+    commit exists, the files are loaded from the snapshot store without
+    running Git or reading the working tree. Otherwise the repository is
+    fetched with fetch_repository and the files are saved as a new snapshot.
+
+    If fetching fails, the most recent good snapshot is returned instead so
+    that agents can start without network access, unless fallback is False.
+
+    Args:
+        config: Repository configuration specifying what to fetch
+        use_bundle: Whether to serve the repository from the bundle if present
+        fallback: Whether to return the last good snapshot if fetching fails
+
+    Returns:
+        Snapshot mapping repository-relative paths to file contents
+
+    Raises:
+        RepositoryFetchError: If fetching fails and no previous snapshot exists
+            (or fallback is False)
+
+    """
+    snapshot = _load_local_snapshot(config, use_bundle)
+    if snapshot is not None:
+        return snapshot
+
+    store = _snapshot_store()
+    try:
+        return _run_locked(config, _snapshot_steps(config, store))
+    except (RepositoryFetchError, OSError) as e:
+        if not fallback:
+            raise _fetch_error(config, e)
+        return _fallback_snapshot(config, store, e)
+
+
+async def afetch_repository_snapshot(
+    config: RepositoryConfig,
+    *,
+    timeout: float | None = None,
+    use_bundle: bool = True,
+) -> RepositorySnapshot:
+    """Asyncio version of fetch_repository_snapshot.
+
+    A fetch that fails or exceeds the timeout falls back to the last good
+    snapshot, exactly like the synchronous version.
+
+    Args:
+        config: Repository configuration specifying what to fetch
+        timeout: Maximum seconds for the Git fetch, including waiting for the
+            lock. None means no limit.
+        use_bundle: Whether to serve the repository from the bundle if present
+
+    Returns:
+        Snapshot mapping repository-relative paths to file contents
+
+    Raises:
+        RepositoryFetchError: If fetching fails and no previous snapshot exists
+
+    """
+    snapshot = _load_local_snapshot(config, use_bundle)
+    if snapshot is not None:
+        return snapshot
+
+    store = _snapshot_store()
+    try:
+        async with asyncio.timeout(timeout):
+            return await _arun_locked(config, _snapshot_steps(config, store))
+    except TimeoutError as e:
+        error = RepositoryFetchError(
+            f"Fetching repository '{config.name}' timed out after {timeout}s"
+        )
+        error.__cause__ = e
+        return _fallback_snapshot(config, store, error)
+    except (RepositoryFetchError, OSError) as e:
+        return _fallback_snapshot(config, store, e)
+
+
+async def afetch_repository_snapshots(
+    configs: Iterable[RepositoryConfig],
+    *,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+) -> dict[str, RepositorySnapshot]:
+    """Fetch snapshots of several repositories concurrently.
+
+    Startup time tracks the slowest repository rather than the sum of all of
+    them.
+
+    Args:
+        configs: Repository configurations to fetch
+        max_concurrency: Maximum number of repositories fetched at once. None
+            uses GRAPH_FLEET_REPO_FETCH_CONCURRENCY (default 4).
+        timeout: Per-repository timeout in seconds. None uses
+            GRAPH_FLEET_REPO_FETCH_TIMEOUT_SECONDS (default 120).
+
+    Returns:
+        Mapping of repository name to its snapshot
+
+    Raises:
+        RepositoryFetchError: If any repository fails without a snapshot to fall
+            back to; raised after all other repositories have finished
+
+    """
+    if timeout is None:
+        timeout = DEFAULT_FETCH_TIMEOUT_SECONDS
+    return await _gather_bounded(
+        configs,
+        lambda config: afetch_repository_snapshot(config, timeout=timeout),
+        max_concurrency,
+    )
+
+
+def _snapshot_store() -> SnapshotStore:
+    """Return the snapshot store inside the repository cache directory."""
+    return SnapshotStore(CACHE_DIR / SNAPSHOT_DIRNAME)
+
+
+def _load_local_snapshot(
+    config: RepositoryConfig,
+    use_bundle: bool,
+) -> RepositorySnapshot | None:
+    """Return a snapshot available without Git: from the bundle or a fresh cache."""
+    if use_bundle:
+        bundled = load_bundled_snapshot(config, REPO_BUNDLE_PATH)
+        if bundled is not None:
+            logger.info(
+                f"Loaded '{config.name}' from bundle {REPO_BUNDLE_PATH} "
+                f"at {bundled.commit[:12]}"
+            )
+            return _record_snapshot(bundled, "bundle")
+
+    return _load_fresh_snapshot(config, _snapshot_store())
+
+
+def _snapshot_steps(
+    config: RepositoryConfig,
+    store: SnapshotStore,
+) -> GitSteps[RepositorySnapshot]:
+    """Fetch a repository and save the requested files as a snapshot.
+
+    Must be driven while holding the repository lock (see _locked/_alocked).
+
+    Args:
+        config: Repository configuration specifying what to fetch
+        store: Snapshot store to save into
+
+    Returns:
+        The saved snapshot, or the existing one if another process fetched the
+        repository while this one waited for the lock
+
+    Raises:
+        RepositoryFetchError: If Git operations fail or files are not found
+
+    """
+    # Another process may have fetched while this one waited for the lock
+    snapshot = _load_fresh_snapshot(config, store)
+    if snapshot is not None:
+        return snapshot
+
+    file_paths = yield from _fetch_steps(config)
+    state = _read_fetch_state(config)
+    if state is None:
+        raise RepositoryFetchError(
+            f"Fetch state for repository '{config.name}' was not recorded"
+        )
+    repo_cache_dir = CACHE_DIR / config.name
+    files = {
+        file_path.relative_to(repo_cache_dir).as_posix(): file_path.read_bytes()
+        for file_path in file_paths
+    }
+    return _record_snapshot(store.save(config, state["commit"], files), "fetched")
+
+
+def _record_snapshot(snapshot: RepositorySnapshot, source: str) -> RepositorySnapshot:
+    """Record metrics for a snapshot that is about to be served.
+
+    Args:
+        snapshot: The served snapshot
+        source: Where it came from ("bundle", "snapshot", "fetched" or "fallback")
+
+    Returns:
+        The snapshot, unchanged
+
+    """
+    metrics = get_metrics_registry()
+    metrics.increment(METRIC_SNAPSHOTS, repository=snapshot.repository, source=source)
+    for path, content in snapshot.files.items():
+        metrics.observe(
+            METRIC_FILE_BYTES,
+            len(content),
+            repository=snapshot.repository,
+            path=path,
+            source=source,
+        )
+    return snapshot
+
+
+def _record_fetch(config: RepositoryConfig, outcome: str) -> None:
+    """Count how a fetch of a repository was satisfied."""
+    get_metrics_registry().increment(METRIC_FETCHES, repository=config.name, outcome=outcome)
+
+
+def _fallback_snapshot(
+    config: RepositoryConfig,
+    store: SnapshotStore,
+    error: Exception,
+) -> RepositorySnapshot:
+    """Return the last good snapshot after a failed fetch, or raise the error.
+
+    Args:
+        config: Repository configuration that failed to fetch
+        store: Snapshot store to load the fallback from
+        error: The error that made the fetch fail
+
+    Returns:
+        The most recent good snapshot
+
+    Raises:
+        RepositoryFetchError: If there is no snapshot to fall back to
+
+    """
+    fallback = store.load_latest(config)
+    if fallback is None:
+        raise _fetch_error(config, error)
+    logger.warning(
+        f"Fetching '{config.name}' failed, falling back to last good snapshot "
+        f"{fallback.commit[:12]}: {error}"
+    )
+    return _record_snapshot(fallback, "fallback")
+
+
+def _fetch_error(config: RepositoryConfig, error: Exception) -> RepositoryFetchError:
+    """Return a failed fetch's error as a RepositoryFetchError."""
+    if isinstance(error, RepositoryFetchError):
+        return error
+    wrapped = RepositoryFetchError(f"Failed to read files of repository '{config.name}': {error}")
+    wrapped.__cause__ = error
+    return wrapped
+
+
+def _load_fresh_snapshot(
+    config: RepositoryConfig,
+    store: SnapshotStore,
+) -> RepositorySnapshot | None:
+    """Return the snapshot of the cached commit if the cache is within its TTL."""
+    state = _read_fetch_state(config)
+    if state is None or not _within_ttl(config, state) or not (CACHE_DIR / config.name).exists():
+        return None
+    snapshot = store.load(config, state["commit"])
+    if snapshot is not None:
+        logger.info(
+            f"Loaded '{config.name}' from snapshot {snapshot.commit[:12]} "
+            f"(cache within TTL)"
+        )
+        _record_snapshot(snapshot, "snapshot")
+    return snapshot
+
+
+@contextmanager
+def _locked(config: RepositoryConfig) -> Iterator[None]:
+    """Hold the cross-process update lock of a repository.
+
+    Args:
+        config: Repository configuration
+
+    Yields:
+        None while the lock is held
+
+    Raises:
+        RepositoryFetchError: If the lock cannot be acquired in time
+
+    """
+    start = time.perf_counter()
+    try:
+        with repository_lock(CACHE_DIR, config.name):
+            _record_lock_wait(config, start)
+            yield
+    except RepositoryLockTimeout as e:
+        raise RepositoryFetchError(
+            f"Repository '{config.name}' is being updated by another process: {e}"
+        ) from e
+
+
+@asynccontextmanager
+async def _alocked(config: RepositoryConfig) -> AsyncIterator[None]:
+    """Asyncio version of _locked; waits for the lock without blocking the loop."""
+    start = time.perf_counter()
+    try:
+        async with arepository_lock(CACHE_DIR, config.name):
+            _record_lock_wait(config, start)
+            yield
+    except RepositoryLockTimeout as e:
+        raise RepositoryFetchError(
+            f"Repository '{config.name}' is being updated by another process: {e}"
+        ) from e
+
+
+def _record_lock_wait(config: RepositoryConfig, start: float) -> None:
+    """Observe how long acquiring the lock of a repository took."""
+    get_metrics_registry().observe(
+        METRIC_LOCK_WAIT_SECONDS,
+        time.perf_counter() - start,
+        repository=config.name,
+    )
+
+
+async def _gather_bounded(
+    configs: Iterable[RepositoryConfig],
+    fetch: Callable[[RepositoryConfig], Awaitable[T]],
+    max_concurrency: int | None,
+) -> dict[str, T]:
+    """Run *fetch* for every config with at most *max_concurrency* running at once.
+
+    Args:
+        configs: Repository configurations to fetch
+        fetch: Coroutine function fetching a single repository
+        max_concurrency: Concurrency limit. None uses DEFAULT_FETCH_CONCURRENCY.
+
+    Returns:
+        Mapping of repository name to fetch result
+
+    Raises:
+        RepositoryFetchError: If any fetch failed, after all fetches finished
+
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_FETCH_CONCURRENCY)
+    config_list = list(configs)
+
+    async def bounded(config: RepositoryConfig) -> T:
+        async with semaphore:
+            return await fetch(config)
+
+    results = await asyncio.gather(
+        *(bounded(config) for config in config_list),
+        return_exceptions=True,
+    )
+
+    fetched: dict[str, T] = {}
+    failures: list[str] = []
+    for config, result in zip(config_list, results, strict=True):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            failures.append(f"{config.name}: {result}")
+        else:
+            fetched[config.name] = result
+
+    if failures:
+        raise RepositoryFetchError(
+            f"Failed to fetch {len(failures)} of {len(config_list)} repositories:\n"
+            + "\n".join(failures)
+        )
+    return fetched
+
+
+def _run_git_steps(steps: GitSteps[T], repository: str) -> T:
+    """Drive fetch steps, running each Git command with subprocess.run.
+
+    A command running longer than GIT_COMMAND_TIMEOUT_SECONDS is killed, and
+    the generator is closed so its cleanup still runs.
+
+    Args:
+        steps: Fetch step generator
+        repository: Repository name, used to label timing metrics
+
+    Returns:
+        The result returned by the generator
+
+    Raises:
+        RepositoryFetchError: If a Git command times out
+
+    """
+    try:
+        command = next(steps)
+        while True:
+            try:
+                with get_metrics_registry().timer(
+                    METRIC_GIT_SECONDS, repository=repository, phase=_git_phase(command)
+                ):
+                    result = subprocess.run(
+                        command,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                        timeout=GIT_COMMAND_TIMEOUT_SECONDS,
+                    )
+            except subprocess.TimeoutExpired as e:
+                raise RepositoryFetchError(
+                    f"'{' '.join(command)}' for repository '{repository}' timed out "
+                    f"after {e.timeout:.0f}s"
+                ) from e
+            except subprocess.CalledProcessError as e:
+                command = steps.throw(e)
+            else:
+                command = steps.send(result.stdout)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+async def _arun_locked(config: RepositoryConfig, steps: GitSteps[T]) -> T:
+    """Drive fetch steps under the repository lock from asyncio code.
+
+    Git commands run as asyncio subprocesses while the lock is awaited without
+    blocking the loop. "archive" mode downloads over HTTP with blocking I/O, so
+    the whole locked fetch runs in a worker thread instead: the thread takes
+    the lock, runs the steps and releases the lock. A thread cannot be
+    cancelled, so on timeout or cancellation the caller stops waiting while the
+    thread finishes writing the cache and only then releases the lock.
+
+    Args:
+        config: Repository configuration the steps fetch
+        steps: Fetch step generator
+
+    Returns:
+        The result returned by the generator
+
+    Raises:
+        RepositoryFetchError: If the lock cannot be acquired or the steps fail
+
+    """
+    if config.fetch_mode == "archive":
+        return await asyncio.to_thread(_run_locked, config, steps)
+    async with _alocked(config):
+        return await _arun_git_steps(steps, config.name)
+
+
+def _run_locked(config: RepositoryConfig, steps: GitSteps[T]) -> T:
+    """Drive fetch steps with subprocess.run while holding the repository lock."""
+    with _locked(config):
+        return _run_git_steps(steps, config.name)
+
+
+async def _arun_git_steps(steps: GitSteps[T], repository: str) -> T:
+    """Drive fetch steps, running each Git command as an asyncio subprocess.
+
+    If the coroutine is cancelled (e.g. by a timeout), the generator is closed
+    so its cleanup (such as removing a temporary clone) still runs.
+
+    Args:
+        steps: Fetch step generator
+        repository: Repository name, used to label timing metrics
+
+    Returns:
+        The result returned by the generator
+
+    """
+    try:
+        command = next(steps)
+        while True:
+            try:
+                with get_metrics_registry().timer(
+                    METRIC_GIT_SECONDS, repository=repository, phase=_git_phase(command)
+                ):
+                    stdout = await _arun_git(command)
+            except subprocess.CalledProcessError as e:
+                command = steps.throw(e)
+            else:
+                command = steps.send(stdout)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+def _git_phase(command: list[str]) -> str:
+    """Return the Git subcommand of a command line (e.g. "clone" or "ls-remote")."""
+    if not command or command[0] != "git":
+        return command[0] if command else "unknown"
+    args = command[1:]
+    while args and args[0].startswith("-"):
+        # Skip global options such as "-C <dir>"
+        args = args[2:] if args[0] == "-C" else args[1:]
+    return args[0] if args else "unknown"
+
+
+async def _arun_git(command: list[str]) -> str:
+    """Run a Git command as an asyncio subprocess and return its stdout.
+
+    Args:
+        command: Command line to run
+
+    Returns:
+        Decoded stdout of the command
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits with a non-zero status
+
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode or 1,
+            command,
+            output=stdout.decode(),
+            stderr=stderr.decode(),
+        )
+    return stdout.decode()
+
+
+def _within_ttl(config: RepositoryConfig, state: dict[str, Any]) -> bool:
+    """Return True if the remote was checked recently enough to skip checking again."""
+    age = time.time() - state.get("checked_at", 0.0)
+    return 0 <= age < config.refresh_ttl()
+
+
+def _git_fetch_steps(config: RepositoryConfig, repo_cache_dir: Path) -> GitSteps[None]:
+    """Clone or update the Git working tree of a repository in the cache.
+
+    Args:
+        config: Repository configuration in "shallow" or "sparse" mode
+        repo_cache_dir: Directory of the cached repository
+
+    Raises:
+        RepositoryFetchError: If Git operations fail
+
+    """
+    if repo_cache_dir.exists() and not (repo_cache_dir / ".git").exists():
+        # Left behind by an interrupted clone from before clones were atomic,
+        # or by a previous "archive" fetch of the same repository
+        logger.warning(f"Removing incomplete cache of '{config.name}' at {repo_cache_dir}")
+        shutil.rmtree(repo_cache_dir)
+
+    try:
+        if repo_cache_dir.exists():
+            # Repository exists, pull latest changes if the remote moved on
+            yield from _refresh_repository(config, repo_cache_dir)
+        else:
+            # First run, clone the repository
+            yield from _atomic_clone(config, repo_cache_dir)
+            _write_fetch_state(config, (yield from _git_head(repo_cache_dir)))
+            _record_fetch(config, "clone")
+    except subprocess.CalledProcessError as e:
+        error_msg = (
+            f"Failed to fetch repository '{config.name}' from Git.\n"
+            f"Error: {e.stderr if e.stderr else str(e)}\n"
+            f"This operation requires network access to clone/update the repository.\n"
+            f"Repository URL: {config.url}"
+        )
+        raise RepositoryFetchError(error_msg) from e
+
+
+def _refresh_archive(config: RepositoryConfig, repo_dir: Path) -> None:
+    """Download the repository archive unless the extracted copy is still current.
+
+    Within the freshness TTL nothing is downloaded. After it, the request
+    carries the previous ETag so an unchanged branch is answered with 304.
+
+    Args:
+        config: Repository configuration in "archive" mode
+        repo_dir: Directory holding the extracted files
+
+    Raises:
+        OSError: If the download fails
+        tarfile.TarError: If the archive is malformed
+
+    """
+    state = _read_fetch_state(config) if repo_dir.exists() else None
+    if state is not None and _within_ttl(config, state):
+        logger.info(
+            f"Repository '{config.name}' is within its {config.refresh_ttl()}s "
+            f"freshness TTL, using cache without network access"
+        )
+        _record_fetch(config, "cache_hit")
+        return
+
+    # Only trust the ETag of a cache that holds an extracted archive
+    etag = state.get("etag") if state is not None and not (repo_dir / ".git").exists() else None
+    with get_metrics_registry().timer(METRIC_ARCHIVE_SECONDS, repository=config.name):
+        result = fetch_archive(config, repo_dir, etag=etag)
+    if result is None and state is not None:
+        _write_fetch_state(config, state["commit"], etag=etag)
+        _record_fetch(config, "archive_not_modified")
+    elif result is not None:
+        _write_fetch_state(config, result.commit, etag=result.etag)
+        _record_fetch(config, "archive_download")
+
+
+def _refresh_repository(config: RepositoryConfig, repo_dir: Path) -> GitSteps[None]:
+    """Bring an existing cached repository up to date, skipping work when possible.
+
+    Args:
+        config: Repository configuration
+        repo_dir: Directory of the cached Git repository
+
+    Raises:
+        subprocess.CalledProcessError: If a git command fails
+
+    """
+    state = _read_fetch_state(config)
+    if state is not None and _within_ttl(config, state):
+        logger.info(
+            f"Repository '{config.name}' is within its {config.refresh_ttl()}s "
+            f"freshness TTL, using cache without network access"
+        )
+        _record_fetch(config, "cache_hit")
+        return
+
+    local_head = yield from _git_head(repo_dir)
+    remote_head = yield from _git_remote_head(config)
+    if remote_head is not None and remote_head == local_head:
+        logger.info(
+            f"Repository '{config.name}' is current at {local_head[:12]}, skipping git pull"
+        )
+        _write_fetch_state(config, local_head)
+        _record_fetch(config, "remote_unchanged")
+        return
+
+    logger.info(f"Repository '{config.name}' is outdated, pulling from {config.branch}")
+    yield from _git_pull(config, repo_dir)
+    _write_fetch_state(config, (yield from _git_head(repo_dir)))
+    _record_fetch(config, "pull")
+
+
+def _git_head(repo_dir: Path) -> GitSteps[str]:
+    """Return the commit SHA checked out in a repository.
+
+    Args:
+        repo_dir: Directory of the Git repository
+
+    Returns:
+        Full commit SHA of HEAD
+
+    Raises:
+        subprocess.CalledProcessError: If git rev-parse fails
+
+    """
+    stdout = yield ["git", "-C", str(repo_dir), "rev-parse", "HEAD"]
+    return stdout.strip()
+
+
+def _git_remote_head(config: RepositoryConfig) -> GitSteps[str | None]:
+    """Return the commit SHA of the tracked branch on the remote.
+
+    Uses `git ls-remote`, which transfers only the ref advertisement and no
+    objects.
+
+    Args:
+        config: Repository configuration (URL and branch)
+
+    Returns:
+        Commit SHA of the remote branch, or None if the branch was not found
+
+    Raises:
+        subprocess.CalledProcessError: If git ls-remote fails
+
+    """
+    stdout = yield ["git", "ls-remote", config.url, f"refs/heads/{config.branch}"]
+    for line in stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref == f"refs/heads/{config.branch}":
+            return sha
+    return None
+
+
+def _fetch_state_path(config: RepositoryConfig) -> Path:
+    """Return the path of the fetch state file for a repository."""
+    return CACHE_DIR / f"{config.name}.fetch.json"
+
+
+def _read_fetch_state(config: RepositoryConfig) -> dict[str, Any] | None:
+    """Read the recorded commit and last remote check time for a repository.
 
-def _git_clone(repo_url: str, target_dir: Path) -> None:
-    """Clone a Git repository using shallow clone for faster initialization.
-    
     Args:
-        repo_url: Git repository URL
+        config: Repository configuration
+
+    Returns:
+        State dictionary with "commit" and "checked_at" keys, or None if no
+        usable state was recorded
+
+    """
+    try:
+        state = json.loads(_fetch_state_path(config).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or not state.get("commit"):
+        return None
+    return state
+
+
+def _write_fetch_state(
+    config: RepositoryConfig,
+    commit: str,
+    etag: str | None = None,
+) -> None:
+    """Record the checked-out commit and the current time as last remote check.
+
+    The file is written to a temporary path and renamed so readers never see
+    a partially written state.
+
+    Args:
+        config: Repository configuration
+        commit: Commit SHA currently checked out in the cache
+        etag: ETag of the downloaded archive ("archive" mode only)
+
+    """
+    state: dict[str, Any] = {"commit": commit, "checked_at": time.time()}
+    if etag:
+        state["etag"] = etag
+    state_path = _fetch_state_path(config)
+    atomic_write(state_path, json.dumps(state).encode("utf-8"))
+
+
+def _atomic_clone(config: RepositoryConfig, target_dir: Path) -> GitSteps[None]:
+    """Clone into a temporary directory and move it into place when complete.
+
+    Args:
+        config: Repository configuration
+        target_dir: Final directory of the cached repository
+
+    Raises:
+        subprocess.CalledProcessError: If git clone fails
+
+    """
+    tmp_dir = target_dir.with_name(f".{target_dir.name}.{os.getpid()}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    try:
+        yield from _git_clone(config, tmp_dir)
+        os.rename(tmp_dir, target_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _git_clone(config: RepositoryConfig, target_dir: Path) -> GitSteps[None]:
+    """Clone a Git repository using the fetch mode from its configuration.
+
+    Args:
+        config: Repository configuration (URL and fetch mode)
         target_dir: Directory where the repository should be cloned
-        
+
     Raises:
         subprocess.CalledProcessError: If git clone fails
 
     """
+    if config.fetch_mode == "sparse":
+        yield from _git_sparse_clone(config, target_dir)
+        return
+
     # Use shallow clone (--depth 1) to only fetch the latest commit
     # This significantly reduces clone time and disk space
-    subprocess.run(
-        ["git", "clone", "--depth", "1", repo_url, str(target_dir)],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
+    yield [
+        "git", "clone",
+        "--depth", "1",
+        "--branch", config.branch,
+        config.url,
+        str(target_dir),
+    ]
 
 
-def _git_pull(repo_dir: Path) -> None:
+def _git_sparse_clone(config: RepositoryConfig, target_dir: Path) -> GitSteps[None]:
+    """Clone only the paths an agent needs using a partial, sparse clone.
+
+    `--filter=blob:none` skips downloading file contents up front, and
+    `--sparse` limits the initial checkout to top-level files. Setting the
+    sparse-checkout paths afterwards makes Git fetch only the blobs under
+    those paths.
+
+    Args:
+        config: Repository configuration (URL and paths to check out)
+        target_dir: Directory where the repository should be cloned
+
+    Raises:
+        subprocess.CalledProcessError: If any git command fails
+
+    """
+    yield [
+        "git", "clone",
+        "--depth", "1",
+        "--filter=blob:none",
+        "--sparse",
+        "--branch", config.branch,
+        config.url,
+        str(target_dir),
+    ]
+    yield from _git_sparse_checkout_set(config, target_dir)
+
+
+def _git_sparse_checkout_set(config: RepositoryConfig, repo_dir: Path) -> GitSteps[None]:
+    """Restrict the working tree of a repository to the configured paths.
+
+    Args:
+        config: Repository configuration (paths to check out)
+        repo_dir: Directory of the Git repository
+
+    Raises:
+        subprocess.CalledProcessError: If git sparse-checkout fails
+
+    """
+    yield ["git", "-C", str(repo_dir), "sparse-checkout", "set", *config.checkout_paths()]
+
+
+def _git_pull(config: RepositoryConfig, repo_dir: Path) -> GitSteps[None]:
     """Pull latest changes from a Git repository.
-    
+
+    In sparse mode the sparse-checkout paths are re-applied first, so changes
+    to repo_path or sparse_paths take effect on existing caches.
+
     Args:
+        config: Repository configuration
         repo_dir: Directory of the Git repository
-        
+
     Raises:
         subprocess.CalledProcessError: If git pull fails
 
     """
-    subprocess.run(
-        ["git", "-C", str(repo_dir), "pull", "origin", "main"],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
+    if config.fetch_mode == "sparse":
+        yield from _git_sparse_checkout_set(config, repo_dir)
 
+    yield ["git", "-C", str(repo_dir), "pull", "origin", config.branch]
@@ -0,0 +1,23 @@
+"""Atomic file writes for the repository and schema caches.
+
+Several processes read the cache files while another one updates them. A
+file is therefore written to a temporary file next to it and renamed into
+place, so readers see either the old or the new content, never partial data.
+Temporary files end in ".tmp"; cleanup code skips them.
+"""
+
+import os
+from pathlib import Path
+
+
+def atomic_write(path: Path, content: bytes) -> None:
+    """Write a file via a temporary file and rename.
+
+    Args:
+        path: Destination file
+        content: File content
+
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
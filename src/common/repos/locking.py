@@ -0,0 +1,157 @@
+"""Cross-process locking for repository cache updates.
+
+Several LangGraph worker processes (or several agents importing at the same
+time) share the repository cache directory. An exclusive advisory file lock
+per repository makes cache updates single-flight: one process clones or pulls
+while the others wait, and then reuse the fresh cache instead of repeating the
+network work.
+
+Locks are `flock` locks on `<CACHE_DIR>/<name>.lock`. They are released
+automatically by the kernel if the holding process dies, so a crashed update
+never leaves the cache locked.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# How long a process waits for another process to finish updating a repository
+DEFAULT_LOCK_TIMEOUT_SECONDS = float(os.getenv("GRAPH_FLEET_REPO_LOCK_TIMEOUT_SECONDS", "300"))
+
+# Interval between attempts to acquire a held lock
+_POLL_INTERVAL_SECONDS = 0.1
+
+
+class RepositoryLockTimeout(TimeoutError):
+    """Raised when a repository lock cannot be acquired in time."""
+
+    pass
+
+
+@contextmanager
+def repository_lock(
+    cache_dir: Path,
+    name: str,
+    timeout: float | None = None,
+) -> Iterator[None]:
+    """Hold the exclusive update lock of a repository.
+
+    The lock is not reentrant: code holding it must not try to acquire the
+    same repository's lock again.
+
+    Args:
+        cache_dir: Repository cache directory holding the lock files
+        name: Repository name (RepositoryConfig.name)
+        timeout: Seconds to wait for the lock. None uses
+            GRAPH_FLEET_REPO_LOCK_TIMEOUT_SECONDS.
+
+    Yields:
+        None while the lock is held
+
+    Raises:
+        RepositoryLockTimeout: If the lock is still held by another process
+            after the timeout
+
+    """
+    if timeout is None:
+        timeout = DEFAULT_LOCK_TIMEOUT_SECONDS
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    lock_path = cache_dir / f"{name}.lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _acquire(fd, lock_path, timeout)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+@asynccontextmanager
+async def arepository_lock(
+    cache_dir: Path,
+    name: str,
+    timeout: float | None = None,
+) -> AsyncIterator[None]:
+    """Asyncio version of repository_lock.
+
+    Waiting for the lock sleeps with asyncio.sleep, so other coroutines keep
+    running. Like repository_lock it is not reentrant, and coroutines of the
+    same process also exclude each other because every acquisition opens its
+    own file description.
+
+    Args:
+        cache_dir: Repository cache directory holding the lock files
+        name: Repository name (RepositoryConfig.name)
+        timeout: Seconds to wait for the lock. None uses
+            GRAPH_FLEET_REPO_LOCK_TIMEOUT_SECONDS.
+
+    Yields:
+        None while the lock is held
+
+    Raises:
+        RepositoryLockTimeout: If the lock is still held by another process
+            after the timeout
+
+    """
+    if timeout is None:
+        timeout = DEFAULT_LOCK_TIMEOUT_SECONDS
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    lock_path = cache_dir / f"{name}.lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        await _aacquire(fd, lock_path, timeout)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _acquire(fd: int, lock_path: Path, timeout: float) -> None:
+    """Acquire an exclusive flock on *fd*, polling until *timeout* expires."""
+    deadline = time.monotonic() + timeout
+    waiting_logged = False
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise RepositoryLockTimeout(
+                    f"Timed out after {timeout:.0f}s waiting for {lock_path}"
+                ) from None
+            if not waiting_logged:
+                logger.info(f"Waiting for another process to finish updating ({lock_path})")
+                waiting_logged = True
+            time.sleep(_POLL_INTERVAL_SECONDS)
+
+
+async def _aacquire(fd: int, lock_path: Path, timeout: float) -> None:
+    """Asyncio version of _acquire."""
+    deadline = time.monotonic() + timeout
+    waiting_logged = False
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise RepositoryLockTimeout(
+                    f"Timed out after {timeout:.0f}s waiting for {lock_path}"
+                ) from None
+            if not waiting_logged:
+                logger.info(f"Waiting for another process to finish updating ({lock_path})")
+                waiting_logged = True
+            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
@@ -1,30 +1,56 @@
 """Middleware for loading repository files into agent virtual filesystem.
 
-This module provides middleware that copies files from the local repository cache
-into the DeepAgent virtual filesystem on the first user request.
+This module provides middleware that mounts files from the local repository cache
+into the DeepAgent virtual filesystem on the first user request. The file
+contents live in the process-wide SharedFileStore; thread state only records
+which file set is mounted, and files are read on demand (see shared_files.py).
 """
 
 import logging
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 
-from deepagents.backends.utils import create_file_data
+from deepagents.backends import CompositeBackend, StateBackend
+from deepagents.backends.protocol import BackendFactory
 from langchain.agents.middleware import AgentMiddleware, AgentState
 from langgraph.runtime import Runtime
 
+from .shared_files import (
+    RepositoryFilesState,
+    SharedFilesBackend,
+    SharedFileStore,
+    file_refs,
+    file_set_digest,
+    get_shared_file_store,
+)
+
 logger = logging.getLogger(__name__)
 
+# Number of distinct file sets (e.g. schema versions) a middleware keeps
+# registered in the shared store
+MAX_RETAINED_FILE_SETS = 8
+
 
 class RepositoryFilesMiddleware(AgentMiddleware):
     """Middleware to load repository files into virtual filesystem on first request.
     
     This middleware runs before the agent processes the first message and:
     1. Reads files from in-memory cache (loaded at startup)
-    2. Copies them to DeepAgent's virtual filesystem at the specified path
-    3. Logs detailed information about the operation
-    
-    After the first request, this middleware becomes a no-op.
+    2. Registers them in the shared file store (once per distinct file set)
+    3. Mounts the file set at the specified path in the thread state
+    4. Logs detailed information about the operation
     
+    Each thread records the digest of its mounted file set. Every file set
+    served comes with a version identifier computed once when its contents
+    were fixed (see _get_file_set), so on later requests the staleness check
+    compares identifiers only and never scans or hashes the files. The agent
+    must use backend() as its filesystem backend so the file tools serve the
+    mount; files are only materialized when they are first read.
+
     Attributes:
         file_contents: Dictionary mapping filenames to file content strings
         vfs_directory: Virtual filesystem directory path where files should be placed
@@ -32,11 +58,14 @@ class RepositoryFilesMiddleware(AgentMiddleware):
 
     """
     
+    state_schema = RepositoryFilesState
+
     def __init__(
         self,
         file_contents: dict[str, str],
         vfs_directory: str,
         description: str = "repository files",
+        store: SharedFileStore | None = None,
     ):
         """Initialize the middleware.
         
@@ -44,64 +73,168 @@ class RepositoryFilesMiddleware(AgentMiddleware):
             file_contents: Dictionary mapping filenames to their content
             vfs_directory: Virtual filesystem directory (e.g., "/schema/protos")
             description: Description for logging (e.g., "proto schema files")
+            store: Shared file store (defaults to the process-wide store)
 
         """
-        self._file_contents = file_contents
         self._vfs_directory = vfs_directory
         self._description = description
-    
+        self._store = store if store is not None else get_shared_file_store()
+        self.update_file_contents(file_contents)
+        # Version of registered file sets -> file set digest in the store
+        self._file_sets: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def backend(self) -> BackendFactory:
+        """Return a filesystem backend factory serving the mounted files.
+
+        Paths under the mount directory are served from the shared store;
+        all other paths use the regular state backend.
+
+        Returns:
+            Backend factory for create_deep_agent(backend=...)
+
+        """
+        vfs_directory, store = self._vfs_directory, self._store
+        return lambda runtime: CompositeBackend(
+            default=StateBackend(runtime),
+            routes={f"{vfs_directory}/": SharedFilesBackend(runtime, vfs_directory, store)},
+        )
+
+    def update_file_contents(self, file_contents: Mapping[str, str]) -> None:
+        """Replace the files to mount; threads get them on their next request.
+
+        The contents are copied and their version computed here, once.
+
+        Args:
+            file_contents: Mapping of filename to file content
+
+        """
+        contents = MappingProxyType(dict(file_contents))
+        # Replaced as one tuple, so readers never see a version with other contents
+        self._current_files = (file_set_digest(file_refs(contents)), contents)
+
+    def _register(self, version: str, file_contents: Mapping[str, str]) -> str:
+        """Register file contents in the shared store once and return the file set digest.
+
+        File sets seen before are recognized by their version, without
+        looking at the files.
+
+        Args:
+            version: Identifies file_contents; equal versions must mean equal contents
+            file_contents: Mapping of filename to file content
+
+        Returns:
+            Digest of the registered file set
+
+        """
+        with self._lock:
+            file_set = self._file_sets.get(version)
+            if file_set is not None:
+                self._file_sets.move_to_end(version)
+                return file_set
+
+            file_set = self._store.register(file_contents)
+            self._file_sets[version] = file_set
+            while len(self._file_sets) > MAX_RETAINED_FILE_SETS:
+                _, evicted = self._file_sets.popitem(last=False)
+                self._store.release(evicted)
+            return file_set
+
+    def _get_file_set(self, state: AgentState) -> tuple[str, Mapping[str, str]]:
+        """Return the files to mount in the virtual filesystem of a thread.
+
+        Subclasses can override this to serve different contents per thread.
+        The contents must not change after being returned; new contents come
+        with a new version.
+
+        Args:
+            state: The current agent state
+
+        Returns:
+            Version identifier of the files, and mapping of filename to file content
+
+        """
+        return self._current_files
+
     def before_agent(
         self, 
         state: AgentState, 
         runtime: Runtime[Any]
     ) -> dict[str, Any] | None:
-        """Copy files to virtual filesystem on first request per thread.
+        """Mount files in the virtual filesystem on first request per thread.
+
+        Threads whose mounted file set is outdated get the current one.
         
         Args:
             state: The current agent state
             runtime: The LangGraph runtime
             
         Returns:
-            State update with files added to virtual filesystem, or None if already initialized
+            State update mounting the file set in the thread, or None if the
+            current files are already mounted
 
         """
-        # Check if files already exist in THIS thread's state (per-thread check)
-        # Create a sample file path to check
-        sample_file_path = f"{self._vfs_directory}/{list(self._file_contents.keys())[0]}"
-        
-        # If files already exist in state, skip initialization
-        if "files" in state and sample_file_path in state["files"]:
-            logger.info("Files already present in thread state, skipping initialization")
+        version, file_contents = self._get_file_set(state)
+        file_set = self._register(version, file_contents)
+
+        # Compare the digest mounted in THIS thread's state (per-thread check)
+        # with the digest of the current files
+        mounted = state.get("repository_mounts", {}).get(self._vfs_directory)
+        if mounted == file_set:
+            logger.info("Files already mounted in thread state, skipping initialization")
             return None
+
+        if mounted is not None:
+            return self._remount(mounted, file_set)
         
         start_time = time.time()
         
         logger.info("=" * 60)
-        logger.info(f"FIRST REQUEST: Copying {self._description} to virtual filesystem...")
+        logger.info(f"FIRST REQUEST: Mounting {self._description} in virtual filesystem...")
         logger.info("Source: In-memory cache (loaded at startup)")
         logger.info(f"Destination: Virtual filesystem ({self._vfs_directory})")
         logger.info("=" * 60)
         
-        # Copy files from in-memory cache to virtual filesystem
-        # Store as FileData objects for read_file tool compatibility
-        files_to_add = {}
-        for filename, content in self._file_contents.items():
-            vfs_path = f"{self._vfs_directory}/{filename}"
-            
-            logger.info(f"  {filename} -> {vfs_path}")
-            
-            # Store as FileData for read_file tool compatibility
-            files_to_add[vfs_path] = create_file_data(content)
+        # The files are registered in the shared store; the thread only records
+        # the mount. Contents are materialized when a file is first read.
+        for filename in file_contents:
+            logger.info(f"  {filename} -> {self._vfs_directory}/{filename}")
         
         elapsed = time.time() - start_time
         logger.info("=" * 60)
-        logger.info(f"FIRST REQUEST: Copied {len(files_to_add)} files in {elapsed:.2f}s")
+        logger.info(f"FIRST REQUEST: Mounted {len(file_contents)} files in {elapsed:.2f}s")
         logger.info("=" * 60)
         
         # Log the state update being returned
-        logger.info(f"📤 MIDDLEWARE RETURN: Returning state update with {len(files_to_add)} files")
-        logger.info(f"   Files being added to state: {list(files_to_add.keys())}")
-        logger.debug(f"   Full state update: {{'files': <{len(files_to_add)} FileData objects>}}")
+        logger.info(f"📤 MIDDLEWARE RETURN: Mounting file set {file_set[:12]} at {self._vfs_directory}")
+        logger.debug(f"   Full state update: {{'repository_mounts': {{{self._vfs_directory!r}: {file_set!r}}}}}")
         
-        return {"files": files_to_add}
+        return {"repository_mounts": {self._vfs_directory: file_set}}
+
+    def _remount(self, mounted: str, file_set: str) -> dict[str, Any]:
+        """Replace a thread's outdated mount with the current file set.
+
+        Only the files whose content changed are new; unchanged files keep
+        their stored (and possibly already materialized) content.
+
+        Args:
+            mounted: Digest of the file set mounted in the thread
+            file_set: Digest of the current file set
+
+        Returns:
+            State update mounting the current file set
+
+        """
+        changed = self._store.changed_files(mounted, file_set)
+        if changed is None:
+            logger.info(
+                f"Mounted {self._description} are no longer stored, "
+                f"mounting file set {file_set[:12]}"
+            )
+        else:
+            logger.info(
+                f"{self._description.capitalize()} changed upstream, "
+                f"updating {len(changed)} files: {changed}"
+            )
+        return {"repository_mounts": {self._vfs_directory: file_set}}
 
@@ -0,0 +1,382 @@
+"""Process-wide store of read-only repository files shared by all threads.
+
+Copying repository files into every thread's virtual filesystem makes each
+checkpoint carry the full file contents, so checkpoint size grows with file
+size times thread count. Instead, a set of files is registered once in a
+content-addressed SharedFileStore and thread state only holds a mount: the
+directory and the digest of the file set mounted there. SharedFilesBackend
+lists and reads the files of the mount on demand, and a file's FileData is
+only materialized the first time it is read.
+
+Stored contents are immutable: a changed file gets a new hash and a changed
+file set a new digest. Every registration holds one reference on its file
+set; contents are dropped when no registered file set contains them.
+"""
+
+import hashlib
+import logging
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Annotated, Any, NotRequired, TypedDict
+
+from deepagents.backends.protocol import (
+    BackendProtocol,
+    EditResult,
+    FileInfo,
+    GrepMatch,
+    WriteResult,
+)
+from deepagents.backends.utils import (
+    _glob_search_files,
+    create_file_data,
+    format_read_response,
+    grep_matches_from_files,
+)
+from langchain.agents.middleware import AgentState
+
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFileRef(TypedDict):
+    """Reference to a file in the shared store.
+
+    Attributes:
+        hash: SHA-256 of the file content
+        size: Content length in characters
+
+    """
+
+    hash: str
+    size: int
+
+
+def _merge_repository_mounts(
+    left: dict[str, str] | None,
+    right: dict[str, str | None],
+) -> dict[str, str]:
+    """Merge repository mounts; None values unmount a directory."""
+    result = dict(left or {})
+    for directory, file_set in right.items():
+        if file_set is None:
+            result.pop(directory, None)
+        else:
+            result[directory] = file_set
+    return result
+
+
+class RepositoryFilesState(AgentState):
+    """State channel mapping mount directories to the shared file set mounted there."""
+
+    repository_mounts: Annotated[
+        NotRequired[dict[str, str]],  # type: ignore[valid-type]
+        _merge_repository_mounts,
+    ]
+
+
+def content_digest(content: str) -> str:
+    """Return the SHA-256 hex digest of a file content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def file_refs(files: Mapping[str, str]) -> dict[str, SharedFileRef]:
+    """Return the references of a set of files, by filename."""
+    return {
+        name: SharedFileRef(hash=content_digest(content), size=len(content))
+        for name, content in files.items()
+    }
+
+
+def file_set_digest(refs: Mapping[str, SharedFileRef]) -> str:
+    """Return the digest identifying a set of files by name and content.
+
+    Args:
+        refs: Mapping of filename to file reference
+
+    Returns:
+        SHA-256 hex digest over the sorted filenames and content hashes
+
+    """
+    digest = hashlib.sha256()
+    for name in sorted(refs):
+        digest.update(f"{name}\0{refs[name]['hash']}\n".encode())
+    return digest.hexdigest()
+
+
+class SharedFileStore:
+    """Thread-safe, content-addressed and reference-counted file store."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._lock = threading.Lock()
+        self._contents: dict[str, str] = {}
+        self._file_data: dict[str, dict[str, Any]] = {}
+        # Number of registered file sets containing each content
+        self._content_refcounts: dict[str, int] = {}
+        self._file_sets: dict[str, dict[str, SharedFileRef]] = {}
+        self._file_set_refcounts: dict[str, int] = {}
+
+    def register(self, files: Mapping[str, str]) -> str:
+        """Store a set of files and take one reference on it.
+
+        Args:
+            files: Mapping of filename to file content
+
+        Returns:
+            Digest of the file set, used to mount and release it
+
+        """
+        refs = file_refs(files)
+        digest = file_set_digest(refs)
+        with self._lock:
+            if digest not in self._file_sets:
+                self._file_sets[digest] = refs
+                for name, ref in refs.items():
+                    self._contents.setdefault(ref["hash"], files[name])
+                    self._content_refcounts[ref["hash"]] = (
+                        self._content_refcounts.get(ref["hash"], 0) + 1
+                    )
+            self._file_set_refcounts[digest] = self._file_set_refcounts.get(digest, 0) + 1
+        return digest
+
+    def release(self, file_set: str) -> None:
+        """Drop one reference on a file set; unreferenced sets and contents are removed.
+
+        Args:
+            file_set: Digest returned by register()
+
+        """
+        with self._lock:
+            count = self._file_set_refcounts.get(file_set, 0) - 1
+            if count > 0:
+                self._file_set_refcounts[file_set] = count
+                return
+            self._file_set_refcounts.pop(file_set, None)
+            for ref in self._file_sets.pop(file_set, {}).values():
+                content_count = self._content_refcounts.get(ref["hash"], 0) - 1
+                if content_count > 0:
+                    self._content_refcounts[ref["hash"]] = content_count
+                else:
+                    self._content_refcounts.pop(ref["hash"], None)
+                    self._contents.pop(ref["hash"], None)
+                    self._file_data.pop(ref["hash"], None)
+
+    def file_set(self, file_set: str) -> Mapping[str, SharedFileRef] | None:
+        """Return the files of a registered file set.
+
+        Args:
+            file_set: Digest returned by register()
+
+        Returns:
+            Mapping of filename to file reference (do not modify), or None if
+            the file set is not stored
+
+        """
+        with self._lock:
+            return self._file_sets.get(file_set)
+
+    def changed_files(self, old: str, new: str) -> list[str] | None:
+        """Return the files that differ between two file sets.
+
+        Args:
+            old: Digest of the previous file set
+            new: Digest of the current file set
+
+        Returns:
+            Sorted names of added, removed and changed files, or None if
+            either file set is not stored
+
+        """
+        with self._lock:
+            old_refs = self._file_sets.get(old)
+            new_refs = self._file_sets.get(new)
+        if old_refs is None or new_refs is None:
+            return None
+        old_hashes = {name: ref["hash"] for name, ref in old_refs.items()}
+        new_hashes = {name: ref["hash"] for name, ref in new_refs.items()}
+        return sorted(
+            name
+            for name in old_hashes.keys() | new_hashes.keys()
+            if old_hashes.get(name) != new_hashes.get(name)
+        )
+
+    def read(self, digest: str) -> dict[str, Any] | None:
+        """Return the FileData of a content hash, materializing it on first read.
+
+        Args:
+            digest: SHA-256 of the file content
+
+        Returns:
+            FileData shared by all readers (do not modify), or None if the
+            content is not stored
+
+        """
+        with self._lock:
+            file_data = self._file_data.get(digest)
+            if file_data is None and digest in self._contents:
+                file_data = create_file_data(self._contents[digest])
+                self._file_data[digest] = file_data
+            return file_data
+
+    def is_materialized(self, digest: str) -> bool:
+        """Return whether the FileData of a content hash was built already."""
+        with self._lock:
+            return digest in self._file_data
+
+    def refcount(self, file_set: str) -> int:
+        """Return the number of references held on a file set."""
+        with self._lock:
+            return self._file_set_refcounts.get(file_set, 0)
+
+    def __contains__(self, file_set: object) -> bool:
+        """Return whether a file set is stored."""
+        with self._lock:
+            return file_set in self._file_sets
+
+    def __len__(self) -> int:
+        """Return the number of distinct stored contents."""
+        with self._lock:
+            return len(self._contents)
+
+
+# Process-wide store used by default
+_store = SharedFileStore()
+
+
+def get_shared_file_store() -> SharedFileStore:
+    """Return the process-wide shared file store."""
+    return _store
+
+
+class SharedFilesBackend(BackendProtocol):
+    """Read-only backend serving the file set mounted in a thread.
+
+    Meant to be routed under the mount directory by a CompositeBackend, which
+    passes paths relative to the mount (e.g. "/spec.proto"). Listing and
+    globbing only use the file references; contents are materialized when a
+    file is read or searched.
+    """
+
+    def __init__(
+        self,
+        runtime: "ToolRuntime",
+        vfs_directory: str,
+        store: SharedFileStore | None = None,
+    ):
+        """Initialize the backend.
+
+        Args:
+            runtime: Tool runtime giving access to the thread state
+            vfs_directory: Directory the files are mounted at (e.g. "/schema/protos")
+            store: Store resolving the mount (defaults to the process-wide one)
+
+        """
+        self.runtime = runtime
+        self._directory = vfs_directory.rstrip("/")
+        self._store = store if store is not None else get_shared_file_store()
+
+    def _refs(self) -> dict[str, SharedFileRef]:
+        """Return the references of the mounted files keyed by mount-relative path."""
+        mounts = self.runtime.state.get("repository_mounts") or {}
+        file_set = mounts.get(self._directory)
+        if file_set is None:
+            return {}
+        refs = self._store.file_set(file_set)
+        if refs is None:
+            logger.warning(f"File set {file_set[:12]} mounted at {self._directory} is no longer stored")
+            return {}
+        return {f"/{name}": ref for name, ref in refs.items()}
+
+    def _read_files(self, refs: Mapping[str, SharedFileRef]) -> dict[str, dict[str, Any]]:
+        """Materialize the FileData of the given references."""
+        files: dict[str, dict[str, Any]] = {}
+        for path, ref in refs.items():
+            file_data = self._store.read(ref["hash"])
+            if file_data is not None:
+                files[path] = file_data
+        return files
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List the mounted files and directories directly in a directory.
+
+        Args:
+            path: Mount-relative directory path
+
+        Returns:
+            FileInfo entries; directories have a trailing "/"
+
+        """
+        directory = path if path.endswith("/") else f"{path}/"
+        infos: list[FileInfo] = []
+        subdirs: set[str] = set()
+        for file_path, ref in self._refs().items():
+            if not file_path.startswith(directory):
+                continue
+            relative = file_path[len(directory):]
+            if "/" in relative:
+                subdirs.add(f"{directory}{relative.split('/')[0]}/")
+            else:
+                infos.append(_file_info(file_path, ref))
+        infos.extend(
+            {"path": subdir, "is_dir": True, "size": 0, "modified_at": ""}
+            for subdir in subdirs
+        )
+        infos.sort(key=lambda info: info.get("path", ""))
+        return infos
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """Read a mounted file with line numbers.
+
+        Args:
+            file_path: Mount-relative file path
+            offset: Line offset to start reading from (0-indexed)
+            limit: Maximum number of lines to read
+
+        Returns:
+            Formatted file content, or an error message
+
+        """
+        ref = self._refs().get(file_path)
+        file_data = self._store.read(ref["hash"]) if ref is not None else None
+        if file_data is None:
+            return f"Error: File '{self._directory}{file_path}' not found"
+        return format_read_response(file_data, offset, limit)
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Search the mounted files for a regex pattern."""
+        return grep_matches_from_files(self._read_files(self._refs()), pattern, path, glob)
+
+    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Return FileInfo for the mounted files matching a glob pattern."""
+        refs = self._refs()
+        # Globbing only looks at paths and modification times
+        result = _glob_search_files({p: {"modified_at": ""} for p in refs}, pattern, path)
+        if result == "No files found":
+            return []
+        return [_file_info(file_path, refs[file_path]) for file_path in result.split("\n")]
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        """Reject writes: the mounted files are read-only."""
+        return WriteResult(error=f"Error: {self._directory}{file_path} is read-only")
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Reject edits: the mounted files are read-only."""
+        return EditResult(error=f"Error: {self._directory}{file_path} is read-only")
+
+
+def _file_info(path: str, ref: SharedFileRef) -> FileInfo:
+    """Return the FileInfo of a mounted file without reading it."""
+    return {"path": path, "is_dir": False, "size": ref["size"], "modified_at": ""}
@@ -0,0 +1,230 @@
+"""Content-addressed snapshots of repository files.
+
+A snapshot is the set of files requested by a RepositoryConfig at a specific
+commit. Snapshots live under the shared cache directory:
+
+    <CACHE_DIR>/.snapshots/<name>/
+    ├── blobs/<sha256>          # File contents, stored once per unique content
+    ├── manifests/<commit>.json # Commit SHA + repository path -> content hash
+    └── index.json              # Most recent good snapshot
+
+Loading a snapshot reads the blobs directly, without touching the Git working
+tree, and verifies every blob against its content hash. Because snapshots
+survive failed fetches, the last good snapshot can be served when the remote
+is unreachable.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from .config import RepositoryConfig
+from .files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Directory name of the snapshot store inside the repository cache directory
+SNAPSHOT_DIRNAME = ".snapshots"
+
+# Number of snapshots kept per repository; older ones are pruned on save
+MAX_SNAPSHOTS_PER_REPOSITORY = 5
+
+
+@dataclass(frozen=True)
+class RepositorySnapshot:
+    """Immutable set of repository files captured at a single commit.
+
+    Attributes:
+        repository: Repository name (RepositoryConfig.name)
+        commit: Commit SHA the files were read from
+        files: Mapping of repository-relative path to file content
+
+    """
+
+    repository: str
+    commit: str
+    files: Mapping[str, bytes]
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+        """Return the decoded content of a file in the snapshot.
+
+        Args:
+            path: Repository-relative file path
+            encoding: Text encoding of the file
+
+        Returns:
+            File content as a string
+
+        Raises:
+            KeyError: If the file is not part of the snapshot
+
+        """
+        return self.files[path].decode(encoding)
+
+
+def content_hash(content: bytes) -> str:
+    """Return the SHA-256 hex digest used to address file contents."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class SnapshotStore:
+    """On-disk store of content-addressed repository snapshots.
+
+    Attributes:
+        root: Directory holding the snapshots of all repositories
+
+    """
+
+    def __init__(self, root: Path):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the snapshots (created on first save)
+
+        """
+        self.root = root
+
+    def save(
+        self,
+        config: RepositoryConfig,
+        commit: str,
+        files: Mapping[str, bytes],
+    ) -> RepositorySnapshot:
+        """Store a snapshot and mark it as the most recent good one.
+
+        Blobs that are already present are not rewritten, so unchanged files
+        cost nothing across commits.
+
+        Args:
+            config: Repository configuration the files were fetched for
+            commit: Commit SHA the files were read from
+            files: Mapping of repository-relative path to file content
+
+        Returns:
+            The stored snapshot
+
+        """
+        repo_dir = self.root / config.name
+        blobs_dir = repo_dir / "blobs"
+        manifests_dir = repo_dir / "manifests"
+        blobs_dir.mkdir(parents=True, exist_ok=True)
+        manifests_dir.mkdir(parents=True, exist_ok=True)
+
+        file_hashes: dict[str, str] = {}
+        for path, content in files.items():
+            digest = content_hash(content)
+            blob_path = blobs_dir / digest
+            if not blob_path.exists():
+                atomic_write(blob_path, content)
+            file_hashes[path] = digest
+
+        saved_at = time.time()
+        manifest = {"commit": commit, "saved_at": saved_at, "files": file_hashes}
+        atomic_write(
+            manifests_dir / f"{commit}.json",
+            json.dumps(manifest, sort_keys=True).encode("utf-8"),
+        )
+        atomic_write(
+            repo_dir / "index.json",
+            json.dumps({"latest": commit, "saved_at": saved_at}).encode("utf-8"),
+        )
+        self._prune(repo_dir)
+
+        return RepositorySnapshot(
+            repository=config.name,
+            commit=commit,
+            files=MappingProxyType(dict(files)),
+        )
+
+    def load(self, config: RepositoryConfig, commit: str) -> RepositorySnapshot | None:
+        """Load the snapshot of a repository at a specific commit.
+
+        Args:
+            config: Repository configuration whose files must be in the snapshot
+            commit: Commit SHA of the snapshot
+
+        Returns:
+            The snapshot, or None if it does not exist, does not contain every
+            requested file, or any blob fails its hash check
+
+        """
+        repo_dir = self.root / config.name
+        manifest = _read_json(repo_dir / "manifests" / f"{commit}.json")
+        if manifest is None:
+            return None
+
+        file_hashes: dict[str, str] = manifest.get("files", {})
+        _, missing = config.select_paths(file_hashes)
+        if missing:
+            logger.info(
+                f"Snapshot {commit[:12]} of '{config.name}' lacks {', '.join(missing)}"
+            )
+            return None
+
+        files: dict[str, bytes] = {}
+        for path, digest in file_hashes.items():
+            try:
+                content = (repo_dir / "blobs" / digest).read_bytes()
+            except OSError:
+                logger.warning(f"Snapshot blob missing for {path} ({digest[:12]})")
+                return None
+            if content_hash(content) != digest:
+                logger.warning(f"Snapshot blob corrupted for {path} ({digest[:12]})")
+                return None
+            files[path] = content
+
+        return RepositorySnapshot(
+            repository=config.name,
+            commit=commit,
+            files=MappingProxyType(files),
+        )
+
+    def load_latest(self, config: RepositoryConfig) -> RepositorySnapshot | None:
+        """Load the most recent good snapshot of a repository.
+
+        Args:
+            config: Repository configuration whose files must be in the snapshot
+
+        Returns:
+            The latest snapshot, or None if there is no usable snapshot
+
+        """
+        index = _read_json(self.root / config.name / "index.json")
+        if index is None or not index.get("latest"):
+            return None
+        return self.load(config, index["latest"])
+
+    def _prune(self, repo_dir: Path) -> None:
+        """Remove old manifests and blobs no remaining manifest references."""
+        manifests = sorted(
+            (repo_dir / "manifests").glob("*.json"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for stale in manifests[MAX_SNAPSHOTS_PER_REPOSITORY:]:
+            stale.unlink(missing_ok=True)
+
+        referenced: set[str] = set()
+        for manifest_path in manifests[:MAX_SNAPSHOTS_PER_REPOSITORY]:
+            manifest = _read_json(manifest_path)
+            if manifest is not None:
+                referenced.update(manifest.get("files", {}).values())
+
+        for blob_path in (repo_dir / "blobs").iterdir():
+            if blob_path.name not in referenced and not blob_path.name.endswith(".tmp"):
+                blob_path.unlink(missing_ok=True)
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    """Read a JSON object from disk, returning None if missing or invalid."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
@@ -0,0 +1,230 @@
+"""Tests for the content-deduplicating checkpoint serializer."""
+
+import asyncio
+import threading
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.common.checkpoint import (
+    AsyncPostgresBlobStore,
+    DedupAsyncPostgresSaver,
+    DedupSerializer,
+    InMemoryBlobStore,
+)
+from src.common.checkpoint.serializer import BLOB_TYPE_PREFIX
+
+MANIFEST = "\n".join(f"  field_{i}: value_{i}" for i in range(200))
+
+
+def _files(content: str) -> dict:
+    """Return a DeepAgents files channel value holding one manifest."""
+    return {
+        "/manifest.yaml": {
+            "content": content.split("\n"),
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "modified_at": "2025-01-01T00:00:00+00:00",
+        }
+    }
+
+
+class AsyncInMemoryBlobStore(InMemoryBlobStore):
+    """In-memory blob store with the async methods, whose sync reads fail."""
+
+    async def aput_many(self, blobs):
+        """Store blobs."""
+        super().put_many(blobs)
+
+    async def aget_many(self, hashes):
+        """Return the stored blobs of the given hashes."""
+        return super().get_many(hashes)
+
+    def get_many(self, hashes):
+        """Fail, as a sync read from the event loop must not happen."""
+        pytest.fail("blob store read synchronously")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests on asyncio only; AsyncPostgresSaver needs an asyncio loop."""
+    return "asyncio"
+
+
+@pytest.fixture
+def blob_store() -> InMemoryBlobStore:
+    """Return an empty in-memory blob store."""
+    return InMemoryBlobStore()
+
+
+@pytest.fixture
+def serde(blob_store: InMemoryBlobStore) -> DedupSerializer:
+    """Return a serializer writing to the in-memory blob store."""
+    return DedupSerializer(blob_store)
+
+
+class TestDedupSerializer:
+    """Test moving large checkpoint contents into the blob store."""
+
+    def test_roundtrip_restores_file_contents(self, serde, blob_store):
+        """Test that file contents survive a dump and load through the blob store."""
+        value = _files(MANIFEST)
+
+        type_, data = serde.dumps_typed(value)
+
+        assert type_.startswith(BLOB_TYPE_PREFIX)
+        assert len(blob_store) == 1
+        assert b"field_199" not in data
+        assert serde.loads_typed((type_, data)) == value
+
+    def test_identical_contents_are_stored_once(self, serde, blob_store):
+        """Test that repeated checkpoints of the same file share one blob."""
+        dumps = [serde.dumps_typed(_files(MANIFEST)) for _ in range(5)]
+        dumps.append(serde.dumps_typed({"/copy.yaml": _files(MANIFEST)["/manifest.yaml"]}))
+
+        assert len(blob_store) == 1
+        assert len({data for _, data in dumps[:5]}) == 1
+
+    def test_cached_blobs_are_not_written_again(self, blob_store, monkeypatch):
+        """Test that recently written blobs skip the blob store."""
+        serde = DedupSerializer(blob_store)
+        serde.dumps_typed(_files(MANIFEST))
+        monkeypatch.setattr(blob_store, "put_many", lambda blobs: pytest.fail("written again"))
+
+        serde.dumps_typed(_files(MANIFEST))
+
+    def test_blobs_are_read_from_store(self, serde, blob_store):
+        """Test that another serializer instance loads blobs from the shared store."""
+        data = serde.dumps_typed(_files(MANIFEST))
+
+        assert DedupSerializer(blob_store).loads_typed(data) == _files(MANIFEST)
+
+    def test_small_values_are_unchanged(self, serde, blob_store):
+        """Test that values without large contents use the wrapped serializer as is."""
+        value = {"messages": [HumanMessage(content="hi")], "files": _files("small")}
+
+        assert serde.dumps_typed(value) == JsonPlusSerializer().dumps_typed(value)
+        assert len(blob_store) == 0
+
+    def test_plain_checkpoints_stay_readable(self, serde):
+        """Test that checkpoints written without the wrapper still load."""
+        data = JsonPlusSerializer().dumps_typed(_files(MANIFEST))
+
+        assert serde.loads_typed(data) == _files(MANIFEST)
+
+    def test_large_strings_are_moved(self, serde, blob_store):
+        """Test that large plain strings are stored as blobs too."""
+        value = {"manifest_yaml": MANIFEST}
+
+        data = serde.dumps_typed(value)
+
+        assert len(blob_store) == 1
+        assert serde.loads_typed(data) == value
+
+    def test_missing_blob_raises(self, serde, blob_store):
+        """Test that a checkpoint referencing a lost blob fails loudly."""
+        data = serde.dumps_typed(_files(MANIFEST))
+
+        with pytest.raises(KeyError, match="missing from the blob store"):
+            DedupSerializer(InMemoryBlobStore()).loads_typed(data)
+
+    def test_checkpointer_roundtrip(self, serde, blob_store):
+        """Test the serializer as the serde of a LangGraph checkpointer."""
+        saver = InMemorySaver(serde=serde)
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"files": _files(MANIFEST)}
+        checkpoint["channel_versions"] = {"files": 1}
+        config = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+
+        saved = saver.put(config, checkpoint, {}, {"files": 1})
+
+        loaded = saver.get_tuple(saved)
+        assert loaded.checkpoint["channel_values"]["files"] == _files(MANIFEST)
+        assert len(blob_store) == 1
+
+
+class TestPrefetched:
+    """Test loading the blobs of values before deserializing them on the event loop."""
+
+    @pytest.mark.anyio
+    async def test_sync_store_is_read_off_the_event_loop(self, serde, blob_store, monkeypatch):
+        """Test that a sync store is read in a worker thread, once for the block."""
+        data = serde.dumps_typed(_files(MANIFEST))
+        reader = DedupSerializer(blob_store)
+        threads = []
+        get_many = blob_store.get_many
+
+        def tracking_get_many(hashes):
+            threads.append(threading.current_thread())
+            return get_many(hashes)
+
+        monkeypatch.setattr(blob_store, "get_many", tracking_get_many)
+
+        async with reader.prefetched([data]):
+            assert reader.loads_typed(data) == _files(MANIFEST)
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
+
+    @pytest.mark.anyio
+    async def test_async_store_is_read_with_its_async_methods(self):
+        """Test that stores with async methods are not read synchronously."""
+        blob_store = AsyncInMemoryBlobStore()
+        serde = DedupSerializer(blob_store)
+        data = serde.dumps_typed(_files(MANIFEST))
+        reader = DedupSerializer(blob_store)
+
+        async with reader.prefetched([data, JsonPlusSerializer().dumps_typed("plain")]):
+            assert reader.loads_typed(data) == _files(MANIFEST)
+
+    @pytest.mark.anyio
+    async def test_missing_blob_raises_without_store_read(self, serde):
+        """Test that a blob missing at prefetch is not looked up again."""
+        data = serde.dumps_typed(_files(MANIFEST))
+        reader = DedupSerializer(AsyncInMemoryBlobStore())
+
+        async with reader.prefetched([data]):
+            with pytest.raises(KeyError, match="missing from the blob store"):
+                reader.loads_typed(data)
+
+
+class TestDedupAsyncPostgresSaver:
+    """Test loading checkpoint rows without blocking the event loop."""
+
+    @pytest.mark.anyio
+    async def test_channel_values_are_prefetched(self):
+        """Test that channel values referencing blobs load on the event loop."""
+        blob_store = AsyncInMemoryBlobStore()
+        serde = DedupSerializer(blob_store)
+        type_, data = serde.dumps_typed(_files(MANIFEST))
+        saver = DedupAsyncPostgresSaver(conn=None, serde=DedupSerializer(blob_store))
+        row = {
+            "thread_id": "t1",
+            "checkpoint_ns": "",
+            "checkpoint_id": "c1",
+            "parent_checkpoint_id": None,
+            "checkpoint": {"channel_values": {}},
+            "channel_values": [(b"files", type_.encode(), data)],
+            "metadata": {},
+            "pending_writes": [],
+        }
+
+        loaded = await saver._load_checkpoint_tuple(row)
+
+        assert loaded.checkpoint["channel_values"]["files"] == _files(MANIFEST)
+
+
+class TestAsyncPostgresBlobStore:
+    """Test the sync interface of the async Postgres blob store."""
+
+    @pytest.mark.anyio
+    async def test_sync_calls_from_the_event_loop_raise(self):
+        """Test that sync reads and writes refuse to block the event loop."""
+        store = AsyncPostgresBlobStore(conn=None)
+
+        with pytest.raises(asyncio.InvalidStateError):
+            store.get_many(["digest"])
+        with pytest.raises(asyncio.InvalidStateError):
+            store.put_many({"digest": b"blob"})
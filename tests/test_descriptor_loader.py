@@ -0,0 +1,218 @@
+"""Tests for loading the spec schema from protobuf descriptors."""
+
+import pytest
+from google.protobuf import descriptor_pb2, descriptor_pool
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto
+
+from src.agents.rds_manifest_generator.schema import loader
+from src.agents.rds_manifest_generator.schema.descriptor_loader import (
+    DescriptorSchemaLoader,
+)
+from src.agents.rds_manifest_generator.schema.loader import (
+    ProtoSchemaLoader,
+    get_schema_loader,
+)
+
+VALIDATE_PROTO = "buf/validate/validate.proto"
+FOREIGN_KEY_PROTO = "org/project_planton/shared/foreignkey/v1/foreign_key.proto"
+SPEC_PROTO = "graph_fleet/tests/descriptor_loader/spec.proto"
+
+
+def _add_field(fields, name, number, type_, type_name=None, repeated=False):
+    """Add a field (or extension) to a repeated FieldDescriptorProto container."""
+    label = FieldDescriptorProto.LABEL_REPEATED if repeated else FieldDescriptorProto.LABEL_OPTIONAL
+    field = fields.add(name=name, number=number, type=type_, label=label)
+    if type_name:
+        field.type_name = type_name
+    return field
+
+
+def _add_extension(file_proto, name, number, type_, type_name=None):
+    """Add a FieldOptions extension to a FileDescriptorProto."""
+    extension = _add_field(file_proto.extension, name, number, type_, type_name)
+    extension.extendee = ".google.protobuf.FieldOptions"
+
+
+def _validate_file() -> descriptor_pb2.FileDescriptorProto:
+    """Return a minimal buf/validate/validate.proto with the rules the loader reads."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=VALIDATE_PROTO,
+        package="buf.validate",
+        dependency=["google/protobuf/descriptor.proto"],
+    )
+    string_rules = file_proto.message_type.add(name="StringRules")
+    _add_field(string_rules.field, "min_len", 2, FieldDescriptorProto.TYPE_UINT64)
+    _add_field(string_rules.field, "pattern", 6, FieldDescriptorProto.TYPE_STRING)
+    int32_rules = file_proto.message_type.add(name="Int32Rules")
+    _add_field(int32_rules.field, "lte", 3, FieldDescriptorProto.TYPE_INT32)
+    _add_field(int32_rules.field, "gt", 4, FieldDescriptorProto.TYPE_INT32)
+    field_rules = file_proto.message_type.add(name="FieldRules")
+    _add_field(field_rules.field, "int32", 3, FieldDescriptorProto.TYPE_MESSAGE, ".buf.validate.Int32Rules")
+    _add_field(field_rules.field, "string", 14, FieldDescriptorProto.TYPE_MESSAGE, ".buf.validate.StringRules")
+    _add_field(field_rules.field, "required", 25, FieldDescriptorProto.TYPE_BOOL)
+    _add_extension(
+        file_proto, "field", 1159, FieldDescriptorProto.TYPE_MESSAGE, ".buf.validate.FieldRules"
+    )
+    return file_proto
+
+
+def _foreign_key_file() -> descriptor_pb2.FileDescriptorProto:
+    """Return a minimal foreign key proto with the default kind extensions."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=FOREIGN_KEY_PROTO,
+        package="org.project_planton.shared.foreignkey.v1",
+        dependency=["google/protobuf/descriptor.proto"],
+    )
+    kind = file_proto.enum_type.add(name="CloudResourceKind")
+    kind.value.add(name="unspecified", number=0)
+    kind.value.add(name="AwsVpc", number=1)
+    value_or_ref = file_proto.message_type.add(name="StringValueOrRef")
+    _add_field(value_or_ref.field, "value", 1, FieldDescriptorProto.TYPE_STRING)
+    for name, number, type_, type_name in (
+        ("default_kind", 200001, FieldDescriptorProto.TYPE_ENUM,
+         ".org.project_planton.shared.foreignkey.v1.CloudResourceKind"),
+        ("default_kind_field_path", 200002, FieldDescriptorProto.TYPE_STRING, None),
+    ):
+        _add_extension(file_proto, name, number, type_, type_name)
+    return file_proto
+
+
+def _spec_file(pool) -> descriptor_pb2.FileDescriptorProto:
+    """Return a spec proto using the validation and foreign key options."""
+    rules = pool.FindExtensionByName("buf.validate.field")
+    default_kind = pool.FindExtensionByName("org.project_planton.shared.foreignkey.v1.default_kind")
+    field_path = pool.FindExtensionByName(
+        "org.project_planton.shared.foreignkey.v1.default_kind_field_path"
+    )
+
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=SPEC_PROTO,
+        package="graph_fleet.tests.descriptor_loader",
+        dependency=[VALIDATE_PROTO, FOREIGN_KEY_PROTO],
+        syntax="proto3",
+    )
+    spec = file_proto.message_type.add(name="AwsRdsInstanceSpec")
+
+    subnets = _add_field(
+        spec.field, "subnet_ids", 1, FieldDescriptorProto.TYPE_MESSAGE,
+        ".org.project_planton.shared.foreignkey.v1.StringValueOrRef", repeated=True,
+    )
+    subnets.options.Extensions[default_kind] = default_kind.enum_type.values_by_name["AwsVpc"].number
+    subnets.options.Extensions[field_path] = "status.outputs.private_subnets.[*].id"
+
+    engine = _add_field(spec.field, "engine", 2, FieldDescriptorProto.TYPE_STRING)
+    engine.options.Extensions[rules].string.min_len = 1
+
+    instance_class = _add_field(spec.field, "instance_class", 3, FieldDescriptorProto.TYPE_STRING)
+    instance_class.options.Extensions[rules].required = True
+    instance_class.options.Extensions[rules].string.pattern = r"^db\..*"
+
+    storage = _add_field(spec.field, "allocated_storage_gb", 4, FieldDescriptorProto.TYPE_INT32)
+    storage.options.Extensions[rules].int32.gt = 0
+    storage.options.Extensions[rules].int32.lte = 65536
+
+    tags_entry = spec.nested_type.add(name="TagsEntry")
+    tags_entry.options.map_entry = True
+    _add_field(tags_entry.field, "key", 1, FieldDescriptorProto.TYPE_STRING)
+    _add_field(tags_entry.field, "value", 2, FieldDescriptorProto.TYPE_STRING)
+    _add_field(
+        spec.field, "tags", 5, FieldDescriptorProto.TYPE_MESSAGE,
+        ".graph_fleet.tests.descriptor_loader.AwsRdsInstanceSpec.TagsEntry", repeated=True,
+    )
+    return file_proto
+
+
+def _source_info(file_proto) -> descriptor_pb2.FileDescriptorSet:
+    """Return a descriptor set with the leading comment of the engine field."""
+    with_comments = descriptor_pb2.FileDescriptorProto()
+    with_comments.CopyFrom(file_proto)
+    with_comments.source_code_info.location.add(
+        path=[4, 0, 2, 1], span=[1, 2, 30], leading_comments=" Database engine\n (e.g. postgres)\n"
+    )
+    return descriptor_pb2.FileDescriptorSet(file=[with_comments])
+
+
+@pytest.fixture(scope="module")
+def spec_file():
+    """Register the test protos in the default pool and return the spec file."""
+    pool = descriptor_pool.Default()
+    for make_file in (_validate_file, _foreign_key_file):
+        file_proto = make_file()
+        try:
+            pool.FindFileByName(file_proto.name)
+        except KeyError:
+            pool.Add(file_proto)
+
+    file_proto = _spec_file(pool)
+    try:
+        pool.FindFileByName(SPEC_PROTO)
+    except KeyError:
+        pool.Add(file_proto)
+    return file_proto
+
+
+@pytest.fixture
+def schema_loader(spec_file):
+    """Return a loader reading the test spec descriptor with source comments."""
+    descriptor = descriptor_pool.Default().FindMessageTypeByName(
+        "graph_fleet.tests.descriptor_loader.AwsRdsInstanceSpec"
+    )
+    return DescriptorSchemaLoader(descriptor, source_info=_source_info(spec_file))
+
+
+class TestDescriptorSchemaLoader:
+    """Test building ProtoField records from message descriptors."""
+
+    def test_validation_rules(self, schema_loader):
+        """Test that buf.validate extensions become validation rules."""
+        fields = {field.name: field for field in schema_loader.load_spec_schema()}
+
+        assert fields["engine"].required
+        assert fields["engine"].validation_rules == {"min_len": 1}
+        assert fields["instance_class"].validation_rules == {
+            "required": True,
+            "pattern": r"^db\..*",
+        }
+        assert fields["allocated_storage_gb"].validation_rules == {
+            "greater_than": 0,
+            "less_than_or_equal": 65536,
+        }
+        assert not fields["allocated_storage_gb"].required
+
+    def test_foreign_keys_and_types(self, schema_loader):
+        """Test foreign key extensions, repeated fields and map types."""
+        fields = {field.name: field for field in schema_loader.load_spec_schema()}
+
+        assert fields["subnet_ids"].foreign_key_info == {
+            "default_kind": "AwsVpc",
+            "default_field_path": "status.outputs.private_subnets.[*].id",
+        }
+        assert fields["subnet_ids"].is_repeated
+        assert fields["subnet_ids"].field_type == (
+            "org.project_planton.shared.foreignkey.v1.StringValueOrRef"
+        )
+        assert fields["tags"].field_type == "map<string, string>"
+        assert not fields["tags"].is_repeated
+        assert fields["allocated_storage_gb"].field_type == "int32"
+        assert [field.field_number for field in fields.values()] == [1, 2, 3, 4, 5]
+
+    def test_source_comments(self, schema_loader, spec_file):
+        """Test that descriptions come from source info when it is available."""
+        fields = {field.name: field for field in schema_loader.load_spec_schema()}
+
+        assert fields["engine"].description == "Database engine (e.g. postgres)"
+        assert fields["instance_class"].description == ""
+
+        without_source = DescriptorSchemaLoader(schema_loader.descriptor)
+        assert all(not field.description for field in without_source.load_spec_schema())
+
+    def test_no_file_reads(self, schema_loader):
+        """Test that proto files are never read."""
+        with pytest.raises(FileNotFoundError, match="descriptor"):
+            schema_loader.parse_proto_file("spec.proto")
+
+    def test_default_loader_without_stubs(self, monkeypatch):
+        """Test that the global loader falls back to proto files without stubs."""
+        monkeypatch.setattr(loader, "_loader", None)
+
+        assert type(get_schema_loader()) is ProtoSchemaLoader
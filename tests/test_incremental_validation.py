@@ -0,0 +1,175 @@
+"""Tests for field-level validation of requirement changes."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.protobuf import descriptor_pb2, descriptor_pool
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto
+from google.protobuf.message_factory import GetMessageClass
+
+from src.agents.rds_manifest_generator.tools.requirement_tools import (
+    validate_requirement,
+)
+from src.agents.rds_manifest_generator.validation import incremental
+from src.agents.rds_manifest_generator.validation.incremental import (
+    _MessageRule,
+    validate_fields,
+)
+
+REQUIREMENTS = {"engine": "postgres", "instance_class": "db.t3.micro"}
+
+
+def _runtime(requirements: dict) -> SimpleNamespace:
+    """Return a tool runtime whose state holds /requirements.json."""
+    content = json.dumps(requirements, indent=2).splitlines()
+    return SimpleNamespace(state={"files": {"/requirements.json": {"content": content}}})
+
+
+def _manifest_class():
+    """Return a message class shaped like AwsRdsInstance, with int32 spec fields."""
+    package = "graph_fleet.tests.incremental_validation"
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name="graph_fleet/tests/incremental_validation/manifest.proto", package=package
+    )
+    spec = file_proto.message_type.add(name="Spec")
+    for number, name in enumerate(("min_size", "max_size", "port"), start=1):
+        spec.field.add(
+            name=name,
+            number=number,
+            type=FieldDescriptorProto.TYPE_INT32,
+            label=FieldDescriptorProto.LABEL_OPTIONAL,
+        )
+    manifest = file_proto.message_type.add(name="Manifest")
+    manifest.field.add(
+        name="spec",
+        number=1,
+        type=FieldDescriptorProto.TYPE_MESSAGE,
+        label=FieldDescriptorProto.LABEL_OPTIONAL,
+        type_name=f".{package}.Spec",
+    )
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return GetMessageClass(pool.FindMessageTypeByName(f"{package}.Manifest"))
+
+
+class SizeRuleValidator:
+    """Fake validator evaluating "this.min_size <= this.max_size" on a spec."""
+
+    def __init__(self):
+        """Start without validated messages."""
+        self.messages = []
+
+    def collect_violations(self, message):
+        """Report the size rule, which unset fields (value 0) can violate."""
+        self.messages.append(message)
+        if message.min_size <= message.max_size:
+            return []
+        return [SimpleNamespace(field_path="", rule_id="size_range", message="min_size must not exceed max_size")]
+
+
+@pytest.fixture
+def size_rule(monkeypatch):
+    """Validate against a spec with one message-level rule on min_size and max_size."""
+    fake = SizeRuleValidator()
+    monkeypatch.setattr(incremental, "AwsRdsInstance", _manifest_class())
+    monkeypatch.setattr(
+        incremental,
+        "_message_rules",
+        lambda descriptor: (_MessageRule("size_range", frozenset({"min_size", "max_size"})),),
+    )
+    monkeypatch.setattr(incremental, "get_manifest_validator", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def installed_stubs():
+    """Skip tests that need protovalidate and the AwsRdsInstance stubs."""
+    pytest.importorskip("protovalidate")
+    pytest.importorskip("org.project_planton.provider.aws.awsrdsinstance.v1.api_pb2")
+
+
+class TestMessageRules:
+    """Test which message-level rules a change is validated against."""
+
+    def test_rule_with_uncollected_field_is_not_reported(self, size_rule):
+        """Test that a rule is skipped while one of its fields has no value."""
+        verdicts = validate_fields({"min_size": 10})
+
+        assert verdicts["min_size"].valid
+        assert not size_rule.messages[0].HasField("max_size")
+
+    def test_rule_with_all_fields_collected_is_reported(self, size_rule):
+        """Test that the rule is evaluated with the other field's collected value."""
+        verdicts = validate_fields({"min_size": 10}, {"max_size": 5})
+
+        assert verdicts["min_size"].violations == ("<unknown>: min_size must not exceed max_size",)
+        assert size_rule.messages[0].max_size == 5
+
+    def test_unrelated_fields_are_not_added(self, size_rule):
+        """Test that fields of rules not mentioning the change stay out of the spec."""
+        verdicts = validate_fields({"port": 5432}, {"min_size": 10, "max_size": 5})
+
+        assert verdicts["port"].valid
+        assert not size_rule.messages[0].HasField("min_size")
+
+
+@pytest.mark.usefixtures("installed_stubs")
+class TestValidateFields:
+    """Test validating changed fields against the rules they affect."""
+
+    def test_valid_change(self):
+        """Test that a valid value gets a verdict without violations."""
+        verdicts = validate_fields({"allocated_storage_gb": 20}, REQUIREMENTS)
+
+        assert verdicts["allocated_storage_gb"].valid
+
+    def test_invalid_change(self):
+        """Test that violations are attributed to the changed field."""
+        verdicts = validate_fields({"allocated_storage_gb": 0}, REQUIREMENTS)
+
+        verdict = verdicts["allocated_storage_gb"]
+        assert not verdict.valid
+        assert all(v.startswith("allocated_storage_gb") for v in verdict.violations)
+
+    def test_rules_of_other_fields_are_not_reported(self):
+        """Test that fields not collected yet do not fail the changed field."""
+        verdicts = validate_fields({"instance_class": "db.t3.micro"})
+
+        assert verdicts["instance_class"].valid
+
+    def test_unknown_field(self):
+        """Test that a field missing from the spec is reported as unknown."""
+        verdicts = validate_fields({"no_such_field": 1, "allocated_storage_gb": 20})
+
+        assert verdicts["no_such_field"].violations == ("no_such_field: unknown field",)
+        assert verdicts["allocated_storage_gb"].valid
+
+
+@pytest.mark.usefixtures("installed_stubs")
+class TestValidateRequirementTool:
+    """Test the requirements collector's validation tool."""
+
+    def test_valid_value(self):
+        """Test that a valid value is confirmed."""
+        result = validate_requirement.func(
+            "allocated_storage_gb", 20, runtime=_runtime(REQUIREMENTS)
+        )
+
+        assert result == "✓ allocated_storage_gb = 20 is valid"
+
+    def test_invalid_value(self):
+        """Test that violations of an invalid value are listed."""
+        result = validate_requirement.func(
+            "instance_class", "t3.micro", runtime=_runtime(REQUIREMENTS)
+        )
+
+        assert result.startswith("✗ instance_class = t3.micro is invalid:")
+        assert "\n  - instance_class: " in result
+
+    def test_unknown_field(self):
+        """Test that an unknown field is reported."""
+        result = validate_requirement.func("no_such_field", 1, runtime=_runtime({}))
+
+        assert "no_such_field: unknown field" in result
@@ -0,0 +1,149 @@
+"""Tests for the in-process checks of simple field rules."""
+
+import re
+
+import pytest
+
+from src.agents.rds_manifest_generator.schema import local_rules
+from src.agents.rds_manifest_generator.schema.loader import ProtoSchemaLoader
+from src.agents.rds_manifest_generator.schema.local_rules import (
+    FieldRules,
+    get_local_rules,
+    get_stub_rules,
+)
+
+SPEC_PROTO = r"""
+message AwsRdsInstanceSpec {
+  string engine = 1 [(buf.validate.field).string.min_len = 1];
+  string instance_class = 2 [(buf.validate.field).string.pattern = "^db\\..*"];
+  string api_version = 3 [(buf.validate.field).string.const = "v1"];
+  int32 allocated_storage_gb = 4 [(buf.validate.field).int32 = {gt: 0, lte: 65536}];
+  int32 port = 5 [(buf.validate.field).int32.gte = 1024];
+  int32 backup_retention_days = 6 [(buf.validate.field).int32.lte = 35];
+  bool multi_az = 7;
+  repeated string security_group_ids = 8 [(buf.validate.field).string.min_len = 1];
+}
+"""
+
+
+@pytest.fixture
+def schema():
+    """Return the indexed schema of SPEC_PROTO."""
+    return ProtoSchemaLoader(read_file_func=lambda path: SPEC_PROTO).load_indexed_schema()
+
+
+class TestFieldRules:
+    """Test checking single values against compiled rules."""
+
+    def test_string_rules(self):
+        """Test min_len, pattern and const with protovalidate's messages."""
+        rules = FieldRules(name="f", min_len=2, pattern=re.compile(r"^db\."))
+
+        assert rules.check("db.t3") == []
+        assert rules.check("x") == [
+            "value length must be at least 2 characters",
+            "value does not match regex pattern `^db\\.`",
+        ]
+        assert FieldRules(name="f", const="v1").check("v2") == ["value must equal `v1`"]
+
+    @pytest.mark.parametrize(
+        ("rules", "value", "expected"),
+        [
+            (FieldRules(name="f", gt=0, lte=10), 5, []),
+            (FieldRules(name="f", gt=0, lte=10), 0, ["value must be greater than 0 and less than or equal to 10"]),
+            (FieldRules(name="f", gt=0, lte=10), 11, ["value must be greater than 0 and less than or equal to 10"]),
+            (FieldRules(name="f", gte=1), 1, []),
+            (FieldRules(name="f", gte=1), 0.5, ["value must be greater than or equal to 1"]),
+            (FieldRules(name="f", lte=35), 36, ["value must be less than or equal to 35"]),
+        ],
+    )
+    def test_numeric_bounds(self, rules, value, expected):
+        """Test lower, upper and range bounds."""
+        assert rules.check(value) == expected
+
+    def test_values_of_other_types_are_left_to_protovalidate(self):
+        """Test that type mismatches are not reported locally."""
+        rules = FieldRules(name="f", gt=0, min_len=1)
+
+        assert rules.check(True) == []
+        assert rules.check(None) == []
+        assert rules.check({"value": 0}) == []
+
+    def test_unsupported_pattern_is_skipped(self):
+        """Test that a pattern Python cannot compile is not checked locally."""
+        loader = ProtoSchemaLoader(
+            read_file_func=lambda path: SPEC_PROTO.replace(r"^db\\..*", r"^\\C")
+        )
+        field = loader.get_field_by_name("instance_class")
+
+        assert FieldRules.from_field(field).pattern is None
+
+
+class TestLocalRules:
+    """Test checking candidate values and specs against a schema's rules."""
+
+    def test_check_value_by_proto_or_json_name(self, schema):
+        """Test that values are checked by either field name."""
+        rules = get_local_rules(schema)
+
+        assert rules.check_value("instance_class", "db.t3.micro") == []
+        assert rules.check_value("instanceClass", "t3.micro") == [
+            "instance_class: value does not match regex pattern `^db\\..*`"
+        ]
+        assert rules.check_value("multi_az", True) == []
+        assert rules.check_value("no_such_field", 1) == []
+
+    def test_repeated_fields_are_not_checked(self, schema):
+        """Test that rules of repeated fields are left to protovalidate."""
+        assert get_local_rules(schema).check_value("security_group_ids", "") == []
+
+    def test_check_spec(self, schema):
+        """Test that every spec value is checked, with manifest paths."""
+        spec = {"engine": "", "allocatedStorageGb": 0, "port": 5432, "multiAz": False}
+
+        assert get_local_rules(schema).check_spec(spec) == [
+            "spec.engine: value length must be at least 1 characters",
+            "spec.allocated_storage_gb: value must be greater than 0 and less than or equal to 65536",
+        ]
+
+    def test_rules_are_compiled_once_per_schema(self, schema):
+        """Test that the compiled rules are shared by callers of a schema."""
+        assert get_local_rules(schema) is get_local_rules(schema)
+
+
+class TestGetStubRules:
+    """Test the rules compiled from the installed stubs."""
+
+    @pytest.fixture(autouse=True)
+    def reset_stub_rules(self, monkeypatch):
+        """Start each test without compiled stub rules."""
+        monkeypatch.setattr(local_rules, "_stub_rules", None)
+        monkeypatch.setattr(local_rules, "_stub_rules_loaded", False)
+
+    def test_rules_come_from_the_stub_descriptors(self, monkeypatch):
+        """Test that the stubs' schema is compiled once and shared."""
+        loads: list[int] = []
+
+        def load_descriptor_schema_loader():
+            loads.append(1)
+            return ProtoSchemaLoader(read_file_func=lambda path: SPEC_PROTO)
+
+        monkeypatch.setattr(local_rules, "load_descriptor_schema_loader", load_descriptor_schema_loader)
+
+        rules = get_stub_rules()
+        assert rules.check_value("port", 80) == ["port: value must be greater than or equal to 1024"]
+        assert get_stub_rules() is rules
+        assert len(loads) == 1
+
+    def test_no_rules_without_stubs(self, monkeypatch):
+        """Test that nothing is checked locally when the stubs are not installed."""
+        loads: list[int] = []
+
+        def load_descriptor_schema_loader():
+            loads.append(1)
+
+        monkeypatch.setattr(local_rules, "load_descriptor_schema_loader", load_descriptor_schema_loader)
+
+        assert get_stub_rules() is None
+        assert get_stub_rules() is None
+        assert len(loads) == 1
@@ -0,0 +1,201 @@
+"""Tests for validating manifests with protovalidate and the local field rules."""
+
+from types import SimpleNamespace
+
+import pytest
+from google.protobuf import descriptor_pb2, descriptor_pool
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto
+from google.protobuf.message_factory import GetMessageClass
+
+from src.agents.rds_manifest_generator.validation import manifest_validator
+from src.agents.rds_manifest_generator.validation.manifest_validator import (
+    validate_manifest_dict,
+)
+from src.agents.rds_manifest_generator.validation.result_cache import (
+    ValidationResultCache,
+    manifest_digest,
+)
+
+STORAGE_VIOLATION_PREFIX = "spec.allocated_storage_gb: value must be greater than 0"
+
+
+def _manifest(**spec) -> dict:
+    """Return an AwsRdsInstance manifest with the given spec."""
+    return {
+        "apiVersion": "aws.project-planton.org/v1",
+        "kind": "AwsRdsInstance",
+        "metadata": {"name": "test-db"},
+        "spec": spec,
+    }
+
+
+def _manifest_class():
+    """Return a message class shaped like AwsRdsInstance, with one spec field."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name="graph_fleet/tests/manifest_validation/manifest.proto",
+        package="graph_fleet.tests.manifest_validation",
+    )
+    spec = file_proto.message_type.add(name="Spec")
+    spec.field.add(
+        name="allocated_storage_gb",
+        number=1,
+        type=FieldDescriptorProto.TYPE_INT32,
+        label=FieldDescriptorProto.LABEL_OPTIONAL,
+    )
+    manifest = file_proto.message_type.add(name="Manifest")
+    for name, number, type_ in (
+        ("api_version", 1, FieldDescriptorProto.TYPE_STRING),
+        ("kind", 2, FieldDescriptorProto.TYPE_STRING),
+        ("spec", 3, FieldDescriptorProto.TYPE_MESSAGE),
+    ):
+        field = manifest.field.add(
+            name=name, number=number, type=type_, label=FieldDescriptorProto.LABEL_OPTIONAL
+        )
+        if name == "spec":
+            field.type_name = ".graph_fleet.tests.manifest_validation.Spec"
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return GetMessageClass(pool.FindMessageTypeByName("graph_fleet.tests.manifest_validation.Manifest"))
+
+
+class FakeCompilationError(Exception):
+    """Stand-in for protovalidate.CompilationError."""
+
+
+class FakeValidationError(Exception):
+    """Stand-in for protovalidate.ValidationError."""
+
+    def __init__(self, msg, violations):
+        """Keep the violations, as protovalidate does."""
+        super().__init__(msg)
+        self.violations = violations
+
+
+class FakeValidator:
+    """Records validated messages and reports the configured violations."""
+
+    def __init__(self):
+        """Start without violations."""
+        self.messages = []
+        self.violations = []
+        self.error = None
+
+    def validate(self, message):
+        """Record the message and raise the configured error or violations."""
+        self.messages.append(message)
+        if self.error is not None:
+            raise self.error
+        if self.violations:
+            raise FakeValidationError("invalid", self.violations)
+
+
+@pytest.fixture
+def validator(monkeypatch):
+    """Validate against a fake AwsRdsInstance and validator, with an empty cache."""
+    fake = FakeValidator()
+    fake.cache = ValidationResultCache()
+    fake.schema = SimpleNamespace(version="v1")
+    monkeypatch.setattr(manifest_validator, "AwsRdsInstance", _manifest_class())
+    monkeypatch.setattr(manifest_validator, "get_stub_rules", lambda: None)
+    monkeypatch.setattr(manifest_validator, "get_manifest_validator", lambda: fake)
+    monkeypatch.setattr(
+        manifest_validator,
+        "protovalidate",
+        SimpleNamespace(CompilationError=FakeCompilationError, ValidationError=FakeValidationError),
+    )
+    monkeypatch.setattr(manifest_validator, "get_validation_cache", lambda: fake.cache)
+    monkeypatch.setattr(manifest_validator, "active_schema_version", lambda: fake.schema)
+    return fake
+
+
+@pytest.fixture
+def installed_stubs():
+    """Skip tests that need protovalidate and the AwsRdsInstance stubs."""
+    pytest.importorskip("protovalidate")
+    pytest.importorskip("org.project_planton.provider.aws.awsrdsinstance.v1.api_pb2")
+
+
+class TestValidateManifestDictConversion:
+    """Test converting manifest dicts and caching their validation results."""
+
+    def test_dict_is_converted_to_the_proto_message(self, validator):
+        """Test that the dict's camelCase fields populate the message."""
+        manifest = {"apiVersion": "v1", "kind": "AwsRdsInstance", "spec": {"allocatedStorageGb": 20}}
+
+        assert validate_manifest_dict(manifest) == []
+        assert len(validator.messages) == 1
+        assert validator.messages[0].spec.allocated_storage_gb == 20
+
+    def test_conversion_errors_skip_validation(self, validator):
+        """Test that a dict not matching the message is reported as a schema mismatch."""
+        violations = validate_manifest_dict({"spec": {"noSuchField": 1}})
+
+        assert len(violations) == 1
+        assert violations[0].startswith("schema mismatch:")
+        assert validator.messages == []
+
+    def test_violations_are_formatted(self, validator):
+        """Test that protovalidate's violations are rendered as "path: message"."""
+        validator.violations = [
+            SimpleNamespace(field_path="spec.allocated_storage_gb", message="value must be greater than 0")
+        ]
+
+        assert validate_manifest_dict({"spec": {"allocatedStorageGb": 0}}) == [
+            "spec.allocated_storage_gb: value must be greater than 0"
+        ]
+
+    def test_compilation_errors_are_reported(self, validator):
+        """Test that rules failing to compile are reported instead of raised."""
+        validator.error = FakeCompilationError("no such overload")
+
+        assert validate_manifest_dict({"spec": {"allocatedStorageGb": 20}}) == [
+            "validation rules could not be compiled: no such overload"
+        ]
+
+    def test_results_are_cached_by_schema_version_and_digest(self, validator):
+        """Test that a manifest is validated once per schema version."""
+        manifest = {"apiVersion": "v1", "spec": {"allocatedStorageGb": 20}}
+
+        validate_manifest_dict(manifest)
+        validate_manifest_dict({"spec": {"allocatedStorageGb": 20}, "apiVersion": "v1"})
+        assert len(validator.messages) == 1
+        assert validator.cache.get("v1", manifest_digest(manifest)) == []
+
+        validator.schema = SimpleNamespace(version="v2")
+        validate_manifest_dict(manifest)
+        assert len(validator.messages) == 2
+        assert validator.cache.get("v2", manifest_digest(manifest)) == []
+
+    def test_cache_can_be_bypassed(self, validator):
+        """Test that use_cache=False validates again and stores nothing."""
+        manifest = {"spec": {"allocatedStorageGb": 20}}
+
+        validate_manifest_dict(manifest, use_cache=False)
+        validate_manifest_dict(manifest, use_cache=False)
+
+        assert len(validator.messages) == 2
+        assert len(validator.cache) == 0
+
+
+@pytest.mark.usefixtures("installed_stubs")
+class TestValidateManifestDict:
+    """Test manifest validation with the local field rules enabled."""
+
+    def test_local_violations_short_circuit(self):
+        """Test that a local violation is returned without running protovalidate."""
+        violations = validate_manifest_dict(
+            _manifest(allocatedStorageGb=0, noSuchField=1), use_cache=False
+        )
+
+        assert len(violations) == 1
+        assert violations[0].startswith(STORAGE_VIOLATION_PREFIX)
+
+    def test_conversion_errors_without_local_violations(self):
+        """Test that a manifest passing the local rules is converted and reported."""
+        violations = validate_manifest_dict(
+            _manifest(allocatedStorageGb=20, noSuchField=1), use_cache=False
+        )
+
+        assert len(violations) == 1
+        assert violations[0].startswith("schema mismatch:")
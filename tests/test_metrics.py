@@ -0,0 +1,79 @@
+"""Tests for the shared metrics registry in src/common/metrics.py."""
+
+import pytest
+
+from src.common.metrics import MetricEvent, MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Test counters, observations and hooks."""
+
+    def test_counters_are_kept_per_label_set(self):
+        """Test that counters with different labels are aggregated separately."""
+        registry = MetricsRegistry()
+        registry.increment("fetches", outcome="clone")
+        registry.increment("fetches", outcome="pull")
+        registry.increment("fetches", outcome="pull")
+
+        assert registry.counter("fetches", outcome="clone") == 1
+        assert registry.counter("fetches", outcome="pull") == 2
+        assert registry.counter("fetches", outcome="cache_hit") == 0
+
+    def test_observations_are_summarized(self):
+        """Test that observed values are aggregated into count, total, min and max."""
+        registry = MetricsRegistry()
+        for value in (3, 1, 2):
+            registry.observe("bytes", value, path="a.proto")
+
+        summary = registry.summary("bytes", path="a.proto")
+
+        assert summary is not None
+        assert (summary.count, summary.total, summary.min, summary.max) == (3, 6, 1, 3)
+        assert summary.mean == 2
+
+    def test_timer_records_on_error(self):
+        """Test that a failing block still records its duration."""
+        registry = MetricsRegistry()
+
+        with pytest.raises(RuntimeError):
+            with registry.timer("seconds", phase="clone"):
+                raise RuntimeError("boom")
+
+        assert registry.summary("seconds", phase="clone").count == 1
+
+    def test_hooks_receive_events_until_removed(self):
+        """Test that hooks see every value and can be unregistered."""
+        registry = MetricsRegistry()
+        events: list[MetricEvent] = []
+        remove = registry.add_hook(events.append)
+
+        registry.increment("fetches", outcome="clone")
+        remove()
+        registry.increment("fetches", outcome="clone")
+
+        assert events == [MetricEvent("counter", "fetches", 1.0, {"outcome": "clone"})]
+
+    def test_failing_hook_does_not_break_recording(self):
+        """Test that hook errors are isolated from the instrumented code."""
+        registry = MetricsRegistry()
+
+        def broken(event):
+            raise ValueError("exporter down")
+
+        registry.add_hook(broken)
+        registry.increment("fetches")
+
+        assert registry.counter("fetches") == 1
+
+    def test_snapshot_filters_by_prefix(self):
+        """Test that snapshot returns plain data for matching metrics only."""
+        registry = MetricsRegistry()
+        registry.increment("repos.fetches", outcome="clone")
+        registry.increment("other.count")
+
+        snapshot = registry.snapshot("repos.")
+
+        assert snapshot["counters"] == [
+            {"name": "repos.fetches", "labels": {"outcome": "clone"}, "value": 1.0}
+        ]
+        assert snapshot["summaries"] == []
@@ -0,0 +1,251 @@
+"""Tests for the tokenizer-based proto parser and the schema loader built on it."""
+
+import pytest
+
+from src.agents.rds_manifest_generator.schema.loader import ProtoSchemaLoader
+from src.agents.rds_manifest_generator.schema.proto_parser import (
+    ProtoSyntaxError,
+    parse_proto,
+)
+
+SPEC_PROTO = r"""
+syntax = "proto3";
+
+package org.project_planton.provider.aws.awsrdsinstance.v1;
+
+import "buf/validate/validate.proto";
+import "org/project_planton/shared/foreignkey/v1/foreign_key.proto";
+
+option go_package = "github.com/project-planton/apis/awsrdsinstance/v1";
+
+// AwsRdsInstanceSpec defines the instance.
+message AwsRdsInstanceSpec {
+  // Subnets for the DB subnet group
+  repeated org.project_planton.shared.foreignkey.v1.StringValueOrRef subnet_ids = 1 [
+    (org.project_planton.shared.foreignkey.v1.default_kind) = AwsVpc,
+    (org.project_planton.shared.foreignkey.v1.default_kind_field_path) = "status.outputs.private_subnets.[*].id"
+  ];
+
+  // Database engine
+  // (e.g. postgres, mysql)
+  string engine = 2 [(buf.validate.field).string.min_len = 1];  // trailing note
+
+  /* Instance class,
+   * e.g. db.t3.micro */
+  string instance_class = 3 [
+    (buf.validate.field).required = true,
+    (buf.validate.field).string.pattern = "^db\\..*"
+  ];
+
+  int32 allocated_storage_gb = 4 [(buf.validate.field).int32 = {gt: 0, lte: 65536}];
+
+  map<string, string> tags = 5;
+
+  oneof credentials {
+    // Password in plain text
+    string password = 6;
+    string secret_arn = 7;
+  }
+
+  // Storage type
+  StorageType storage_type = 8;
+
+  enum StorageType {
+    option allow_alias = true;
+    storage_type_unspecified = 0;
+    gp3 = 1;
+  }
+
+  message Nested {
+    optional int64 value = 1 [(buf.validate.field).int64.gte = -5];
+  }
+
+  reserved 20 to 30;
+  reserved "legacy";
+
+  option (buf.validate.message).cel = {
+    id: "password_or_secret"
+    message: "password or secret_arn is required"
+    expression: "has(this.password) || has(this.secret_arn)"
+  };
+}
+
+service Ignored {
+  rpc Do(AwsRdsInstanceSpec) returns (AwsRdsInstanceSpec) {}
+}
+"""
+
+
+@pytest.fixture
+def proto():
+    """Return the parsed spec file."""
+    return parse_proto(SPEC_PROTO, filename="spec.proto")
+
+
+class TestParseProto:
+    """Test parsing a whole proto file into an AST."""
+
+    def test_file_level_declarations(self, proto):
+        """Test syntax, package, imports and file options."""
+        assert proto.syntax == "proto3"
+        assert proto.package == "org.project_planton.provider.aws.awsrdsinstance.v1"
+        assert proto.imports == (
+            "buf/validate/validate.proto",
+            "org/project_planton/shared/foreignkey/v1/foreign_key.proto",
+        )
+        assert proto.options[0].name == "go_package"
+
+    def test_all_fields_past_nested_blocks(self, proto):
+        """Test that fields after nested messages, enums and oneofs are found."""
+        message = proto.find_message("AwsRdsInstanceSpec")
+
+        assert [f.name for f in message.fields] == [
+            "subnet_ids",
+            "engine",
+            "instance_class",
+            "allocated_storage_gb",
+            "tags",
+            "password",
+            "secret_arn",
+            "storage_type",
+        ]
+        assert message.comment == "AwsRdsInstanceSpec defines the instance."
+
+    def test_comments_attach_to_fields(self, proto):
+        """Test that leading line and block comments become field comments."""
+        message = proto.find_message("AwsRdsInstanceSpec")
+
+        assert message.field("engine").comment == "Database engine (e.g. postgres, mysql)"
+        assert message.field("instance_class").comment == "Instance class, e.g. db.t3.micro"
+        assert message.field("allocated_storage_gb").comment == ""
+        assert message.field("password").comment == "Password in plain text"
+
+    def test_field_options(self, proto):
+        """Test labels, options and aggregate option values."""
+        message = proto.find_message("AwsRdsInstanceSpec")
+
+        subnets = message.field("subnet_ids")
+        assert subnets.is_repeated
+        assert subnets.type == "org.project_planton.shared.foreignkey.v1.StringValueOrRef"
+        assert subnets.option_values()[
+            "(org.project_planton.shared.foreignkey.v1.default_kind)"
+        ] == "AwsVpc"
+        assert message.field("instance_class").option_values() == {
+            "(buf.validate.field).required": True,
+            "(buf.validate.field).string.pattern": r"^db\..*",
+        }
+        assert message.field("allocated_storage_gb").option_values() == {
+            "(buf.validate.field).int32.gt": 0,
+            "(buf.validate.field).int32.lte": 65536,
+        }
+
+    def test_maps_oneofs_enums_and_nested_messages(self, proto):
+        """Test the structured members of a message."""
+        message = proto.find_message("AwsRdsInstanceSpec")
+
+        tags = message.field("tags")
+        assert (tags.is_map, tags.key_type, tags.value_type) == (True, "string", "string")
+        assert message.oneofs[0].fields == ("password", "secret_arn")
+        assert message.field("secret_arn").oneof == "credentials"
+        assert [v.name for v in message.enums[0].values] == ["storage_type_unspecified", "gp3"]
+
+        nested = proto.find_message(
+            "org.project_planton.provider.aws.awsrdsinstance.v1.AwsRdsInstanceSpec.Nested"
+        )
+        assert nested is proto.find_message("Nested")
+        assert nested.fields[0].label == "optional"
+        assert nested.fields[0].option_values() == {"(buf.validate.field).int64.gte": -5}
+
+    def test_message_options(self, proto):
+        """Test that message-level CEL rules are parsed as aggregate values."""
+        option = proto.find_message("AwsRdsInstanceSpec").options[0]
+
+        assert option.name == "(buf.validate.message).cel"
+        assert option.value["expression"] == "has(this.password) || has(this.secret_arn)"
+
+    def test_syntax_error_reports_line(self):
+        """Test that malformed files raise ProtoSyntaxError with the line number."""
+        with pytest.raises(ProtoSyntaxError, match=r"spec.proto:3:"):
+            parse_proto('syntax = "proto3";\nmessage A {\n  string name = ;\n}\n', "spec.proto")
+
+    def test_unterminated_message(self):
+        """Test that a missing closing brace is reported."""
+        with pytest.raises(ProtoSyntaxError, match="Unterminated message"):
+            parse_proto("message A {\n  string name = 1;\n")
+
+
+class TestProtoSchemaLoader:
+    """Test building ProtoField records from the parsed AST."""
+
+    @pytest.fixture
+    def loader(self):
+        """Return a loader reading the spec from memory."""
+        return ProtoSchemaLoader(read_file_func=lambda path: SPEC_PROTO)
+
+    def test_fields_rules_and_foreign_keys(self, loader):
+        """Test that rules, requiredness and foreign keys come from the options."""
+        fields = {field.name: field for field in loader.load_spec_schema()}
+
+        assert fields["engine"].required
+        assert fields["engine"].validation_rules == {"min_len": 1}
+        assert fields["instance_class"].validation_rules == {
+            "required": True,
+            "pattern": r"^db\..*",
+        }
+        assert fields["allocated_storage_gb"].validation_rules == {
+            "greater_than": 0,
+            "less_than_or_equal": 65536,
+        }
+        assert not fields["allocated_storage_gb"].required
+        assert fields["subnet_ids"].foreign_key_info == {
+            "default_kind": "AwsVpc",
+            "default_field_path": "status.outputs.private_subnets.[*].id",
+        }
+        assert fields["subnet_ids"].is_repeated
+        assert fields["engine"].description == "Database engine (e.g. postgres, mysql)"
+
+    def test_parsed_file_is_cached(self, loader):
+        """Test that a file is parsed once and exposes all of its messages."""
+        proto = loader.parse_proto_file("spec.proto")
+
+        assert loader.parse_proto_file("spec.proto") is proto
+        assert proto.find_message("Nested") is not None
+
+    def test_indexed_lookups(self, loader):
+        """Test name and camelCase lookups and the precomputed partitions."""
+        schema = loader.load_indexed_schema()
+
+        assert loader.load_indexed_schema() is schema
+        assert loader.get_field_by_name("allocated_storage_gb") is schema.by_name["allocated_storage_gb"]
+        assert loader.get_field_by_name("allocatedStorageGb").name == "allocated_storage_gb"
+        assert loader.get_field_by_name("missing") is None
+        assert [f.name for f in loader.get_required_fields()] == ["engine", "instance_class"]
+        assert loader.get_optional_fields() is loader.get_optional_fields()
+        assert len(schema.required) + len(schema.optional) == len(schema.fields)
+
+    def test_fields_are_immutable(self, loader):
+        """Test that shared schema fields cannot be modified by callers."""
+        field = loader.get_field_by_name("engine")
+
+        with pytest.raises(AttributeError):
+            field.required = False
+        with pytest.raises(TypeError):
+            field.validation_rules["min_len"] = 0
+        assert not hasattr(field, "__dict__")
+
+    def test_renderings_are_memoized_per_schema(self, loader):
+        """Test that a rendering is computed once per schema and not shared across schemas."""
+        calls: list[int] = []
+
+        def render(schema):
+            calls.append(1)
+            return ", ".join(field.name for field in schema.required)
+
+        schema = loader.load_indexed_schema()
+        assert schema.rendered("required", render) == "engine, instance_class"
+        assert schema.rendered("required", render) == "engine, instance_class"
+        assert len(calls) == 1
+
+        swapped = ProtoSchemaLoader(read_file_func=lambda path: SPEC_PROTO).load_indexed_schema()
+        swapped.rendered("required", render)
+        assert len(calls) == 2
@@ -0,0 +1,724 @@
+"""Tests for the shared repository fetcher in src/common/repos."""
+
+import hashlib
+import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from src.common.metrics import MetricsRegistry, get_metrics_registry
+from src.common.repos import (
+    RepositoryConfig,
+    RepositoryFetchError,
+    SnapshotStore,
+    afetch_repositories,
+    afetch_repository,
+    afetch_repository_snapshots,
+    archive,
+    fetch_repository,
+    fetch_repository_snapshot,
+    fetcher,
+    locking,
+)
+from src.common.repos.bundle import build_bundle, load_bundled_snapshot, write_bundle
+
+PROTO_DIR = "apis/provider/aws/awsrdsinstance/v1"
+
+
+def _git(repo: Path, *args: str) -> str:
+    """Run a git command in *repo* and return its stdout."""
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+def _commit_file(repo: Path, relative_path: str, content: str) -> None:
+    """Write a file into *repo* and commit it."""
+    file_path = repo / relative_path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content)
+    _git(repo, "add", relative_path)
+    _git(repo, "commit", "-q", "-m", f"update {relative_path}")
+
+
+@pytest.fixture
+def remote_repo(tmp_path: Path) -> Path:
+    """Create a local Git repository that acts as the remote."""
+    repo = tmp_path / "remote"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "test@example.com")
+    _git(repo, "config", "user.name", "Test")
+    _git(repo, "config", "uploadpack.allowFilter", "true")
+    _commit_file(repo, f"{PROTO_DIR}/spec.proto", "message Spec {}\n")
+    _commit_file(repo, f"{PROTO_DIR}/api.proto", "message Api {}\n")
+    _commit_file(repo, "unrelated/big.txt", "x" * 1024)
+    return repo
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the shared repository cache at a temporary directory."""
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(fetcher, "CACHE_DIR", cache)
+    return cache
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    """Serve `git archive` tarballs of the remote repository with ETag support."""
+
+    remote_repo: Path
+    requests: list[str]
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        """Serve the branch tarball, or 304 if the client's ETag matches."""
+        self.requests.append(self.path)
+        branch = self.path.rsplit("/", 1)[-1].removesuffix(".tar.gz")
+        result = subprocess.run(
+            ["git", "-C", str(self.remote_repo), "archive", "--format=tar.gz",
+             f"--prefix=remote-{branch}/", branch],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            self.send_error(404)
+            return
+        archive = result.stdout
+        etag = f'"{hashlib.sha256(_git(self.remote_repo, "rev-parse", branch).encode()).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/gzip")
+        self.send_header("Content-Length", str(len(archive)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(archive)
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+
+
+@pytest.fixture
+def archive_server(remote_repo: Path) -> Iterator[tuple[str, list[str]]]:
+    """Serve archives of the remote repository over a local HTTP server.
+
+    Yields the archive URL template and the list of request paths received.
+    """
+    requests: list[str] = []
+    handler = type(
+        "Handler", (_ArchiveHandler,), {"remote_repo": remote_repo, "requests": requests}
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/archive/{{branch}}.tar.gz", requests
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests on asyncio only; the async fetcher uses asyncio subprocesses."""
+    return "asyncio"
+
+
+def _config(remote_repo: Path, **overrides) -> RepositoryConfig:
+    """Build a repository config pointing at the local remote."""
+    values = {
+        "name": "test-repo",
+        "url": remote_repo.as_uri(),
+        "repo_path": PROTO_DIR,
+        "files": ["api.proto", "spec.proto"],
+    }
+    values.update(overrides)
+    return RepositoryConfig(**values)
+
+
+class TestFetchRepository:
+    """Test cloning and updating repositories in the shared cache."""
+
+    @pytest.mark.parametrize("fetch_mode", ["shallow", "sparse"])
+    def test_clone_returns_requested_files(self, remote_repo, cache_dir, fetch_mode):
+        """Test that both fetch modes return paths to the requested files."""
+        paths = fetch_repository(_config(remote_repo, fetch_mode=fetch_mode))
+
+        assert [p.name for p in paths] == ["api.proto", "spec.proto"]
+        assert paths[1].read_text() == "message Spec {}\n"
+
+    def test_sparse_clone_only_checks_out_repo_path(self, remote_repo, cache_dir):
+        """Test that sparse mode leaves unrelated directories out of the working tree."""
+        fetch_repository(_config(remote_repo, fetch_mode="sparse"))
+
+        repo_dir = cache_dir / "test-repo"
+        assert (repo_dir / PROTO_DIR / "spec.proto").exists()
+        assert not (repo_dir / "unrelated").exists()
+
+    def test_sparse_clone_includes_extra_paths(self, remote_repo, cache_dir):
+        """Test that sparse_paths are added to the sparse checkout."""
+        fetch_repository(
+            _config(remote_repo, fetch_mode="sparse", sparse_paths=("unrelated",))
+        )
+
+        assert (cache_dir / "test-repo" / "unrelated" / "big.txt").exists()
+
+    def test_pull_picks_up_new_commits(self, remote_repo, cache_dir):
+        """Test that an existing cache is updated from the remote."""
+        config = _config(remote_repo, fetch_mode="sparse", refresh_ttl_seconds=0)
+        fetch_repository(config)
+        _commit_file(remote_repo, f"{PROTO_DIR}/spec.proto", "message SpecV2 {}\n")
+
+        paths = fetch_repository(config)
+
+        assert paths[1].read_text() == "message SpecV2 {}\n"
+
+    def test_missing_files_raise(self, remote_repo, cache_dir):
+        """Test that missing files are reported as RepositoryFetchError."""
+        config = _config(remote_repo, files=["spec.proto", "missing.proto"])
+
+        with pytest.raises(RepositoryFetchError, match="missing.proto"):
+            fetch_repository(config)
+
+    def test_unreachable_remote_raises(self, tmp_path, cache_dir):
+        """Test that git failures are wrapped in RepositoryFetchError."""
+        config = _config(tmp_path / "does-not-exist")
+
+        with pytest.raises(RepositoryFetchError, match="Failed to fetch repository"):
+            fetch_repository(config)
+
+    def test_hanging_git_command_times_out(self, monkeypatch):
+        """Test that a Git command running too long is killed and cleaned up."""
+        monkeypatch.setattr(fetcher, "GIT_COMMAND_TIMEOUT_SECONDS", 0.1)
+        closed: list[bool] = []
+
+        def steps():
+            try:
+                yield ["sleep", "10"]
+            finally:
+                closed.append(True)
+
+        start = time.monotonic()
+        with pytest.raises(RepositoryFetchError, match="timed out"):
+            fetcher._run_git_steps(steps(), "hanging")
+
+        assert time.monotonic() - start < 5
+        assert closed == [True]
+
+
+class TestFreshnessCheck:
+    """Test that unchanged caches are reused without pulling."""
+
+    def test_cache_within_ttl_skips_network(self, remote_repo, cache_dir, monkeypatch):
+        """Test that no git command touches the remote inside the TTL window."""
+        config = _config(remote_repo, refresh_ttl_seconds=3600)
+        fetch_repository(config)
+        _commit_file(remote_repo, f"{PROTO_DIR}/spec.proto", "message SpecV2 {}\n")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("remote must not be contacted within the TTL")
+
+        monkeypatch.setattr(fetcher, "_git_remote_head", fail)
+        monkeypatch.setattr(fetcher, "_git_pull", fail)
+        paths = fetch_repository(config)
+
+        assert paths[1].read_text() == "message Spec {}\n"
+
+    def test_current_cache_skips_pull(self, remote_repo, cache_dir, monkeypatch):
+        """Test that a matching remote head avoids git pull after the TTL."""
+        config = _config(remote_repo, refresh_ttl_seconds=0)
+        fetch_repository(config)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("git pull must be skipped when the cache is current")
+
+        monkeypatch.setattr(fetcher, "_git_pull", fail)
+        fetch_repository(config)
+
+    def test_fetch_state_records_commit(self, remote_repo, cache_dir):
+        """Test that the fetched commit SHA is recorded next to the cache."""
+        fetch_repository(_config(remote_repo))
+
+        state = fetcher._read_fetch_state(_config(remote_repo))
+
+        assert state is not None
+        assert state["commit"] == _git(remote_repo, "rev-parse", "HEAD")
+
+
+class TestRepositorySnapshots:
+    """Test the content-addressed snapshot layer."""
+
+    def test_snapshot_contains_requested_files(self, remote_repo, cache_dir):
+        """Test that a snapshot maps repository paths to file bytes at a commit."""
+        snapshot = fetch_repository_snapshot(_config(remote_repo))
+
+        assert snapshot.commit == _git(remote_repo, "rev-parse", "HEAD")
+        assert snapshot.read_text(f"{PROTO_DIR}/spec.proto") == "message Spec {}\n"
+        assert set(snapshot.files) == {f"{PROTO_DIR}/api.proto", f"{PROTO_DIR}/spec.proto"}
+
+    def test_fresh_cache_loads_from_snapshot(self, remote_repo, cache_dir, monkeypatch):
+        """Test that a fresh cache is served without Git or the working tree."""
+        config = _config(remote_repo, refresh_ttl_seconds=3600)
+        fetch_repository_snapshot(config)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Git must not run for a fresh cache")
+
+        monkeypatch.setattr(fetcher, "_fetch_steps", fail)
+        snapshot = fetch_repository_snapshot(config)
+
+        assert snapshot.read_text(f"{PROTO_DIR}/api.proto") == "message Api {}\n"
+
+    def test_fetch_failure_falls_back_to_last_good_snapshot(self, remote_repo, cache_dir, monkeypatch):
+        """Test that the last good snapshot is served when fetching fails."""
+        config = _config(remote_repo, refresh_ttl_seconds=0)
+        good = fetch_repository_snapshot(config)
+
+        def unreachable(config):
+            raise RepositoryFetchError("network unreachable")
+
+        monkeypatch.setattr(fetcher, "_fetch_steps", unreachable)
+        snapshot = fetch_repository_snapshot(config)
+
+        assert snapshot == good
+
+    def test_fetch_failure_without_snapshot_raises(self, tmp_path, cache_dir):
+        """Test that the error propagates when there is nothing to fall back to."""
+        with pytest.raises(RepositoryFetchError):
+            fetch_repository_snapshot(_config(tmp_path / "does-not-exist"))
+
+    def test_corrupted_blob_is_rejected(self, remote_repo, cache_dir):
+        """Test that blobs failing their hash check are not served."""
+        config = _config(remote_repo)
+        snapshot = fetch_repository_snapshot(config)
+        store = SnapshotStore(cache_dir / ".snapshots")
+        for blob in (cache_dir / ".snapshots" / config.name / "blobs").iterdir():
+            blob.write_bytes(b"tampered")
+
+        assert store.load(config, snapshot.commit) is None
+
+
+class TestRepositoryBundle:
+    """Test serving repositories from a pre-fetched bundle."""
+
+    def test_bundle_round_trip(self, remote_repo, cache_dir, tmp_path):
+        """Test that a written bundle loads back as the same snapshot."""
+        config = _config(remote_repo)
+        snapshot = fetch_repository_snapshot(config)
+        bundle = write_bundle([snapshot], tmp_path / "bundle.tar.gz")
+
+        assert load_bundled_snapshot(config, bundle) == snapshot
+
+    def test_bundle_is_reproducible(self, remote_repo, cache_dir, tmp_path):
+        """Test that bundling the same snapshot twice gives identical bytes."""
+        snapshot = fetch_repository_snapshot(_config(remote_repo))
+
+        first = write_bundle([snapshot], tmp_path / "first.tar.gz")
+        time.sleep(1.1)  # gzip and tar timestamps have one-second resolution
+        second = write_bundle([snapshot], tmp_path / "second.tar.gz")
+
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_bundle_is_used_before_network(self, remote_repo, cache_dir, tmp_path, monkeypatch):
+        """Test that a configured bundle is served without fetching."""
+        config = _config(remote_repo)
+        bundle = write_bundle([fetch_repository_snapshot(config)], tmp_path / "bundle.tar.gz")
+        monkeypatch.setattr(fetcher, "REPO_BUNDLE_PATH", bundle)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Git must not run when a bundle is present")
+
+        monkeypatch.setattr(fetcher, "_fetch_steps", fail)
+        snapshot = fetch_repository_snapshot(config)
+
+        assert snapshot.read_text(f"{PROTO_DIR}/spec.proto") == "message Spec {}\n"
+
+    def test_build_does_not_bundle_fallback_snapshots(self, remote_repo, cache_dir, tmp_path, monkeypatch):
+        """Test that a failed fetch fails the build instead of bundling the last good snapshot."""
+        config = _config(remote_repo, refresh_ttl_seconds=0)
+        fetch_repository_snapshot(config)
+
+        def unreachable(config):
+            raise RepositoryFetchError("network unreachable")
+
+        monkeypatch.setattr(fetcher, "_fetch_steps", unreachable)
+        output = tmp_path / "bundle.tar.gz"
+
+        with pytest.raises(RepositoryFetchError, match="network unreachable"):
+            build_bundle([config], output)
+        assert not output.exists()
+
+    def test_bundle_without_requested_files_is_ignored(self, remote_repo, cache_dir, tmp_path):
+        """Test that bundles missing a requested file are not served."""
+        snapshot = fetch_repository_snapshot(_config(remote_repo))
+        bundle = write_bundle([snapshot], tmp_path / "bundle.tar.gz")
+
+        config = _config(remote_repo, files=["spec.proto", "stack_outputs.proto"])
+
+        assert load_bundled_snapshot(config, bundle) is None
+
+
+class TestSingleFlightLocking:
+    """Test cross-process coordination of cache updates."""
+
+    def test_concurrent_fetches_clone_once(self, remote_repo, cache_dir, monkeypatch):
+        """Test that concurrent fetches of a cold cache run a single clone."""
+        config = _config(remote_repo, refresh_ttl_seconds=3600)
+        clone_calls = []
+        original_clone = fetcher._git_clone
+
+        def counting_clone(config, target_dir):
+            clone_calls.append(target_dir)
+            yield from original_clone(config, target_dir)
+
+        monkeypatch.setattr(fetcher, "_git_clone", counting_clone)
+        results: list[list[Path]] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(fetch_repository(config)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(clone_calls) == 1
+        assert len(results) == 4
+        assert all(paths[1].read_text() == "message Spec {}\n" for paths in results)
+
+    def test_lock_timeout_raises_fetch_error(self, remote_repo, cache_dir, monkeypatch):
+        """Test that waiting too long for another updater is reported."""
+        monkeypatch.setattr(locking, "DEFAULT_LOCK_TIMEOUT_SECONDS", 0.2)
+        config = _config(remote_repo)
+
+        with locking.repository_lock(cache_dir, config.name):
+            with pytest.raises(RepositoryFetchError, match="another process"):
+                fetch_repository(config)
+
+    def test_incomplete_cache_is_recloned(self, remote_repo, cache_dir):
+        """Test that a cache directory without .git is replaced by a fresh clone."""
+        (cache_dir / "test-repo").mkdir(parents=True)
+
+        paths = fetch_repository(_config(remote_repo))
+
+        assert paths[1].read_text() == "message Spec {}\n"
+        assert not list(cache_dir.glob(".test-repo.*.tmp"))
+
+
+class TestAsyncFetch:
+    """Test the asyncio fetch API."""
+
+    @pytest.mark.anyio
+    async def test_fetches_many_repositories(self, remote_repo, cache_dir):
+        """Test that several configs are fetched and keyed by repository name."""
+        configs = [
+            _config(remote_repo, name="repo-a"),
+            _config(remote_repo, name="repo-b", fetch_mode="sparse"),
+        ]
+
+        results = await afetch_repositories(configs, max_concurrency=2)
+
+        assert set(results) == {"repo-a", "repo-b"}
+        assert results["repo-b"][1].read_text() == "message Spec {}\n"
+
+    @pytest.mark.anyio
+    async def test_concurrency_is_bounded(self, remote_repo, cache_dir, monkeypatch):
+        """Test that no more than max_concurrency fetches run at once."""
+        running = 0
+        peak = 0
+        original_fetch = fetcher.afetch_repository
+
+        async def tracking_fetch(config, timeout=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                return await original_fetch(config, timeout=timeout)
+            finally:
+                running -= 1
+
+        monkeypatch.setattr(fetcher, "afetch_repository", tracking_fetch)
+        configs = [_config(remote_repo, name=f"repo-{i}") for i in range(4)]
+
+        results = await afetch_repositories(configs, max_concurrency=2)
+
+        assert len(results) == 4
+        assert peak == 2
+
+    @pytest.mark.anyio
+    async def test_failures_are_aggregated(self, remote_repo, tmp_path, cache_dir):
+        """Test that one failing repository does not hide the others' errors."""
+        configs = [
+            _config(remote_repo, name="good"),
+            _config(tmp_path / "does-not-exist", name="bad"),
+        ]
+
+        with pytest.raises(RepositoryFetchError, match="1 of 2 repositories") as exc_info:
+            await afetch_repositories(configs)
+
+        assert "bad:" in str(exc_info.value)
+        assert (cache_dir / "good" / ".git").exists()
+
+    @pytest.mark.anyio
+    async def test_timeout_raises_and_cleans_up(self, remote_repo, cache_dir, monkeypatch):
+        """Test that a timed-out clone is reported and leaves no temporary clone."""
+
+        def hanging_clone(config, target_dir):
+            target_dir.mkdir(parents=True)
+            yield ["sleep", "5"]
+
+        monkeypatch.setattr(fetcher, "_git_clone", hanging_clone)
+
+        with pytest.raises(RepositoryFetchError, match="timed out"):
+            await afetch_repository(_config(remote_repo), timeout=0.2)
+
+        assert not list(cache_dir.glob(".test-repo.*.tmp"))
+        assert not (cache_dir / "test-repo").exists()
+
+    @pytest.mark.anyio
+    async def test_snapshots_fall_back_on_timeout(self, remote_repo, cache_dir, monkeypatch):
+        """Test that a timed-out snapshot fetch serves the last good snapshot."""
+        config = _config(remote_repo, refresh_ttl_seconds=0)
+        good = fetch_repository_snapshot(config)
+
+        def hanging_remote_head(config):
+            yield ["sleep", "5"]
+            return None
+
+        monkeypatch.setattr(fetcher, "_git_remote_head", hanging_remote_head)
+
+        results = await afetch_repository_snapshots([config], timeout=0.2)
+
+        assert results == {config.name: good}
+
+
+class TestArchiveFetch:
+    """Test the HTTP archive fetch mode."""
+
+    def test_extracts_only_repo_path(self, remote_repo, cache_dir, archive_server):
+        """Test that only files under repo_path are written to the cache."""
+        url, _ = archive_server
+        config = _config(remote_repo, fetch_mode="archive", archive_url=url)
+
+        paths = fetch_repository(config)
+
+        assert paths[1].read_text() == "message Spec {}\n"
+        assert not (cache_dir / "test-repo" / "unrelated").exists()
+        assert not (cache_dir / "test-repo" / ".git").exists()
+
+    def test_records_archive_commit(self, remote_repo, cache_dir, archive_server):
+        """Test that the commit SHA from the archive header is used for snapshots."""
+        url, _ = archive_server
+        config = _config(remote_repo, fetch_mode="archive", archive_url=url)
+
+        snapshot = fetch_repository_snapshot(config)
+
+        assert snapshot.commit == _git(remote_repo, "rev-parse", "HEAD")
+
+    def test_unchanged_archive_is_not_downloaded_again(self, remote_repo, cache_dir, archive_server):
+        """Test that refreshes use the ETag and keep the cache on 304."""
+        url, requests = archive_server
+        config = _config(
+            remote_repo, fetch_mode="archive", archive_url=url, refresh_ttl_seconds=0
+        )
+        fetch_repository(config)
+
+        paths = fetch_repository(config)
+
+        assert len(requests) == 2
+        assert paths[1].read_text() == "message Spec {}\n"
+        assert fetcher._read_fetch_state(config)["etag"]
+
+    def test_new_commits_replace_extracted_files(self, remote_repo, cache_dir, archive_server):
+        """Test that a changed branch is downloaded and extracted again."""
+        url, _ = archive_server
+        config = _config(
+            remote_repo, fetch_mode="archive", archive_url=url, refresh_ttl_seconds=0
+        )
+        fetch_repository(config)
+        _commit_file(remote_repo, f"{PROTO_DIR}/spec.proto", "message SpecV2 {}\n")
+
+        paths = fetch_repository(config)
+
+        assert paths[1].read_text() == "message SpecV2 {}\n"
+        assert not list(cache_dir.glob(".test-repo.*"))
+
+    def test_download_failure_raises(self, remote_repo, cache_dir, archive_server):
+        """Test that HTTP errors are wrapped in RepositoryFetchError."""
+        url, _ = archive_server
+        config = _config(
+            remote_repo, fetch_mode="archive", archive_url=url, branch="missing"
+        )
+
+        with pytest.raises(RepositoryFetchError, match="Failed to download archive"):
+            fetch_repository(config)
+
+    @pytest.mark.anyio
+    async def test_timed_out_fetch_keeps_lock_until_download_finishes(
+        self, remote_repo, cache_dir, archive_server, monkeypatch
+    ):
+        """Test that the worker thread, not the timed-out caller, releases the lock."""
+        url, _ = archive_server
+        config = _config(remote_repo, fetch_mode="archive", archive_url=url)
+        release = threading.Event()
+        original_run_git_steps = fetcher._run_git_steps
+
+        def slow_run_git_steps(steps, repository):
+            release.wait(5)
+            return original_run_git_steps(steps, repository)
+
+        monkeypatch.setattr(fetcher, "_run_git_steps", slow_run_git_steps)
+
+        with pytest.raises(RepositoryFetchError, match="timed out"):
+            await afetch_repository(config, timeout=0.2)
+
+        with pytest.raises(locking.RepositoryLockTimeout):
+            with locking.repository_lock(cache_dir, config.name, timeout=0.2):
+                pass
+
+        release.set()
+        with locking.repository_lock(cache_dir, config.name, timeout=5):
+            assert (cache_dir / config.name / PROTO_DIR / "spec.proto").exists()
+
+    def test_github_archive_url(self):
+        """Test that the archive URL is derived from a GitHub clone URL."""
+        config = RepositoryConfig(
+            name="project-planton",
+            url="https://github.com/project-planton/project-planton.git",
+            repo_path="apis",
+            files=[],
+            fetch_mode="archive",
+        )
+
+        assert archive.archive_url(config) == (
+            "https://github.com/project-planton/project-planton/archive/refs/heads/main.tar.gz"
+        )
+
+
+class TestFilePatterns:
+    """Test glob patterns in RepositoryConfig.files."""
+
+    @pytest.fixture
+    def provider_repo(self, remote_repo: Path) -> Path:
+        """Add a second resource kind next to the RDS protos."""
+        _commit_file(remote_repo, "apis/provider/aws/awsvpc/v1/spec.proto", "message Vpc {}\n")
+        _commit_file(remote_repo, "apis/provider/aws/awsvpc/v1/README.md", "docs\n")
+        return remote_repo
+
+    @pytest.mark.parametrize("fetch_mode", ["shallow", "sparse"])
+    def test_pattern_spans_directories(self, provider_repo, cache_dir, fetch_mode):
+        """Test that one pattern selects matching files in every directory."""
+        config = _config(
+            provider_repo,
+            repo_path="apis/provider/aws",
+            files=["*/v1/*.proto"],
+            fetch_mode=fetch_mode,
+        )
+
+        snapshot = fetch_repository_snapshot(config)
+
+        assert sorted(snapshot.files) == [
+            f"{PROTO_DIR}/api.proto",
+            f"{PROTO_DIR}/spec.proto",
+            "apis/provider/aws/awsvpc/v1/spec.proto",
+        ]
+        assert snapshot.read_text("apis/provider/aws/awsvpc/v1/spec.proto") == "message Vpc {}\n"
+
+    def test_fresh_pattern_snapshot_is_reused(self, provider_repo, cache_dir, monkeypatch):
+        """Test that pattern configs are served from the snapshot store within the TTL."""
+        config = _config(
+            provider_repo,
+            repo_path="apis/provider/aws",
+            files=["**/*.proto"],
+            refresh_ttl_seconds=3600,
+        )
+        first = fetch_repository_snapshot(config)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Git must not run for a fresh cache")
+
+        monkeypatch.setattr(fetcher, "_fetch_steps", fail)
+
+        assert fetch_repository_snapshot(config) == first
+
+    def test_unmatched_pattern_raises(self, remote_repo, cache_dir):
+        """Test that a pattern without matches is reported as missing."""
+        config = _config(remote_repo, files=["*.yaml"])
+
+        with pytest.raises(RepositoryFetchError, match=r"\*\.yaml"):
+            fetch_repository(config)
+
+    def test_select_paths_semantics(self, remote_repo):
+        """Test that '*' stays within a segment and '**' spans directories."""
+        config = _config(remote_repo, repo_path="root", files=["a.txt", "*.proto", "**/x/*.md"])
+        available = ["root/a.txt", "root/b.proto", "root/sub/c.proto", "root/x/d.md", "root/y/x/e.md"]
+
+        selected, missing = config.select_paths(available)
+
+        assert selected == ["root/a.txt", "root/b.proto", "root/x/d.md", "root/y/x/e.md"]
+        assert missing == []
+
+
+class TestFetchMetrics:
+    """Test metrics recorded by the fetcher."""
+
+    @pytest.fixture
+    def metrics(self) -> Iterator[MetricsRegistry]:
+        """Reset the shared metrics registry around each test."""
+        registry = get_metrics_registry()
+        registry.reset()
+        yield registry
+        registry.reset()
+
+    def test_clone_then_cache_hit(self, remote_repo, cache_dir, metrics):
+        """Test that clones and TTL cache hits are counted separately."""
+        config = _config(remote_repo, refresh_ttl_seconds=3600)
+        fetch_repository(config)
+        fetch_repository(config)
+
+        assert metrics.counter(fetcher.METRIC_FETCHES, repository="test-repo", outcome="clone") == 1
+        assert metrics.counter(fetcher.METRIC_FETCHES, repository="test-repo", outcome="cache_hit") == 1
+
+    def test_pull_and_unchanged_remote(self, remote_repo, cache_dir, metrics):
+        """Test that pulls and skipped pulls are told apart."""
+        config = _config(remote_repo, refresh_ttl_seconds=0)
+        fetch_repository(config)
+        fetch_repository(config)
+        _commit_file(remote_repo, f"{PROTO_DIR}/spec.proto", "message SpecV2 {}\n")
+        fetch_repository(config)
+
+        assert metrics.counter(fetcher.METRIC_FETCHES, repository="test-repo", outcome="remote_unchanged") == 1
+        assert metrics.counter(fetcher.METRIC_FETCHES, repository="test-repo", outcome="pull") == 1
+
+    def test_git_phases_are_timed(self, remote_repo, cache_dir, metrics):
+        """Test that every Git command is timed under its subcommand."""
+        fetch_repository(_config(remote_repo, fetch_mode="sparse"))
+
+        for phase in ("clone", "sparse-checkout", "rev-parse"):
+            summary = metrics.summary(fetcher.METRIC_GIT_SECONDS, repository="test-repo", phase=phase)
+            assert summary is not None and summary.count == 1
+
+    def test_snapshot_bytes_per_file(self, remote_repo, cache_dir, metrics):
+        """Test that served snapshots record their source and bytes per file."""
+        config = _config(remote_repo, refresh_ttl_seconds=3600)
+        fetch_repository_snapshot(config)
+        fetch_repository_snapshot(config)
+
+        assert metrics.counter(fetcher.METRIC_SNAPSHOTS, repository="test-repo", source="fetched") == 1
+        assert metrics.counter(fetcher.METRIC_SNAPSHOTS, repository="test-repo", source="snapshot") == 1
+        summary = metrics.summary(
+            fetcher.METRIC_FILE_BYTES,
+            repository="test-repo",
+            path=f"{PROTO_DIR}/spec.proto",
+            source="snapshot",
+        )
+        assert summary is not None and summary.total == len("message Spec {}\n")
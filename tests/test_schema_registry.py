@@ -0,0 +1,193 @@
+"""Tests for serving the schemas of many cloud resource kinds."""
+
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from src.agents.rds_manifest_generator.schema import cache, loader, registry
+from src.agents.rds_manifest_generator.schema.cache import SchemaCache
+from src.agents.rds_manifest_generator.schema.loader import (
+    current_schema_version,
+    get_schema_loader,
+    pin_schema_version,
+    publish_schema,
+)
+from src.agents.rds_manifest_generator.schema.registry import (
+    SchemaRegistry,
+    kind_repository_config,
+)
+from src.common.repos import RepositoryFetchError, RepositorySnapshot
+
+RDS_SPEC = """
+message AwsRdsInstanceSpec {
+  string engine = 1;
+}
+"""
+
+
+def _spec(kind: str, *fields: str) -> str:
+    """Return a spec.proto declaring the spec message of a kind."""
+    lines = [f"  string {name} = {number};" for number, name in enumerate(fields, start=1)]
+    return "\n".join([f"message {kind}Spec {{", *lines, "}"])
+
+
+class FakeFetcher:
+    """Stand-in for fetch_repository_snapshot serving one spec.proto per kind."""
+
+    def __init__(self, specs: dict[str, str]):
+        """Serve the given spec.proto contents, keyed by repository name."""
+        self.specs = specs
+        self.fetches: list[str] = []
+        self.delay = 0.0
+
+    def __call__(self, config):
+        """Return a snapshot of the kind's spec.proto."""
+        self.fetches.append(config.name)
+        time.sleep(self.delay)
+        if config.name not in self.specs:
+            raise RepositoryFetchError(f"no such repository: {config.name}")
+        path = f"{config.repo_path}/spec.proto"
+        return RepositorySnapshot(
+            repository=config.name,
+            commit="abc123",
+            files={path: self.specs[config.name].encode("utf-8")},
+        )
+
+
+@pytest.fixture(autouse=True)
+def isolated_schemas(monkeypatch: pytest.MonkeyPatch, tmp_path) -> SchemaCache:
+    """Give every test an empty set of published schema versions and schema cache."""
+    schema_cache = SchemaCache(tmp_path / "schemas")
+    monkeypatch.setattr(loader, "_schema_versions", OrderedDict())
+    monkeypatch.setattr(loader, "_loader", None)
+    monkeypatch.setattr(cache, "_schema_cache", schema_cache)
+    return schema_cache
+
+
+@pytest.fixture
+def fetcher(monkeypatch: pytest.MonkeyPatch) -> FakeFetcher:
+    """Serve the GcpCloudSql and AwsVpc protos, through a fresh global registry."""
+    fake = FakeFetcher({
+        "project-planton-gcpcloudsql": _spec("GcpCloudSql", "tier", "region"),
+        "project-planton-awsvpc": _spec("AwsVpc", "cidr_block"),
+    })
+    monkeypatch.setattr(registry, "fetch_repository_snapshot", fake)
+    monkeypatch.setattr(registry, "_registry", None)
+    return fake
+
+
+def _field_names(schema_loader) -> list[str]:
+    """Return the spec field names of a loader."""
+    return [field.name for field in schema_loader.load_spec_schema()]
+
+
+class TestKindRepositoryConfig:
+    """Test deriving the repository config of a kind."""
+
+    def test_kind_protos_sit_next_to_the_rds_protos(self):
+        """Test that a kind's protos are fetched from its provider directory."""
+        config = kind_repository_config("GcpCloudSql")
+
+        assert config.name == "project-planton-gcpcloudsql"
+        assert config.repo_path == "apis/org/project_planton/provider/gcp/gcpcloudsql/v1"
+        assert config.url == registry.REPO_CONFIG.url
+        assert config.fetch_mode == registry.REPO_CONFIG.fetch_mode
+
+    @pytest.mark.parametrize("kind", ["", "gcpCloudSql", "Gcp", "Gcp/CloudSql"])
+    def test_invalid_kinds_are_rejected(self, kind):
+        """Test that names that are not CamelCase kinds do not build paths."""
+        with pytest.raises(ValueError, match="Invalid cloud resource kind"):
+            kind_repository_config(kind)
+
+
+class TestSchemaRegistry:
+    """Test fetching and keeping the schemas of other kinds."""
+
+    def test_kinds_are_fetched_on_first_use(self, fetcher):
+        """Test that get_schema_loader fetches and publishes a kind once."""
+        assert fetcher.fetches == []
+
+        assert _field_names(get_schema_loader(kind="GcpCloudSql")) == ["tier", "region"]
+        assert _field_names(get_schema_loader(kind="GcpCloudSql")) == ["tier", "region"]
+
+        assert fetcher.fetches == ["project-planton-gcpcloudsql"]
+        assert current_schema_version("GcpCloudSql").source == "abc123"
+
+    def test_kinds_do_not_replace_the_rds_schema(self, fetcher):
+        """Test that publishing another kind leaves the current AwsRdsInstance version alone."""
+        rds = publish_schema({"spec.proto": RDS_SPEC})
+
+        get_schema_loader(kind="AwsVpc")
+
+        assert current_schema_version() is rds
+        assert get_schema_loader() is rds.loader
+        assert fetcher.fetches == ["project-planton-awsvpc"]
+
+    def test_kind_schemas_use_the_schema_cache(self, fetcher, isolated_schemas):
+        """Test that a kind's parsed fields are cached under a version of their own."""
+        schema = SchemaRegistry().get("AwsVpc")
+
+        assert [field.name for field in isolated_schemas.load(schema.version)] == ["cidr_block"]
+
+    def test_registered_config_is_used(self, fetcher):
+        """Test that a registered config overrides the derived one."""
+        schemas = SchemaRegistry()
+        schemas.register("AwsNetwork", kind_repository_config("AwsVpc"))
+        fetcher.specs["project-planton-awsvpc"] = _spec("AwsNetwork", "cidr_block")
+
+        assert _field_names(schemas.get_loader("AwsNetwork")) == ["cidr_block"]
+        assert fetcher.fetches == ["project-planton-awsvpc"]
+
+    def test_least_recently_used_kind_is_evicted(self, fetcher):
+        """Test that kinds beyond max_kinds are discarded and fetched again on use."""
+        schemas = SchemaRegistry(max_kinds=1)
+
+        schemas.get("GcpCloudSql")
+        schemas.get("AwsVpc")
+
+        assert current_schema_version("GcpCloudSql") is None
+        assert current_schema_version("AwsVpc") is not None
+        schemas.get("GcpCloudSql")
+        assert fetcher.fetches == [
+            "project-planton-gcpcloudsql",
+            "project-planton-awsvpc",
+            "project-planton-gcpcloudsql",
+        ]
+
+    def test_pinned_version_survives_eviction(self, fetcher, monkeypatch):
+        """Test that requests keep the kind version they pinned."""
+        schemas = SchemaRegistry(max_kinds=1)
+        monkeypatch.setattr(registry, "_registry", schemas)
+        schema = schemas.get("GcpCloudSql")
+
+        with pin_schema_version(schema):
+            schemas.get("AwsVpc")
+            assert get_schema_loader(kind="GcpCloudSql") is schema.loader
+        assert fetcher.fetches == ["project-planton-gcpcloudsql", "project-planton-awsvpc"]
+
+    def test_concurrent_first_requests_fetch_once(self, fetcher):
+        """Test that threads asking for the same new kind share one fetch."""
+        fetcher.delay = 0.05
+        schemas = SchemaRegistry()
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(schemas.get("AwsVpc")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert fetcher.fetches == ["project-planton-awsvpc"]
+        assert len({id(schema) for schema in results}) == 1
+
+    def test_fetch_errors_propagate(self, fetcher):
+        """Test that an unknown kind fails without publishing anything."""
+        with pytest.raises(RepositoryFetchError):
+            get_schema_loader(kind="AwsNoSuchThing")
+
+        assert current_schema_version("AwsNoSuchThing") is None
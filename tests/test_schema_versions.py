@@ -0,0 +1,268 @@
+"""Tests for versioned proto schemas and their background refresh."""
+
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from src.agents.rds_manifest_generator.schema import cache, loader
+from src.agents.rds_manifest_generator.schema.cache import (
+    SCHEMA_CACHE_FORMAT,
+    SchemaCache,
+)
+from src.agents.rds_manifest_generator.schema.loader import (
+    active_schema_version,
+    current_schema_version,
+    get_schema_loader,
+    get_schema_version,
+    pin_schema_version,
+    publish_schema,
+    schema_version_digest,
+)
+from src.agents.rds_manifest_generator.schema.refresher import ProtoSchemaRefresher
+
+SPEC_V1 = """
+message AwsRdsInstanceSpec {
+  // Database engine
+  string engine = 1 [(buf.validate.field).string.min_len = 1];
+}
+"""
+
+SPEC_V2 = """
+message AwsRdsInstanceSpec {
+  // Database engine
+  string engine = 1 [(buf.validate.field).string.min_len = 1];
+  // Storage in GB
+  int32 allocated_storage_gb = 2 [(buf.validate.field).int32.gt = 0];
+}
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_schema_versions(monkeypatch: pytest.MonkeyPatch, tmp_path) -> SchemaCache:
+    """Give every test an empty set of published schema versions and schema cache."""
+    schema_cache = SchemaCache(tmp_path / "schemas")
+    monkeypatch.setattr(loader, "_schema_versions", OrderedDict())
+    monkeypatch.setattr(loader, "_loader", None)
+    monkeypatch.setattr(cache, "_schema_cache", schema_cache)
+    return schema_cache
+
+
+def _field_names() -> list[str]:
+    """Return the spec field names seen through the global schema loader."""
+    return [field.name for field in get_schema_loader().load_spec_schema()]
+
+
+def _field_names_of(schema) -> list[str]:
+    """Return the spec field names of a schema version."""
+    return [field.name for field in schema.loader.load_spec_schema()]
+
+
+class TestPublishSchema:
+    """Test publishing and pinning schema versions."""
+
+    def test_publish_makes_schema_current(self):
+        """Test that the published version backs the global loader."""
+        schema = publish_schema({"spec.proto": SPEC_V1}, source="abc123")
+
+        assert current_schema_version() is schema
+        assert schema.source == "abc123"
+        assert _field_names() == ["engine"]
+
+    def test_identical_contents_keep_version(self):
+        """Test that republishing unchanged files does not create a new version."""
+        first = publish_schema({"spec.proto": SPEC_V1})
+
+        assert publish_schema({"spec.proto": SPEC_V1}) is first
+
+    def test_pinned_version_survives_swap(self):
+        """Test that pinned work keeps its version while a new one is published."""
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+
+        with pin_schema_version(v1):
+            publish_schema({"spec.proto": SPEC_V2})
+            assert _field_names() == ["engine"]
+
+        assert _field_names() == ["engine", "allocated_storage_gb"]
+        assert get_schema_version(v1.version) is v1
+
+    def test_active_version_follows_pin(self):
+        """Test that the active version is the pinned one, else the current one."""
+        assert active_schema_version() is None
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+        v2 = publish_schema({"spec.proto": SPEC_V2})
+
+        with pin_schema_version(v1):
+            assert active_schema_version() is v1
+        assert active_schema_version() is v2
+
+    def test_pin_is_per_thread(self):
+        """Test that a pin in one thread does not leak into another."""
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+        publish_schema({"spec.proto": SPEC_V2})
+        seen: list[list[str]] = []
+
+        with pin_schema_version(v1):
+            thread = threading.Thread(target=lambda: seen.append(_field_names()))
+            thread.start()
+            thread.join()
+
+        assert seen == [["engine", "allocated_storage_gb"]]
+
+    def test_given_loader_is_published_with_the_files(self, isolated_schema_versions):
+        """Test that a given loader backs the version and the files are kept as they are."""
+        stubs = loader.ProtoSchemaLoader(read_file_func=lambda path: SPEC_V2)
+
+        schema = publish_schema({"spec.proto": SPEC_V1}, loader=stubs)
+
+        assert schema.loader is stubs
+        assert schema.proto_contents == {"spec.proto": SPEC_V1}
+        assert schema.version == schema_version_digest({"spec.proto": SPEC_V1})
+        assert _field_names() == ["engine", "allocated_storage_gb"]
+        assert isolated_schema_versions.load(schema.version) is None
+
+    def test_read_file_func_does_not_replace_global_loader(self):
+        """Test that passing a reader returns a new loader and keeps the global one."""
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+
+        scoped = get_schema_loader(lambda path: SPEC_V2)
+
+        assert scoped is not v1.loader
+        assert [f.name for f in scoped.load_spec_schema()] == ["engine", "allocated_storage_gb"]
+        assert get_schema_loader() is v1.loader
+
+    def test_unparseable_schema_is_not_published(self):
+        """Test that a failing parse leaves the current version in place."""
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+
+        with pytest.raises(FileNotFoundError):
+            publish_schema({"api.proto": "message Api {}"})
+
+        assert current_schema_version() is v1
+
+    def test_old_versions_are_evicted(self, monkeypatch):
+        """Test that only a bounded number of versions is retained."""
+        monkeypatch.setattr(loader, "MAX_RETAINED_SCHEMA_VERSIONS", 2)
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+        publish_schema({"spec.proto": SPEC_V2})
+        publish_schema({"spec.proto": SPEC_V2 + "\n// v3\n"})
+
+        assert get_schema_version(v1.version) is None
+
+
+class TestSchemaCache:
+    """Test the on-disk cache of parsed schemas."""
+
+    def test_published_schema_is_cached(self, isolated_schema_versions):
+        """Test that parsed fields are stored under the content digest."""
+        schema = publish_schema({"spec.proto": SPEC_V2})
+
+        cached = isolated_schema_versions.load(schema.version)
+
+        assert cached == schema.loader.load_spec_schema()
+        assert cached[1].validation_rules == {"greater_than": 0}
+
+    def test_cached_schema_is_not_parsed(self, isolated_schema_versions, monkeypatch):
+        """Test that a restart with identical protos loads the cache instead of parsing."""
+        publish_schema({"spec.proto": SPEC_V2})
+        monkeypatch.setattr(loader, "_schema_versions", OrderedDict())
+        monkeypatch.setattr(
+            loader.ProtoSchemaLoader,
+            "_parse_spec_fields",
+            lambda self: pytest.fail("parsed again"),
+        )
+
+        schema = publish_schema({"spec.proto": SPEC_V2})
+
+        assert [field.name for field in schema.loader.load_spec_schema()] == [
+            "engine",
+            "allocated_storage_gb",
+        ]
+        assert schema.loader.get_field_by_name("engine").required
+
+    def test_changed_protos_miss_the_cache(self, isolated_schema_versions):
+        """Test that entries are keyed by proto contents."""
+        publish_schema({"spec.proto": SPEC_V1})
+
+        assert isolated_schema_versions.load(schema_version_digest({"spec.proto": SPEC_V2})) is None
+
+    def test_invalid_entries_are_ignored(self, isolated_schema_versions):
+        """Test that corrupt or outdated entries are treated as misses."""
+        version = schema_version_digest({"spec.proto": SPEC_V1})
+        root = isolated_schema_versions.root
+        root.mkdir(parents=True)
+
+        (root / f"{version}.json").write_text("{not json")
+        assert isolated_schema_versions.load(version) is None
+
+        (root / f"{version}.json").write_text(
+            f'{{"format": {SCHEMA_CACHE_FORMAT + 1}, "version": "{version}", "fields": []}}'
+        )
+        assert isolated_schema_versions.load(version) is None
+        assert _field_names_of(publish_schema({"spec.proto": SPEC_V1})) == ["engine"]
+
+    def test_old_entries_are_pruned(self, isolated_schema_versions, monkeypatch):
+        """Test that only a bounded number of entries is kept on disk."""
+        monkeypatch.setattr(cache, "MAX_CACHED_SCHEMAS", 2)
+        for i in range(4):
+            isolated_schema_versions.save(f"v{i}", [])
+
+        assert len(list(isolated_schema_versions.root.glob("*.json"))) == 2
+
+
+class TestProtoSchemaRefresher:
+    """Test the background schema refresher."""
+
+    def test_refresh_publishes_changed_schema(self):
+        """Test that new proto contents become the current version."""
+        publish_schema({"spec.proto": SPEC_V1}, source="v1")
+        refresher = ProtoSchemaRefresher(
+            fetch=lambda: ("v2", {"spec.proto": SPEC_V2}),
+            interval_seconds=60,
+        )
+
+        schema = refresher.refresh_once()
+
+        assert schema is not None
+        assert current_schema_version() is schema
+        assert schema.source == "v2"
+
+    def test_refresh_without_changes_returns_none(self):
+        """Test that unchanged contents are not reported as a new version."""
+        publish_schema({"spec.proto": SPEC_V1})
+        refresher = ProtoSchemaRefresher(
+            fetch=lambda: ("v1", {"spec.proto": SPEC_V1}),
+            interval_seconds=60,
+        )
+
+        assert refresher.refresh_once() is None
+
+    def test_failed_refresh_keeps_current_version(self):
+        """Test that fetch errors are swallowed and the old schema stays current."""
+        v1 = publish_schema({"spec.proto": SPEC_V1})
+
+        def unreachable():
+            raise RuntimeError("network unreachable")
+
+        refresher = ProtoSchemaRefresher(fetch=unreachable, interval_seconds=60)
+
+        assert refresher.refresh_once() is None
+        assert current_schema_version() is v1
+
+    def test_background_thread_refreshes(self):
+        """Test that the started refresher swaps in new versions periodically."""
+        publish_schema({"spec.proto": SPEC_V1})
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return "v2", {"spec.proto": SPEC_V2}
+
+        refresher = ProtoSchemaRefresher(fetch=fetch, interval_seconds=0.01)
+        refresher.start()
+        try:
+            assert refreshed.wait(timeout=5)
+        finally:
+            refresher.stop(timeout=5)
+
+        assert _field_names() == ["engine", "allocated_storage_gb"]
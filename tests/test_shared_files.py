@@ -0,0 +1,222 @@
+"""Tests for shared, reference-counted repository files."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.common.repos import middleware as repos_middleware
+from src.common.repos.middleware import RepositoryFilesMiddleware
+from src.common.repos.shared_files import (
+    SharedFilesBackend,
+    SharedFileStore,
+    content_digest,
+)
+
+SPEC = "message Spec {\n  string engine = 1;\n}"
+API = "message Api {\n  Spec spec = 1;\n}"
+
+
+@pytest.fixture
+def store() -> SharedFileStore:
+    """Return an empty shared file store."""
+    return SharedFileStore()
+
+
+def _mount(middleware: RepositoryFilesMiddleware, state: dict) -> dict:
+    """Run the middleware on a thread state and apply its update."""
+    update = middleware.before_agent(state, runtime=None)
+    if update:
+        state.setdefault("repository_mounts", {}).update(update["repository_mounts"])
+    return state
+
+
+def _backend(store: SharedFileStore, files: dict[str, str]) -> SharedFilesBackend:
+    """Return a backend for a thread with the given files mounted at /schema/protos."""
+    file_set = store.register(files)
+    runtime = SimpleNamespace(state={"repository_mounts": {"/schema/protos": file_set}})
+    return SharedFilesBackend(runtime, "/schema/protos", store)
+
+
+class TestSharedFileStore:
+    """Test the content-addressed shared file store."""
+
+    def test_identical_file_sets_are_stored_once(self, store):
+        """Test that registering equal files returns the same file set."""
+        first = store.register({"spec.proto": SPEC, "api.proto": API})
+        second = store.register({"api.proto": API, "spec.proto": SPEC})
+
+        assert first == second
+        assert len(store) == 2
+        assert store.refcount(first) == 2
+        assert store.file_set(first)["spec.proto"] == {
+            "hash": content_digest(SPEC),
+            "size": len(SPEC),
+        }
+
+    def test_contents_are_shared_between_file_sets(self, store):
+        """Test that an unchanged file is stored once across file sets."""
+        store.register({"spec.proto": SPEC, "api.proto": API})
+        store.register({"spec.proto": SPEC, "api.proto": API + "\n// v2"})
+
+        assert len(store) == 3
+
+    def test_release_drops_unreferenced_contents(self, store):
+        """Test that contents are removed when no file set references them."""
+        old = store.register({"spec.proto": SPEC, "api.proto": API})
+        new = store.register({"spec.proto": SPEC})
+
+        store.release(old)
+
+        assert old not in store
+        assert store.file_set(old) is None
+        assert store.read(content_digest(API)) is None
+        assert store.read(content_digest(SPEC)) is not None
+        assert new in store
+
+    def test_changed_files(self, store):
+        """Test listing the files that differ between two file sets."""
+        old = store.register({"spec.proto": SPEC, "api.proto": API})
+        new = store.register({"spec.proto": SPEC + "\n// v2", "outputs.proto": API})
+
+        assert store.changed_files(old, new) == ["api.proto", "outputs.proto", "spec.proto"]
+        assert store.changed_files(old, old) == []
+        assert store.changed_files(old, "unknown") is None
+
+    def test_contents_are_materialized_on_first_read(self, store):
+        """Test that FileData is only built for files that are read."""
+        store.register({"spec.proto": SPEC, "api.proto": API})
+
+        assert not store.is_materialized(content_digest(SPEC))
+        assert store.read(content_digest(SPEC))["content"] == SPEC.split("\n")
+        assert store.is_materialized(content_digest(SPEC))
+        assert not store.is_materialized(content_digest(API))
+
+
+class TestSharedFilesBackend:
+    """Test serving a mounted file set through the backend."""
+
+    def test_read_resolves_mount(self, store):
+        """Test that reads return the stored content with line numbers."""
+        content = _backend(store, {"spec.proto": SPEC}).read("/spec.proto")
+
+        assert "string engine = 1;" in content
+        assert content.splitlines()[0].strip().startswith("1")
+
+    def test_read_missing_file(self, store):
+        """Test that unknown paths return an error message."""
+        assert _backend(store, {"spec.proto": SPEC}).read("/missing.proto").startswith("Error:")
+
+    def test_listing_does_not_materialize(self, store):
+        """Test that ls and glob only use the file references."""
+        backend = _backend(store, {"spec.proto": SPEC, "api.proto": API})
+
+        infos = backend.ls_info("/")
+        assert [(info["path"], info["size"]) for info in infos] == [
+            ("/api.proto", len(API)),
+            ("/spec.proto", len(SPEC)),
+        ]
+        assert {info["path"] for info in backend.glob_info("*.proto")} == {
+            "/api.proto",
+            "/spec.proto",
+        }
+        assert not store.is_materialized(content_digest(SPEC))
+        assert not store.is_materialized(content_digest(API))
+
+    def test_grep(self, store):
+        """Test searching the mounted files."""
+        matches = _backend(store, {"spec.proto": SPEC, "api.proto": API}).grep_raw("engine")
+
+        assert [(m["path"], m["line"]) for m in matches] == [("/spec.proto", 2)]
+
+    def test_writes_are_rejected(self, store):
+        """Test that the mounted files are read-only."""
+        backend = _backend(store, {"spec.proto": SPEC})
+
+        assert backend.write("/new.proto", "x").error
+        assert backend.edit("/spec.proto", "engine", "kind").error
+
+
+class TestRepositoryFilesMiddleware:
+    """Test mounting shared files into thread state."""
+
+    def test_threads_share_contents(self, store):
+        """Test that threads only record the mount of one stored file set."""
+        middleware = RepositoryFilesMiddleware({"spec.proto": SPEC}, "/schema/protos", store=store)
+
+        first = _mount(middleware, {})
+        second = _mount(middleware, {})
+
+        assert first["repository_mounts"] == second["repository_mounts"]
+        assert "files" not in first
+        assert len(store) == 1
+        assert store.refcount(first["repository_mounts"]["/schema/protos"]) == 1
+
+    def test_mounted_thread_is_skipped(self, store):
+        """Test that a thread with mounted files is not initialized again."""
+        middleware = RepositoryFilesMiddleware({"spec.proto": SPEC}, "/schema/protos", store=store)
+        state = _mount(middleware, {})
+
+        assert middleware.before_agent(state, runtime=None) is None
+
+    def test_released_file_set_is_mounted_again(self, store, monkeypatch):
+        """Test that mounts of evicted file sets are replaced on the next request."""
+        monkeypatch.setattr(repos_middleware, "MAX_RETAINED_FILE_SETS", 1)
+        middleware = RepositoryFilesMiddleware({"spec.proto": SPEC}, "/schema/protos", store=store)
+        state = _mount(middleware, {})
+        old_file_set = state["repository_mounts"]["/schema/protos"]
+
+        middleware.update_file_contents({"spec.proto": SPEC + "\n// v2"})
+        _mount(middleware, {})
+        assert old_file_set not in store
+
+        update = middleware.before_agent(state, runtime=None)
+        assert update is not None
+        assert update["repository_mounts"]["/schema/protos"] in store
+
+    def test_backend_routes_mount_to_shared_files(self, store):
+        """Test that the backend factory serves the mount and keeps other paths in state."""
+        middleware = RepositoryFilesMiddleware({"spec.proto": SPEC}, "/schema/protos", store=store)
+        state = _mount(middleware, {"files": {}})
+        backend = middleware.backend()(SimpleNamespace(state=state))
+
+        assert [info["path"] for info in backend.ls_info("/schema/protos")] == [
+            "/schema/protos/spec.proto"
+        ]
+        assert "string engine = 1;" in backend.read("/schema/protos/spec.proto")
+        assert backend.read("/requirements.json").startswith("Error:")
+        assert backend.write("/schema/protos/spec.proto", "x").error
+
+    def test_unchanged_files_are_not_registered_again(self, store, monkeypatch):
+        """Test that the staleness check does not re-hash unchanged files."""
+        middleware = RepositoryFilesMiddleware({"spec.proto": SPEC}, "/schema/protos", store=store)
+        state = _mount(middleware, {})
+        monkeypatch.setattr(store, "register", lambda files: pytest.fail("registered again"))
+
+        assert middleware.before_agent(state, runtime=None) is None
+
+    def test_updated_contents_are_remounted(self, store):
+        """Test that a thread notices files updated upstream."""
+        file_contents = {"spec.proto": SPEC, "api.proto": API}
+        middleware = RepositoryFilesMiddleware(file_contents, "/schema/protos", store=store)
+        state = _mount(middleware, {})
+        old_file_set = state["repository_mounts"]["/schema/protos"]
+
+        middleware.update_file_contents({**file_contents, "api.proto": API + "\n// v2"})
+        update = middleware.before_agent(state, runtime=None)
+
+        assert update is not None
+        new_file_set = update["repository_mounts"]["/schema/protos"]
+        assert new_file_set != old_file_set
+        assert store.file_set(new_file_set)["spec.proto"]["hash"] == content_digest(SPEC)
+        # The unchanged spec.proto is stored once, shared by both file sets
+        assert len(store) == 3
+
+    def test_contents_are_snapshotted(self, store):
+        """Test that changing the passed mapping in place does not change the mount."""
+        file_contents = {"spec.proto": SPEC}
+        middleware = RepositoryFilesMiddleware(file_contents, "/schema/protos", store=store)
+        state = _mount(middleware, {})
+
+        file_contents["spec.proto"] = SPEC + "\n// v2"
+
+        assert middleware.before_agent(state, runtime=None) is None
@@ -0,0 +1,184 @@
+"""Tests for the long-lived, warmed-up protovalidate validator."""
+
+from types import SimpleNamespace
+
+import pytest
+from google.protobuf import descriptor_pb2, descriptor_pool
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto
+from google.protobuf.message_factory import GetMessageClass
+
+from src.agents.rds_manifest_generator.validation import validator as validator_module
+from src.agents.rds_manifest_generator.validation.validator import (
+    METRIC_VALIDATE_SECONDS,
+    METRIC_WARMUP_SECONDS,
+    WarmValidator,
+)
+from src.common.metrics import MetricsRegistry
+
+PACKAGE = "graph_fleet.tests.warm_validator"
+
+
+def _message_classes() -> dict[str, type]:
+    """Return Outer, which reaches Inner twice and Leaf directly and through Inner."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name="graph_fleet/tests/warm_validator/messages.proto", package=PACKAGE
+    )
+    fields = {
+        "Leaf": [("value", FieldDescriptorProto.TYPE_INT32, None)],
+        "Inner": [("leaf", FieldDescriptorProto.TYPE_MESSAGE, "Leaf")],
+        "Outer": [
+            ("first", FieldDescriptorProto.TYPE_MESSAGE, "Inner"),
+            ("second", FieldDescriptorProto.TYPE_MESSAGE, "Inner"),
+            ("leaf", FieldDescriptorProto.TYPE_MESSAGE, "Leaf"),
+        ],
+    }
+    for message_name, message_fields in fields.items():
+        message = file_proto.message_type.add(name=message_name)
+        for number, (name, type_, type_name) in enumerate(message_fields, start=1):
+            field = message.field.add(
+                name=name, number=number, type=type_, label=FieldDescriptorProto.LABEL_OPTIONAL
+            )
+            if type_name:
+                field.type_name = f".{PACKAGE}.{type_name}"
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return {
+        name: GetMessageClass(pool.FindMessageTypeByName(f"{PACKAGE}.{name}")) for name in fields
+    }
+
+
+MESSAGES = _message_classes()
+
+
+class FakeCompilationError(Exception):
+    """Stand-in for protovalidate.CompilationError."""
+
+
+class FakeValidationError(Exception):
+    """Stand-in for protovalidate.ValidationError."""
+
+    def __init__(self, msg, violations):
+        """Keep the violations, as protovalidate does."""
+        super().__init__(msg)
+        self.violations = violations
+
+
+class FakeValidator:
+    """Stand-in for protovalidate.Validator that records what it validates."""
+
+    def __init__(self):
+        """Start without violations or broken rules."""
+        self.calls: list[str] = []
+        self.violations: list = []
+        self.broken: set[str] = set()
+
+    def collect_violations(self, message):
+        """Record the message type and return the configured violations."""
+        name = message.DESCRIPTOR.full_name
+        self.calls.append(name)
+        if name in self.broken:
+            raise FakeCompilationError(f"bad rule on {name}")
+        return list(self.violations)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """Return a fake protovalidate Validator, with a fresh metrics registry."""
+    monkeypatch.setattr(
+        validator_module,
+        "protovalidate",
+        SimpleNamespace(
+            Validator=FakeValidator,
+            CompilationError=FakeCompilationError,
+            ValidationError=FakeValidationError,
+        ),
+    )
+    registry = MetricsRegistry()
+    monkeypatch.setattr(validator_module, "get_metrics_registry", lambda: registry)
+    fake = FakeValidator()
+    fake.registry = registry
+    return fake
+
+
+class TestRegister:
+    """Test compiling rules ahead of the first validation."""
+
+    def test_each_reachable_message_type_is_compiled_once(self, fake):
+        """Test that Outer, Inner and Leaf are compiled once each."""
+        validator = WarmValidator(fake)
+
+        assert validator.register(MESSAGES["Outer"]) == 3
+        assert sorted(fake.calls) == [f"{PACKAGE}.{name}" for name in ("Inner", "Leaf", "Outer")]
+        assert fake.registry.summary(METRIC_WARMUP_SECONDS, message=f"{PACKAGE}.Outer").count == 1
+
+    def test_registered_types_are_not_compiled_again(self, fake):
+        """Test that registering a reachable type again compiles nothing."""
+        validator = WarmValidator(fake)
+        validator.register(MESSAGES["Inner"])
+
+        assert validator.register(MESSAGES["Outer"]) == 1
+        assert validator.register(MESSAGES["Leaf"]) == 0
+        assert len(fake.calls) == 3
+
+    def test_compilation_errors_are_logged(self, fake, caplog):
+        """Test that rules failing to compile do not stop the warm-up."""
+        fake.broken.add(f"{PACKAGE}.Inner")
+        validator = WarmValidator(fake)
+
+        assert validator.register(MESSAGES["Outer"]) == 3
+        assert "Could not compile validation rules of graph_fleet.tests.warm_validator.Inner" in caplog.text
+
+
+class TestValidate:
+    """Test validating messages with the warmed-up validator."""
+
+    def test_cold_and_warm_validations_are_labeled(self, fake):
+        """Test that only the first validation of an unregistered type is cold."""
+        validator = WarmValidator(fake)
+        message = MESSAGES["Leaf"]()
+
+        validator.collect_violations(message)
+        validator.collect_violations(message)
+
+        labels = {"message": f"{PACKAGE}.Leaf"}
+        assert fake.registry.summary(METRIC_VALIDATE_SECONDS, cache="cold", **labels).count == 1
+        assert fake.registry.summary(METRIC_VALIDATE_SECONDS, cache="warm", **labels).count == 1
+
+    def test_registered_types_validate_warm(self, fake):
+        """Test that validating a registered type is labeled warm."""
+        validator = WarmValidator(fake)
+        validator.register(MESSAGES["Outer"])
+
+        validator.collect_violations(MESSAGES["Inner"]())
+
+        labels = {"message": f"{PACKAGE}.Inner"}
+        assert fake.registry.summary(METRIC_VALIDATE_SECONDS, cache="cold", **labels) is None
+        assert fake.registry.summary(METRIC_VALIDATE_SECONDS, cache="warm", **labels).count == 1
+
+    def test_violations_raise_validation_error(self, fake):
+        """Test that validate raises with the collected violations."""
+        violation = SimpleNamespace(field_path="value", message="value must be greater than 0")
+        fake.violations = [violation]
+        validator = WarmValidator(fake)
+
+        with pytest.raises(FakeValidationError) as excinfo:
+            validator.validate(MESSAGES["Leaf"]())
+
+        assert excinfo.value.violations == [violation]
+
+    def test_valid_message(self, fake):
+        """Test that a valid message passes without raising."""
+        validator = WarmValidator(fake)
+
+        validator.validate(MESSAGES["Leaf"]())
+        assert validator.collect_violations(MESSAGES["Leaf"]()) == []
+
+    def test_compilation_errors_propagate(self, fake):
+        """Test that rules failing to compile surface when validating."""
+        fake.broken.add(f"{PACKAGE}.Leaf")
+        validator = WarmValidator(fake)
+
+        with pytest.raises(FakeCompilationError):
+            validator.collect_violations(MESSAGES["Leaf"]())
+        assert validator.is_warm(MESSAGES["Leaf"].DESCRIPTOR)